@@ -7,8 +7,15 @@ a wrapper for :class:`~stem.socket.RelaySocket`, much the same way as
 :class:`~stem.control.Controller` provides higher level functions for
 :class:`~stem.socket.ControlSocket`.
 
+Cells we receive are read in the background and provided to the circuit
+they're addressed to, and in turn the stream they belong to. As such many
+circuits and streams can be used concurrently over a single connection.
+
 .. versionadded:: 1.7.0
 
+.. versionchanged:: 2.0.0
+   Circuits and streams can be used concurrently.
+
 ::
 
   Relay - Connection with a tor relay's ORPort.
@@ -23,18 +30,26 @@ a wrapper for :class:`~stem.socket.RelaySocket`, much the same way as
   Circuit - Circuit we've established through a relay.
     |- send - sends a message through this circuit
     +- close - closes this circuit
+
+  RelayPool - Relay connections and circuits reused across directory requests.
+    |- directory - makes a directory request through a relay
+    +- close - closes our relay connections
 """
 
+import asyncio
+import collections
 import hashlib
 import threading
+import time
 
 import stem
 import stem.client.cell
 import stem.socket
 import stem.util.connection
 
+from stem.util import log
 from types import TracebackType
-from typing import AsyncIterator, Dict, List, Optional, Sequence, Type, Union
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
 
 from stem.client.cell import (
   CELL_TYPE_SIZE,
@@ -46,10 +61,11 @@ from stem.client.cell import (
 from stem.client.datatype import (
   ZERO,
   Address,
+  CellBuffer,
   KDF,
   LinkProtocol,
   RelayCommand,
-  split,
+  Size,
 )
 
 __all__ = [
@@ -59,6 +75,15 @@ __all__ = [
 
 DEFAULT_LINK_PROTOCOLS = (3, 4, 5)
 
+# Relays stop sending DATA cells when their circuit or stream window is
+# exhausted (1000 and 500 cells respectively), so we acknowledge each
+# increment we receive with a SENDME. Circuit level SENDMEs are authenticated
+# by the digest of the cell we're acknowledging (proposal 289).
+
+CIRCUIT_SENDME_INCREMENT = 100
+STREAM_SENDME_INCREMENT = 50
+SENDME_VERSION = 1
+
 
 class Relay(object):
   """
@@ -70,10 +95,14 @@ class Relay(object):
   def __init__(self, orport: stem.socket.RelaySocket, link_protocol: int) -> None:
     self.link_protocol = LinkProtocol(link_protocol)
     self._orport = orport
-    self._orport_buffer = b''  # unread bytes
+    self._orport_buffer = CellBuffer()  # unread bytes
     self._orport_lock = threading.RLock()
     self._circuits = {}  # type: Dict[int, stem.client.Circuit]
 
+    self._pending_circuits = {}  # type: Dict[int, asyncio.Queue]
+    self._reader_task = None  # type: Optional[asyncio.Task]
+    self._reader_error = None  # type: Optional[Exception]
+
   @staticmethod
   async def connect(address: str, port: int, link_protocols: Sequence['stem.client.datatype.LinkProtocol'] = DEFAULT_LINK_PROTOCOLS) -> 'stem.client.Relay':  # type: ignore
     """
@@ -157,9 +186,14 @@ class Relay(object):
     Reads the next cell from our ORPort. If none is present this blocks
     until one is available.
 
+    Once circuits are established cells are read by our background reader,
+    so this should not be called by others.
+
     :param raw: provides bytes rather than parsing as a cell if **True**
 
     :returns: next :class:`~stem.client.cell.Cell`
+
+    :raises: :class:`stem.SocketClosed` if our connection closes
     """
 
     with self._orport_lock:
@@ -167,63 +201,75 @@ class Relay(object):
 
       circ_id_size = self.link_protocol.circ_id_size.size
 
-      while len(self._orport_buffer) < (circ_id_size + CELL_TYPE_SIZE.size):
-        self._orport_buffer += await self._orport.recv()  # read until we know the cell type
-
-      cell_type = Cell.by_value(CELL_TYPE_SIZE.pop(self._orport_buffer[circ_id_size:])[0])
+      await self._fill_buffer(circ_id_size + CELL_TYPE_SIZE.size)  # read until we know the cell type
+      cell_type = Cell.by_value(self._orport_buffer.unpack(CELL_TYPE_SIZE, circ_id_size))
 
       if cell_type.IS_FIXED_SIZE:
         cell_size = circ_id_size + CELL_TYPE_SIZE.size + FIXED_PAYLOAD_LEN
       else:
         # variable length, our next field is the payload size
 
-        while len(self._orport_buffer) < (circ_id_size + CELL_TYPE_SIZE.size + FIXED_PAYLOAD_LEN):
-          self._orport_buffer += await self._orport.recv()  # read until we know the cell size
+        await self._fill_buffer(circ_id_size + CELL_TYPE_SIZE.size + PAYLOAD_LEN_SIZE.size)  # read until we know the cell size
+        payload_len = self._orport_buffer.unpack(PAYLOAD_LEN_SIZE, circ_id_size + CELL_TYPE_SIZE.size)
+        cell_size = circ_id_size + CELL_TYPE_SIZE.size + PAYLOAD_LEN_SIZE.size + payload_len
 
-        payload_len = PAYLOAD_LEN_SIZE.pop(self._orport_buffer[circ_id_size + CELL_TYPE_SIZE.size:])[0]
-        cell_size = circ_id_size + CELL_TYPE_SIZE.size + payload_len
-
-      while len(self._orport_buffer) < cell_size:
-        self._orport_buffer += await self._orport.recv()  # read until we have the full cell
+      await self._fill_buffer(cell_size)  # read until we have the full cell
+      content = self._orport_buffer.pop(cell_size)
 
       if raw:
-        content, self._orport_buffer = split(self._orport_buffer, cell_size)
         return content  # type: ignore
       else:
-        cell, self._orport_buffer = Cell.pop(self._orport_buffer, self.link_protocol)
-        return cell
+        return Cell.pop(content, self.link_protocol)[0]
 
-  async def _msg(self, cell: 'stem.client.cell.Cell') -> AsyncIterator['stem.client.cell.Cell']:
+  async def _fill_buffer(self, size: int) -> None:
+    """
+    Reads from our ORPort until our buffer has at least this many bytes.
     """
-    Sends a cell on the ORPort and provides the response we receive in reply.
-
-    Unfortunately unlike control sockets, ORPorts don't have generalized rules
-    for predictable message IO. With control sockets...
 
-      * Each message we send receives a single reply.
-      * We may also receive asynchronous events marked with a 650 status.
+    while len(self._orport_buffer) < size:
+      data = await self._orport.recv()
 
-    ORPorts by contrast receive variable length cells with differing rules on
-    their arrival. As such making a best effort attempt at a send-and-receive
-    method in which we do the following...
+      if not data:
+        raise stem.SocketClosed('ORPort connection to %s:%i has closed' % (self._orport.address, self._orport.port))
 
-      * Discard any existing unread data from the socket.
-      * Send our request.
-      * Await up to a second for a reply.
+      self._orport_buffer.append(data)
 
-    It's quite possible this is a stupid approach. If so, patches welcome.
+  def _start_reader(self) -> None:
+    """
+    Begins reading cells in the background if we aren't already.
+    """
 
-    :param cell: cell to be sent
+    if self._reader_error:
+      raise self._reader_error
+    elif self._reader_task is None:
+      self._reader_task = asyncio.ensure_future(self._read_cells())
 
-    :returns: **generator** with the cells received in reply
+  async def _read_cells(self) -> None:
     """
+    Reads cells from our ORPort, providing each to the circuit it's addressed
+    to. Cells for circuits we're establishing are queued until we have the
+    circuit, and link level cells (such as CERTS and NETINFO) are discarded.
+    """
+
+    try:
+      while True:
+        content = await self._recv_bytes()
+        circ_id = self.link_protocol.circ_id_size.pop(content)[0]
 
-    # TODO: why is this an iterator?
+        if circ_id in self._circuits:
+          self._circuits[circ_id]._deliver(content)
+        elif circ_id in self._pending_circuits:
+          self._pending_circuits[circ_id].put_nowait(Cell.pop(content, self.link_protocol)[0])
+        elif circ_id != 0:
+          log.trace('Discarding %i byte cell for unknown circuit %i' % (len(content), circ_id))
+    except Exception as exc:
+      self._reader_error = exc
 
-    await self._orport.recv(timeout = 0)  # discard unread data
-    await self._orport.send(cell.pack(self.link_protocol))
-    response = await self._orport.recv(timeout = 1)
-    yield stem.client.cell.Cell.pop(response, self.link_protocol)[0]
+      for circ in list(self._circuits.values()):
+        circ._fail(exc)
+
+      for queue in self._pending_circuits.values():
+        queue.put_nowait(exc)
 
   def is_alive(self) -> bool:
     """
@@ -253,26 +299,36 @@ class Relay(object):
     :func:`~stem.socket.BaseSocket.close` method.
     """
 
+    if self._reader_task:
+      self._reader_task.cancel()
+
     with self._orport_lock:
       return await self._orport.close()
 
   async def create_circuit(self) -> 'stem.client.Circuit':
     """
     Establishes a new circuit.
+
+    :raises:
+      * **ValueError** if the relay's reply is invalid
+      * :class:`stem.SocketClosed` if our connection closes
     """
 
     with self._orport_lock:
-      circ_id = max(self._circuits) + 1 if self._circuits else self.link_protocol.first_circ_id
+      circ_ids = list(self._circuits) + list(self._pending_circuits)
+      circ_id = max(circ_ids) + 1 if circ_ids else self.link_protocol.first_circ_id
+      replies = self._pending_circuits[circ_id] = asyncio.Queue()  # type: asyncio.Queue
 
-      create_fast_cell = stem.client.cell.CreateFastCell(circ_id)
-      created_fast_cell = None
+    try:
+      self._start_reader()
 
-      async for cell in self._msg(create_fast_cell):
-        if isinstance(cell, stem.client.cell.CreatedFastCell):
-          created_fast_cell = cell
-          break
+      create_fast_cell = stem.client.cell.CreateFastCell(circ_id)
+      await self._orport.send(create_fast_cell.pack(self.link_protocol))
+      created_fast_cell = await replies.get()
 
-      if not created_fast_cell:
+      if isinstance(created_fast_cell, Exception):
+        raise created_fast_cell
+      elif not isinstance(created_fast_cell, stem.client.cell.CreatedFastCell):
         raise ValueError('We should get a CREATED_FAST response from a CREATE_FAST request')
 
       kdf = KDF.from_value(create_fast_cell.key_material + created_fast_cell.key_material)
@@ -284,6 +340,8 @@ class Relay(object):
       self._circuits[circ.id] = circ
 
       return circ
+    finally:
+      del self._pending_circuits[circ_id]
 
   async def __aiter__(self) -> AsyncIterator['stem.client.Circuit']:
     with self._orport_lock:
@@ -328,40 +386,139 @@ class Circuit(object):
     self.forward_key = Cipher(algorithms.AES(kdf.forward_key), ctr, default_backend()).encryptor()
     self.backward_key = Cipher(algorithms.AES(kdf.backward_key), ctr, default_backend()).decryptor()
 
+    self._streams = {}  # type: Dict[int, asyncio.Queue]
+    self._send_lock = asyncio.Lock()
+    self._error = None  # type: Optional[Exception]
+
+    # DATA cells we've received, for flow control
+
+    self._circuit_data_cells = 0
+    self._stream_data_cells = {}  # type: Dict[int, int]
+
   async def directory(self, request: str, stream_id: int = 0) -> bytes:
     """
-    Request descriptors from the relay.
+    Request descriptors from the relay. Requests with different stream ids can
+    be made concurrently.
+
+    .. versionchanged:: 2.0.0
+       Concurrent requests are made over separate streams.
 
     :param request: directory request to make
     :param stream_id: specific stream this concerns
 
     :returns: **str** with the requested descriptor data
+
+    :raises:
+      * **ValueError** if the stream is already in use
+      * :class:`stem.ProtocolError` if the relay's response is malformed
+      * :class:`stem.SocketClosed` if our connection or circuit is closed
     """
 
-    with self.relay._orport_lock:
+    if stream_id in self._streams:
+      raise ValueError('Stream %i is already in use by circuit %i' % (stream_id, self.id))
+    elif self._error:
+      raise self._error
+
+    replies = self._streams[stream_id] = asyncio.Queue()  # type: asyncio.Queue
+    self._stream_data_cells[stream_id] = 0
+
+    try:
       await self._send(RelayCommand.BEGIN_DIR, stream_id = stream_id)
       await self._send(RelayCommand.DATA, request, stream_id = stream_id)
 
       response = []  # type: List[stem.client.cell.RelayCell]
 
       while True:
-        # Decrypt relay cells received in response. Our digest/key only
-        # updates when handled successfully.
+        cell = await replies.get()
+
+        if isinstance(cell, Exception):
+          raise cell
+        elif cell.command == RelayCommand.END:
+          return b''.join([cell.data for cell in response])
+        else:
+          response.append(cell)
+    finally:
+      del self._streams[stream_id]
+      del self._stream_data_cells[stream_id]
 
-        encrypted_cell = await self.relay._recv_bytes()
+  def _deliver(self, content: bytes) -> None:
+    """
+    Provides a cell we've received to the stream it belongs to. Relay cells
+    are decrypted in the order they arrive, and our digest/key only updates
+    when handled successfully.
 
-        decrypted_cell, backward_key, backward_digest = stem.client.cell.RelayCell.decrypt(self.relay.link_protocol, encrypted_cell, self.backward_key, self.backward_digest)
+    :param content: encrypted cell addressed to this circuit
+    """
 
-        if self.id != decrypted_cell.circ_id:
-          raise stem.ProtocolError('Response should be for circuit id %i, not %i' % (self.id, decrypted_cell.circ_id))
+    cell_type = Cell.by_value(CELL_TYPE_SIZE.pop(content[self.relay.link_protocol.circ_id_size.size:])[0])
 
-        self.backward_digest = backward_digest
-        self.backward_key = backward_key
+    if cell_type == stem.client.cell.DestroyCell:
+      destroy_cell = Cell.pop(content, self.relay.link_protocol)[0]  # type: stem.client.cell.DestroyCell # type: ignore
+      self.relay._circuits.pop(self.id, None)
+      self._fail(stem.SocketClosed('Circuit %i was closed by the relay (%s)' % (self.id, destroy_cell.reason)))
+      return
+    elif cell_type != stem.client.cell.RelayCell:
+      log.trace('Discarding %s cell for circuit %i' % (cell_type.NAME, self.id))
+      return
 
-        if decrypted_cell.command == RelayCommand.END:
-          return b''.join([cell.data for cell in response])
-        else:
-          response.append(decrypted_cell)
+    try:
+      cell, self.backward_key, self.backward_digest = stem.client.cell.RelayCell.decrypt(self.relay.link_protocol, content, self.backward_key, self.backward_digest)
+    except stem.ProtocolError as exc:
+      self._fail(exc)
+      return
+
+    if cell.command == RelayCommand.DATA:
+      self._acknowledge(cell.stream_id)
+
+    if cell.stream_id in self._streams:
+      self._streams[cell.stream_id].put_nowait(cell)
+    else:
+      log.trace('Discarding %s cell for unknown stream %i of circuit %i' % (cell.command, cell.stream_id, self.id))
+
+  def _acknowledge(self, stream_id: int) -> None:
+    """
+    Counts a DATA cell we've received, sending a SENDME if it completes an
+    increment of our circuit or stream's window. Unknown streams still count
+    against our circuit.
+
+    :param stream_id: stream the cell belongs to
+    """
+
+    self._circuit_data_cells += 1
+
+    if self._circuit_data_cells % CIRCUIT_SENDME_INCREMENT == 0:
+      digest = self.backward_digest.digest()
+      self._send_sendme(Size.CHAR.pack(SENDME_VERSION) + Size.SHORT.pack(len(digest)) + digest)
+
+    if stream_id in self._stream_data_cells:
+      self._stream_data_cells[stream_id] += 1
+
+      if self._stream_data_cells[stream_id] % STREAM_SENDME_INCREMENT == 0:
+        self._send_sendme(stream_id = stream_id)
+
+  def _send_sendme(self, data: bytes = b'', stream_id: int = 0) -> None:
+    """
+    Sends a SENDME in the background, since cells are delivered by our
+    relay's reader. Failures are left for the reader to report.
+    """
+
+    async def send() -> None:
+      try:
+        await self._send(RelayCommand.SENDME, data, stream_id = stream_id)
+      except stem.SocketError as exc:
+        log.trace('Unable to send a SENDME for circuit %i (%s)' % (self.id, exc))
+
+    asyncio.ensure_future(send())
+
+  def _fail(self, exc: Exception) -> None:
+    """
+    Aborts our streams, and prevents new ones, after our circuit fails.
+    """
+
+    self._error = exc
+
+    for replies in self._streams.values():
+      replies.put_nowait(exc)
 
   async def _send(self, command: 'stem.client.datatype.RelayCommand', data: Union[bytes, str] = b'', stream_id: int = 0) -> None:
     """
@@ -372,7 +529,7 @@ class Circuit(object):
     :param stream_id: specific stream this concerns
     """
 
-    with self.relay._orport_lock:
+    async with self._send_lock:
       # Encrypt and send the cell. Our digest/key only updates if the cell is
       # successfully sent.
 
@@ -384,12 +541,219 @@ class Circuit(object):
       self.forward_key = forward_key
 
   async def close(self) -> None:
-    with self.relay._orport_lock:
+    self.relay._circuits.pop(self.id, None)
+    self._fail(stem.SocketClosed('Circuit %i has been closed' % self.id))
+
+    async with self._send_lock:
       await self.relay._orport.send(stem.client.cell.DestroyCell(self.id).pack(self.relay.link_protocol))
-      del self.relay._circuits[self.id]
 
   async def __aenter__(self) -> 'stem.client.Circuit':
     return self
 
   async def __aexit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
     await self.close()
+
+
+class RelayPool(object):
+  """
+  Relay connections and circuits that are kept open so they can be reused by
+  later directory requests. Each request is a BEGIN_DIR stream with its own
+  stream id over a circuit we've already established, so only our first
+  request to a relay pays for its TLS handshake and CREATE_FAST.
+
+  Relays are managed by an event loop of our own, so a pool can be shared by
+  callers running in different threads and event loops. Concurrent requests
+  through the same relay are made over separate streams of its circuit.
+
+  .. versionadded:: 2.0.0
+
+  :var int max_idle: maximum number of relays we keep connected
+  :var float idle_timeout: seconds an unused relay connection is kept
+  """
+
+  def __init__(self, max_idle: int = 4, idle_timeout: float = 30.0) -> None:
+    self.max_idle = max_idle
+    self.idle_timeout = idle_timeout
+
+    self._links = collections.OrderedDict()  # type: collections.OrderedDict[Tuple[str, int, Tuple[int, ...]], _PooledLink]
+    self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+    self._loop_thread = None  # type: Optional[threading.Thread]
+    self._loop_lock = threading.RLock()
+
+  async def directory(self, address: str, port: int, request: str, link_protocols: Sequence['stem.client.datatype.LinkProtocol'] = DEFAULT_LINK_PROTOCOLS) -> bytes:  # type: ignore
+    """
+    Makes a directory request through the given relay, connecting to it and
+    establishing a circuit if we don't have one already.
+
+    :param address: ip address of the relay
+    :param port: ORPort of the relay
+    :param request: directory request to make
+    :param link_protocols: acceptable link protocol versions
+
+    :returns: **bytes** with the relay's response
+
+    :raises:
+      * **ValueError** if address or port are invalid
+      * :class:`stem.SocketError` if we're unable to establish a connection
+      * :class:`stem.ProtocolError` if the response is malformed
+    """
+
+    with self._loop_lock:
+      if self._loop is None:
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+          name = 'stem.client relay pool',
+          target = self._loop.run_forever,
+          daemon = True,
+        )
+
+        self._loop_thread.start()
+
+      future = asyncio.run_coroutine_threadsafe(self._directory(address, port, request, tuple(link_protocols)), self._loop)
+
+    return await asyncio.wrap_future(future)
+
+  def close(self) -> None:
+    """
+    Closes our relay connections, and stops the thread that manages them.
+    Later requests start it again.
+    """
+
+    with self._loop_lock:
+      if self._loop is None:
+        return
+
+      asyncio.run_coroutine_threadsafe(self._close_links(lambda link: True), self._loop).result()
+
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._loop_thread.join()
+      self._loop.close()
+
+      self._loop = None
+      self._loop_thread = None
+
+  async def _directory(self, address: str, port: int, request: str, link_protocols: Tuple[int, ...]) -> bytes:
+    key = (address, port, link_protocols)
+    link = self._links.get(key)
+
+    if link is None:
+      link = self._links[key] = _PooledLink()
+
+    self._links.move_to_end(key)
+    link.users += 1
+
+    try:
+      circuit, is_reused = await link.get_circuit(address, port, link_protocols)
+
+      try:
+        return await link.request(circuit, request)
+      except (stem.SocketError, stem.ProtocolError) as exc:
+        await link.discard(circuit)
+
+        if not is_reused:
+          raise
+
+        log.trace('Reused circuit through %s:%i failed (%s), establishing a new one' % (address, port, exc))
+
+      circuit, _ = await link.get_circuit(address, port, link_protocols)
+
+      try:
+        return await link.request(circuit, request)
+      except (stem.SocketError, stem.ProtocolError):
+        await link.discard(circuit)
+        raise
+    finally:
+      link.users -= 1
+      await self._close_links(self._is_surplus)
+
+  def _is_surplus(self, link: '_PooledLink') -> bool:
+    """
+    Checks if an unused link has expired, or is beyond the number we retain.
+    """
+
+    if link.users > 0:
+      return False
+    elif link.circuit is None:
+      return True
+    elif time.monotonic() - link.last_used >= self.idle_timeout:
+      return True
+
+    newest = list(self._links.values())[-self.max_idle:] if self.max_idle > 0 else []
+    return link not in newest
+
+  async def _close_links(self, is_closable: Callable[['_PooledLink'], bool]) -> None:
+    for key, link in list(self._links.items()):
+      if is_closable(link):
+        del self._links[key]
+        await link.close()
+
+
+class _PooledLink(object):
+  """
+  Relay connection with a circuit for our directory requests.
+  """
+
+  def __init__(self) -> None:
+    self.relay = None  # type: Optional[stem.client.Relay]
+    self.circuit = None  # type: Optional[stem.client.Circuit]
+    self.last_used = time.monotonic()
+    self.lock = asyncio.Lock()
+    self.users = 0
+
+    self._stream_id = 0
+
+  async def get_circuit(self, address: str, port: int, link_protocols: Tuple[int, ...]) -> Tuple['stem.client.Circuit', bool]:
+    """
+    Provides our circuit, connecting and establishing one if we lack it.
+
+    :returns: **tuple** of the form (circuit, is_reused)
+    """
+
+    async with self.lock:
+      if self.circuit is not None:
+        return self.circuit, True
+
+      self.relay = await Relay.connect(address, port, link_protocols)  # type: ignore
+
+      try:
+        self.circuit = await self.relay.create_circuit()
+      except:
+        await self.close()
+        raise
+
+      self._stream_id = 0
+      return self.circuit, False
+
+  async def request(self, circuit: 'stem.client.Circuit', request: str) -> bytes:
+    # stream ids are two bytes, with zero reserved for control cells
+
+    self._stream_id = self._stream_id % 0xFFFF + 1
+
+    while self._stream_id in circuit._streams:
+      self._stream_id = self._stream_id % 0xFFFF + 1
+
+    response = await circuit.directory(request, stream_id = self._stream_id)
+    self.last_used = time.monotonic()
+
+    return response
+
+  async def discard(self, circuit: 'stem.client.Circuit') -> None:
+    """
+    Closes our connection if this circuit is still in use.
+    """
+
+    if self.circuit is circuit:
+      await self.close()
+
+  async def close(self) -> None:
+    circuit, relay = self.circuit, self.relay
+    self.circuit, self.relay = None, None
+
+    try:
+      if circuit is not None:
+        await circuit.close()
+    except stem.SocketError:
+      pass  # already disconnected
+
+    if relay is not None:
+      await relay.close()
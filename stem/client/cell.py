@@ -177,20 +177,26 @@ class Cell(object):
 
     link_protocol = LinkProtocol(link_protocol)
 
-    circ_id, content = link_protocol.circ_id_size.pop(content)
-    command, content = CELL_TYPE_SIZE.pop(content)
+    # Fields are decoded by their offset so we only copy the payload and
+    # remainder, rather than our content after each field.
+
+    circ_id = link_protocol.circ_id_size.unpack_from(content)
+    offset = link_protocol.circ_id_size.size
+
+    command = CELL_TYPE_SIZE.unpack_from(content, offset)
+    offset += CELL_TYPE_SIZE.size
     cls = Cell.by_value(command)
 
     if cls.IS_FIXED_SIZE:
       payload_len = FIXED_PAYLOAD_LEN
     else:
-      payload_len, content = PAYLOAD_LEN_SIZE.pop(content)
+      payload_len = PAYLOAD_LEN_SIZE.unpack_from(content, offset)
+      offset += PAYLOAD_LEN_SIZE.size
 
-    if len(content) < payload_len:
-      raise ValueError('%s cell should have a payload of %i bytes, but only had %i' % (cls.NAME, payload_len, len(content)))
+    if len(content) - offset < payload_len:
+      raise ValueError('%s cell should have a payload of %i bytes, but only had %i' % (cls.NAME, payload_len, len(content) - offset))
 
-    payload, content = split(content, payload_len)
-    return cls._unpack(payload, circ_id, link_protocol), content
+    return cls._unpack(content[offset:offset + payload_len], circ_id, link_protocol), content[offset + payload_len:]
 
   @classmethod
   def _pack(cls: Type['stem.client.cell.Cell'], link_protocol: 'stem.client.datatype.LinkProtocol', payload: bytes, unused: bytes = b'', circ_id: Optional[int] = None) -> bytes:
@@ -419,8 +425,9 @@ class RelayCell(CircuitCell):
     if len(content) != link_protocol.fixed_cell_length:
       raise stem.ProtocolError('RELAY cells should be %i bytes, but received %i' % (link_protocol.fixed_cell_length, len(content)))
 
-    circ_id, content = link_protocol.circ_id_size.pop(content)
-    command, encrypted_payload = Size.CHAR.pop(content)
+    circ_id = link_protocol.circ_id_size.unpack_from(content)
+    command = Size.CHAR.unpack_from(content, link_protocol.circ_id_size.size)
+    encrypted_payload = content[link_protocol.circ_id_size.size + Size.CHAR.size:]
 
     if command != RelayCell.VALUE:
       raise stem.ProtocolError('Cannot decrypt as a RELAY cell. This had command %i instead.' % command)
@@ -482,12 +489,12 @@ class RelayCell(CircuitCell):
 
   @classmethod
   def _unpack(cls, content: bytes, circ_id: int, link_protocol: 'stem.client.datatype.LinkProtocol') -> 'stem.client.cell.RelayCell':
-    command, content = Size.CHAR.pop(content)
-    recognized, content = Size.SHORT.pop(content)  # 'recognized' field
-    stream_id, content = Size.SHORT.pop(content)
-    digest, content = Size.LONG.pop(content)
-    data_len, content = Size.SHORT.pop(content)
-    data, unused = split(content, data_len)
+    command = Size.CHAR.unpack_from(content, 0)
+    recognized = Size.SHORT.unpack_from(content, 1)  # 'recognized' field
+    stream_id = Size.SHORT.unpack_from(content, 3)
+    digest = Size.LONG.unpack_from(content, 5)
+    data_len = Size.SHORT.unpack_from(content, 9)
+    data, unused = content[11:11 + data_len], content[11 + data_len:]
 
     if len(data) != data_len:
       raise ValueError('%s cell said it had %i bytes of data, but only had %i' % (cls.NAME, data_len, len(data)))
@@ -14,6 +14,11 @@ users.** See our :class:`~stem.client.Relay` the API you probably want.
 
   split - splits bytes into substrings
 
+  CellBuffer - Bytes received from a relay that we've yet to process.
+    |- append - adds received bytes
+    |- unpack - decodes a field without consuming it
+    +- pop - consumes bytes
+
   LinkProtocol - ORPort protocol version.
 
   Field - Packable and unpackable datatype.
@@ -29,6 +34,7 @@ users.** See our :class:`~stem.client.Relay` the API you probably want.
     |
     |- pack - encodes content
     |- unpack - decodes content
+    |- unpack_from - decodes content at an offset
     +- pop - decodes content with remainder
 
   KDF - KDF-TOR derivatived attributes
@@ -264,6 +270,77 @@ def split(content: bytes, size: int) -> Tuple[bytes, bytes]:
   return content[:size], content[size:]
 
 
+class CellBuffer(object):
+  """
+  Bytes received from a relay that we've yet to process. Received content is
+  appended to a bytearray and consumed by advancing an offset, so framing
+  cells doesn't copy or shift the bytes that follow them. Consumed space is
+  reclaimed once it's the majority of our buffer.
+
+  .. versionadded:: 2.0.0
+  """
+
+  def __init__(self) -> None:
+    self._buffer = bytearray()
+    self._offset = 0
+
+  def append(self, data: bytes) -> None:
+    """
+    Adds bytes we've received.
+
+    :param data: content to be added
+    """
+
+    self._buffer += data
+
+  def unpack(self, field: 'stem.client.datatype.Size', offset: int = 0) -> int:
+    """
+    Decodes a field from our unconsumed bytes without consuming it.
+
+    :param field: field to decode
+    :param offset: position of the field within our unconsumed bytes
+
+    :returns: **int** with the field's value
+
+    :raises: **ValueError** if we lack the field's bytes
+    """
+
+    return field.unpack_from(self._buffer, self._offset + offset)
+
+  def pop(self, size: int) -> bytes:
+    """
+    Consumes bytes from the start of our buffer.
+
+    :param size: number of bytes to consume
+
+    :returns: **bytes** that we've consumed
+
+    :raises: **ValueError** if we have fewer than this many bytes
+    """
+
+    if size > len(self):
+      raise ValueError('Unable to pop %i bytes, only %i are available' % (size, len(self)))
+
+    end = self._offset + size
+
+    with memoryview(self._buffer)[self._offset:end] as view:
+      content = bytes(view)
+
+    if end >= len(self._buffer):
+      self._buffer = bytearray()
+      self._offset = 0
+    elif end > len(self._buffer) // 2:
+      del self._buffer[:end]
+      self._offset = 0
+    else:
+      self._offset = end
+
+    return content
+
+  def __len__(self) -> int:
+    return len(self._buffer) - self._offset
+
+
 class LinkProtocol(int):
   """
   Constants that vary by our link protocol version.
@@ -406,10 +483,27 @@ class Size(Field):
 
   def unpack(self, packed: bytes) -> int:  # type: ignore
     if self.size != len(packed):
-      raise ValueError('%s is the wrong size for a %s field' % (repr(packed), self.name))
+      raise ValueError('%s is the wrong size for a %s field' % (repr(bytes(packed) if isinstance(packed, (bytearray, memoryview)) else packed), self.name))
 
     return int.from_bytes(packed, 'big')
 
+  def unpack_from(self, packed: Union[bytes, bytearray, memoryview], offset: int = 0) -> int:
+    """
+    Decodes this field from a position within the given content, without
+    copying the rest of it.
+
+    .. versionadded:: 2.0.0
+
+    :param packed: content to decode from
+    :param offset: position of the field within the content
+
+    :returns: **int** with the field's value
+
+    :raises: **ValueError** if the content lacks this field
+    """
+
+    return self.unpack(packed[offset:offset + self.size])
+
   def pop(self, packed: bytes) -> Tuple[int, bytes]:  # type: ignore
     to_unpack, remainder = split(packed, self.size)
 
@@ -156,6 +156,7 @@ import stem.control
 import stem.response
 import stem.response.protocolinfo
 import stem.socket
+import stem.util.asyncio
 import stem.util.connection
 import stem.util.enum
 import stem.util.str_tools
@@ -276,10 +277,22 @@ def connect(control_port: Tuple[str, Union[str, int]] = ('127.0.0.1', 'default')
   # TODO: 'loop_thread' gets orphaned, causing the thread to linger until we
   #   change this function's API
 
-  loop = asyncio.new_event_loop()
-  loop_thread = threading.Thread(target = loop.run_forever, name = 'asyncio')
-  loop_thread.setDaemon(True)
-  loop_thread.start()
+  runtime = stem.util.asyncio.get_runtime()
+
+  if runtime:
+    loop, loop_thread = runtime.acquire()
+  else:
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target = loop.run_forever, name = 'asyncio')
+    loop_thread.setDaemon(True)
+    loop_thread.start()
+
+  def release_loop() -> None:
+    if runtime:
+      runtime.release(loop)
+    elif loop_thread.is_alive():
+      loop.call_soon_threadsafe(loop.stop)
+      loop_thread.join()
 
   try:
     connection = asyncio.run_coroutine_threadsafe(connect_async(control_port, control_socket, password, password_prompt, chroot_path, controller), loop).result()
@@ -287,10 +300,7 @@ def connect(control_port: Tuple[str, Union[str, int]] = ('127.0.0.1', 'default')
     # if connecting failed then clean up and return
 
     if connection is None:
-      if loop_thread.is_alive():
-        loop.call_soon_threadsafe(loop.stop)
-        loop_thread.join()
-
+      release_loop()
       return None
 
     # Convert our controller into a synchronous instance. This is hoirribly
@@ -299,6 +309,7 @@ def connect(control_port: Tuple[str, Union[str, int]] = ('127.0.0.1', 'default')
 
     connection._no_op = False
     connection._loop_thread = loop_thread
+    connection._runtime = runtime
 
     for name, func in inspect.getmembers(connection):
       if name in ('_socket_connect', '_socket_close', '__aiter__', '__aenter__', '__aexit__'):
@@ -310,10 +321,7 @@ def connect(control_port: Tuple[str, Union[str, int]] = ('127.0.0.1', 'default')
 
     return connection
   except:
-    if loop_thread.is_alive():
-      loop.call_soon_threadsafe(loop.stop)
-      loop_thread.join()
-
+    release_loop()
     raise
 
 
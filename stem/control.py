@@ -74,8 +74,10 @@ If you're fine with allowing your script to raise exceptions then this can be mo
     |
     |- authenticate - authenticates this controller with tor
     |- reconnect - reconnects and authenticates to socket
+    |- batch - sends several requests to tor together
     |
     |- get_info - issues a GETINFO query for a parameter
+    |- get_countries - locales of many addresses
     |- get_version - provides our tor version
     |- get_exit_policy - provides our exit policy
     |- get_ports - provides the local ports where tor is listening for connections
@@ -94,6 +96,7 @@ If you're fine with allowing your script to raise exceptions then this can be mo
     |- get_server_descriptors - provides all currently available server descriptors
     |- get_network_status - querying the router status entry for a relay
     |- get_network_statuses - provides all presently available router status entries
+    |- get_relay_directory - relays tor knows about, kept current by its events
     |- get_hidden_service_descriptor - queries the given hidden service descriptor
     |
     |- get_conf - gets the value of a configuration option
@@ -122,6 +125,7 @@ If you're fine with allowing your script to raise exceptions then this can be mo
     |- is_caching_enabled - true if the controller has enabled caching
     |- set_caching - enables or disables caching
     |- clear_cache - clears any cached results
+    |- get_cache - provides our cache of tor's responses
     |
     |- load_conf - loads configuration information as if it was in the torrc
     |- save_conf - saves configuration information to the torrc
@@ -149,6 +153,8 @@ If you're fine with allowing your script to raise exceptions then this can be mo
 
   BaseController - Base controller class asynchronous message handling
     |- msg - communicates with the tor process
+    |- is_pipelining_enabled - true if requests can be sent without awaiting prior replies
+    |- set_pipelining - enables or disables pipelined requests
     |- is_alive - reports if our connection to tor is open or closed
     |- is_localhost - returns if the connection is for the local system or not
     |- connection_time - time when we last connected or disconnected
@@ -160,6 +166,14 @@ If you're fine with allowing your script to raise exceptions then this can be mo
     |- add_status_listener - notifies a callback of changes in our status
     +- remove_status_listener - prevents further notification of status changes
 
+  RelayDirectory - Network statuses and microdescriptors of the relays tor knows about
+    |- get_network_status - router status entry for a relay
+    |- get_network_statuses - all router status entries
+    |- get_microdescriptor - microdescriptor for a relay
+    |- get_microdescriptors - all microdescriptors
+    |- find_by_nickname - router status entries with a nickname
+    +- find_by_address - router status entries with an address
+
 .. data:: State (enum)
 
   Enumeration for states that a controller can have.
@@ -222,6 +236,22 @@ If you're fine with allowing your script to raise exceptions then this can be mo
   **WARN**                :class:`stem.response.events.LogEvent`
   ======================= ===========
 
+.. data:: EventOverflow (enum)
+
+  Action taken when a listener's event queue is full. Queues are used when
+  listeners are added with a concurrency, see
+  :func:`~stem.control.Controller.add_event_listener`.
+
+  .. versionadded:: 2.0.0
+
+  =============== ===========
+  EventOverflow   Description
+  =============== ===========
+  **BLOCK**       wait for the listener to catch up, delaying all further events
+  **DROP_NEWEST** discard the event being delivered
+  **DROP_OLDEST** discard the listener's oldest undelivered event
+  =============== ===========
+
 .. data:: Listener (enum)
 
   Purposes for inbound connections that Tor handles.
@@ -267,6 +297,7 @@ import stem.response.onion_client_auth
 import stem.response.protocolinfo
 import stem.socket
 import stem.util
+import stem.util.cache
 import stem.util.conf
 import stem.util.connection
 import stem.util.enum
@@ -279,7 +310,7 @@ from stem import UNDEFINED, CircStatus, Signal
 from stem.util import log
 from stem.util.asyncio import Synchronous
 from types import TracebackType
-from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
 
 # When closing the controller we attempt to finish processing enqueued events,
 # but if it takes longer than this we terminate.
@@ -329,6 +360,12 @@ EventType = stem.util.enum.UppercaseEnum(
   'WARN',
 )
 
+EventOverflow = stem.util.enum.UppercaseEnum(
+  'BLOCK',
+  'DROP_NEWEST',
+  'DROP_OLDEST',
+)
+
 Listener = stem.util.enum.UppercaseEnum(
   'OR',
   'DIR',
@@ -364,6 +401,20 @@ IMMUTABLE_CONFIG_OPTIONS = set(map(stem.util.str_tools._to_unicode, map(str.lowe
 LOG_CACHE_FETCHES = True  # provide trace level logging for cache hits
 MSG_TIMEOUT = 5  # seconds to await a response from tor
 
+# Number of microdescriptors a RelayDirectory requests from tor at a time.
+
+MICRODESCRIPTOR_BATCH_SIZE = 256
+
+# Descriptors from large GETINFO replies (such as 'md/all') are parsed in
+# chunks of roughly this many bytes as they arrive.
+
+DATA_STREAM_CHUNK_SIZE = 65536
+
+# High rate event types that listeners can receive as a BandwidthSummary for
+# each window, rather than individually.
+
+COALESCED_EVENTS = ('BW', 'STREAM_BW', 'CIRC_BW', 'CONN_BW', 'CELL_STATS')
+
 # Configuration options that are fetched by a special key. The keys are
 # lowercase to make case insensitive lookups easier.
 
@@ -387,6 +438,7 @@ CACHEABLE_GETINFO_PARAMS = (
   'config/defaults',
   'info/names',
   'ip-to-country/ipv4-available',
+  'ip-to-country/ipv6-available',
   'events/names',
   'features/names',
   'process/descriptor-limit',
@@ -434,6 +486,27 @@ class AccountingStats(collections.namedtuple('AccountingStats', ['retrieved', 's
   """
 
 
+class BandwidthSummary(collections.namedtuple('BandwidthSummary', ['type', 'start', 'end', 'events', 'read', 'written', 'by_id', 'cells', 'samples'])):
+  """
+  High rate events of a single type that were coalesced over a window, see
+  :func:`~stem.control.Controller.add_event_listener`.
+
+  .. versionadded:: 2.0.0
+
+  :var str type: event type being summarized, such as **BW** or **CIRC_BW**
+  :var float start: unix timestamp when we received our first event
+  :var float end: unix timestamp when this summary was delivered
+  :var int events: number of events that were coalesced
+  :var int read: total bytes received
+  :var int written: total bytes sent
+  :var dict by_id: mapping of stream, circuit, or connection identifiers to
+    their (read, written) byte totals
+  :var dict cells: mapping of circuit identifiers to the number of cells of
+    each type that were added to their queues, for **CELL_STATS** events
+  :var list samples: events retained by our sample rate
+  """
+
+
 class UserTrafficAllowed(collections.namedtuple('UserTrafficAllowed', ['inbound', 'outbound'])):
   """
   Indicates if we're likely to be servicing direct user traffic or not.
@@ -609,6 +682,7 @@ class BaseController(Synchronous):
 
     self._last_heartbeat = 0.0  # timestamp for when we last heard from tor
     self._is_authenticated = False
+    self._is_pipelined = False
 
     self._state_change_threads = []  # type: List[threading.Thread] # threads we've spawned to notify of state changes
 
@@ -629,12 +703,29 @@ class BaseController(Synchronous):
     self._reply_queue = asyncio.Queue()  # type: asyncio.Queue[Union[stem.response.ControlMessage, stem.ControllerError]]
     self._event_queue = asyncio.Queue()  # type: asyncio.Queue[stem.response.ControlMessage]
 
+    # futures for pipelined requests that are awaiting a reply, in the order
+    # they were sent
+
+    self._reply_waiters = collections.deque()  # type: Deque[asyncio.Future]
+
+    # handlers that stream the data replies of pipelined requests
+
+    self._reply_data_handlers = {}  # type: Dict[asyncio.Future, Callable[[Optional[bytes]], Awaitable[None]]]
+
     self._event_notice = asyncio.Event()
 
   async def msg(self, message: str) -> stem.response.ControlMessage:
     """
     Sends a message to our control socket and provides back its reply.
 
+    By default we await each reply before sending our next message. If
+    :func:`~stem.control.BaseController.set_pipelining` is enabled then
+    concurrent callers instead write their messages back to back, and replies
+    are matched to callers in the order their messages were sent.
+
+    .. versionchanged:: 2.0.0
+       Added support for pipelined requests.
+
     :param message: message to be formatted and sent to tor
 
     :returns: :class:`~stem.response.ControlMessage` with the response
@@ -647,6 +738,9 @@ class BaseController(Synchronous):
       * :class:`stem.SocketClosed` if the socket is shut down
     """
 
+    if self._is_pipelined:
+      return await self._msg_pipelined(message)
+
     async with self._msg_lock:
       # If our _reply_queue isn't empty then one of a few things happened...
       #
@@ -718,6 +812,156 @@ class BaseController(Synchronous):
         await self.close()
         raise
 
+  async def _msg_pipelined(self, message: str) -> stem.response.ControlMessage:
+    """
+    Sends a message without waiting on the replies of prior requests. Our
+    reader loop resolves pending requests in the order they were sent, which
+    matches the order in which tor responds.
+
+    :param message: message to be formatted and sent to tor
+
+    :returns: :class:`~stem.response.ControlMessage` with the response
+
+    :raises: same exceptions as :func:`~stem.control.BaseController.msg`
+    """
+
+    try:
+      waiter = (await self._send_pipelined([message]))[0]
+
+      try:
+        response = await asyncio.wait_for(waiter, MSG_TIMEOUT)
+      except asyncio.TimeoutError:
+        # Our cancelled waiter stays queued so the reply it would've received
+        # is discarded rather than delivered to the next caller.
+
+        raise stem.ControllerError('%s failed to receive a reply within %i seconds' % (message, MSG_TIMEOUT))
+
+      if isinstance(response, stem.ControllerError):
+        raise response
+      else:
+        return response
+    except stem.SocketClosed:
+      await self.close()
+      raise
+
+  async def _send_pipelined(self, messages: Sequence[str], data_handlers: Optional[Sequence[Optional[Callable[[Optional[bytes]], Awaitable[None]]]]] = None) -> List[asyncio.Future]:
+    """
+    Writes messages to our socket without awaiting their replies.
+
+    :param messages: messages to be formatted and sent to tor
+    :param data_handlers: coroutine functions to stream the data reply of each
+      message, which are awaited with each line and then **None**
+
+    :returns: **list** of futures that our reader loop resolves with each
+      message's response
+
+    :raises:
+      * :class:`stem.SocketError` if a problem arises in using the socket
+      * :class:`stem.SocketClosed` if the socket is shut down
+    """
+
+    # Our lock is only held while writing, so messages and their waiters are
+    # enqueued in the same order.
+
+    async with self._msg_lock:
+      waiters = [self._loop.create_future() for _ in messages]
+      self._reply_waiters.extend(waiters)
+
+      for waiter, data_handler in zip(waiters, data_handlers or ()):
+        if data_handler:
+          self._reply_data_handlers[waiter] = data_handler
+
+      try:
+        if len(messages) == 1:
+          await self._socket.send(messages[0])
+        else:
+          formatted = ''.join([stem.socket.send_formatting(message) for message in messages])
+          await self._socket.send(formatted, raw = True)
+      except:
+        for waiter in waiters:
+          if waiter in self._reply_waiters:
+            self._reply_waiters.remove(waiter)
+
+          self._reply_data_handlers.pop(waiter, None)
+
+        raise
+
+      return waiters
+
+  def _deliver_reply(self, response: Union[stem.response.ControlMessage, stem.ControllerError]) -> None:
+    """
+    Provides a reply to the oldest pipelined request, or our reply queue if
+    none are outstanding.
+
+    :param response: message or exception from our reader loop
+    """
+
+    if not self._reply_waiters:
+      self._reply_queue.put_nowait(response)
+    elif isinstance(response, stem.ControllerError):
+      # When our socket closes nothing further will arrive. For other errors
+      # we can't tell which replies our reader consumed, so matching
+      # subsequent replies to our remaining requests could provide callers
+      # with someone else's reply. Either way, everyone awaiting a reply gets
+      # this.
+
+      while self._reply_waiters:
+        waiter = self._reply_waiters.popleft()
+        self._reply_data_handlers.pop(waiter, None)
+
+        if not waiter.done():
+          waiter.set_result(response)
+    else:
+      waiter = self._reply_waiters.popleft()
+      self._reply_data_handlers.pop(waiter, None)
+
+      if not waiter.done():
+        waiter.set_result(response)
+      elif isinstance(response, stem.response.ControlMessage):
+        log.info('Failed to deliver a response: %s' % response)
+
+  def _reply_data_handler(self, status_code: str, content: bytes) -> Optional[Callable[[Optional[bytes]], Awaitable[None]]]:
+    """
+    Provides the handler that streams a data reply, if its request has one.
+    Replies arrive in the order requests were sent, so data belongs to our
+    oldest pending request unless it's an event.
+
+    :param status_code: status code of the data reply
+    :param content: first line of the data reply
+
+    :returns: coroutine function to stream the data to, **None** if it
+      shouldn't be streamed
+    """
+
+    if status_code == '650' or not self._reply_waiters:
+      return None
+
+    return self._reply_data_handlers.get(self._reply_waiters[0])
+
+  def is_pipelining_enabled(self) -> bool:
+    """
+    **True** if pipelining has been enabled, **False** otherwise.
+
+    .. versionadded:: 2.0.0
+
+    :returns: bool to indicate if pipelining is enabled
+    """
+
+    return self._is_pipelined
+
+  def set_pipelining(self, enabled: bool) -> None:
+    """
+    Enables or disables pipelining, which lets concurrent
+    :func:`~stem.control.BaseController.msg` calls send their messages without
+    waiting on the replies of one another.
+
+    .. versionadded:: 2.0.0
+
+    :param enabled: **True** to enable pipelining, **False** to disable it
+    """
+
+    self._is_pipelined = enabled
+
   def is_alive(self) -> bool:
     """
     Checks if our socket is currently connected. This is a pass-through for our
@@ -914,6 +1158,9 @@ class BaseController(Synchronous):
     if event_loop_task:
       await event_loop_task
 
+    if self._reply_waiters:
+      self._deliver_reply(stem.SocketClosed('Socket closed before receiving a reply'))
+
     await self._notify_status_listeners(State.CLOSED, acquire_send_lock = False)
     await self._socket_close()
 
@@ -993,7 +1240,7 @@ class BaseController(Synchronous):
 
     while self.is_alive():
       try:
-        control_message = await self._socket.recv()
+        control_message = await self._socket.recv(data_handler = self._reply_data_handler)
         self._last_heartbeat = time.time()
 
         if control_message.content()[-1][0] == '650':
@@ -1002,14 +1249,14 @@ class BaseController(Synchronous):
           self._event_notice.set()
         else:
           # response to a msg() call
-          self._reply_queue.put_nowait(control_message)
+          self._deliver_reply(control_message)
       except stem.ControllerError as exc:
         # Assume that all exceptions belong to the reader. This isn't always
         # true, but the msg() call can do a better job of sorting it out.
         #
         # Be aware that the msg() method relies on this to unblock callers.
 
-        self._reply_queue.put_nowait(exc)
+        self._deliver_reply(exc)
 
   async def _event_loop(self) -> None:
     """
@@ -1101,9 +1348,9 @@ class Controller(BaseController):
     control_socket = stem.socket.ControlSocketFile(path)
     return Controller(control_socket)
 
-  def __init__(self, control_socket: stem.socket.ControlSocket, is_authenticated: bool = False) -> None:
+  def __init__(self, control_socket: stem.socket.ControlSocket, is_authenticated: bool = False, cache: Optional[stem.util.cache.RequestCache] = None) -> None:
     self._is_caching_enabled = True
-    self._request_cache = {}  # type: Dict[str, Any]
+    self._request_cache = cache if cache is not None else stem.util.cache.RequestCache()
     self._last_newnym = 0.0
 
     self._cache_lock = threading.RLock()
@@ -1111,11 +1358,16 @@ class Controller(BaseController):
     # mapping of event types to their listeners
 
     self._event_listeners = {}  # type: Dict[stem.control.EventType, List[Callable[[stem.response.events.Event], Union[None, Awaitable[None]]]]]
+    self._listener_queues = {}  # type: Dict[Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], stem.control._ListenerQueue]
+    self._lazy_listeners = set()  # type: Set[Callable[[stem.response.events.Event], Union[None, Awaitable[None]]]]
+    self._listener_aggregators = {}  # type: Dict[Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], stem.control._EventAggregator]
     self._enabled_features = []  # type: List[str]
 
     self._last_address_exc = None  # type: Optional[BaseException]
     self._last_fingerprint_exc = None  # type: Optional[BaseException]
 
+    self._relay_directory = None  # type: Optional[stem.control.RelayDirectory]
+
     super(Controller, self).__init__(control_socket, is_authenticated)
 
     async def _sighup_listener(event: stem.response.events.SignalEvent) -> None:
@@ -1155,11 +1407,19 @@ class Controller(BaseController):
     super(Controller, self).__ainit__()
 
     self._event_listeners_lock = asyncio.Lock()
+    self._relay_directory_lock = asyncio.Lock()
 
   async def close(self) -> None:
     self.clear_cache()
+
+    for listener_aggregator in self._listener_aggregators.values():
+      listener_aggregator.stop()
+
     await super(Controller, self).close()
 
+    for listener_queue in self._listener_queues.values():
+      listener_queue.stop()
+
   async def authenticate(self, *args: Any, **kwargs: Any) -> None:
     """
     A convenience method to authenticate the controller. This is just a
@@ -1185,6 +1445,28 @@ class Controller(BaseController):
       self.clear_cache()
       await self.authenticate(*args, **kwargs)
 
+  def batch(self) -> 'stem.control.RequestBatch':
+    """
+    Provides a context for sending several requests to tor together. Requests
+    are sent when the context exits, and the futures they provide are then
+    resolved. For example...
+
+    ::
+
+      with controller.batch() as batch:
+        read = batch.get_info('traffic/read')
+        written = batch.get_info('traffic/written')
+        batch.signal(Signal.NEWNYM)
+
+      print('read: %s, written: %s' % (read.result(), written.result()))
+
+    .. versionadded:: 2.0.0
+
+    :returns: :class:`~stem.control.RequestBatch` for gathering our requests
+    """
+
+    return RequestBatch(self)
+
   @with_default()
   async def get_info(self, params: Union[str, Sequence[str]], default: Any = UNDEFINED, get_bytes: bool = False) -> Union[str, Dict[str, str]]:
     """
@@ -1234,22 +1516,23 @@ class Controller(BaseController):
       is_multiple = True
       param_set = set(params)
 
+    if any(_is_geoip_lookup(param) for param in param_set) and await self.get_info('ip-to-country/ipv4-available', '0') != '1':
+      raise stem.ProtocolError('Tor geoip database is unavailable')
+
     for param in param_set:
-      if param.startswith('ip-to-country/') and param != 'ip-to-country/0.0.0.0' and await self.get_info('ip-to-country/ipv4-available', '0') != '1':
-        raise stem.ProtocolError('Tor geoip database is unavailable')
-      elif param == 'address' and self._last_address_exc:
+      if param == 'address' and self._last_address_exc:
         raise self._last_address_exc  # we already know we can't resolve an address
       elif param == 'fingerprint' and self._last_fingerprint_exc and await self.get_conf('ORPort', None) is None:
         raise self._last_fingerprint_exc  # we already know we're not a relay
 
     # check for cached results
 
-    from_cache = [param.lower() for param in param_set]
-    cached_results = self._get_cache_map(from_cache, 'getinfo')
+    from_cache = dict((param.lower(), param) for param in param_set)
+    cached_results = self._get_cache_map(list(from_cache.keys()), 'getinfo')
 
-    for key in cached_results:
-      user_expected_key = _case_insensitive_lookup(param_set, key)
-      reply[user_expected_key] = cached_results[key]
+    for key, value in cached_results.items():
+      user_expected_key = from_cache[key]
+      reply[user_expected_key] = value
       param_set.remove(user_expected_key)
 
     # if everything was cached then short circuit making the query
@@ -1308,6 +1591,54 @@ class Controller(BaseController):
       log.debug('GETINFO %s (failed: %s)' % (' '.join(param_set), exc))
       raise
 
+  @with_default()
+  async def get_countries(self, addresses: Sequence[str], default: Any = UNDEFINED) -> Dict[str, str]:
+    """
+    get_countries(addresses, default = UNDEFINED)
+
+    Provides the locales of many addresses according to tor's geoip database.
+    Repeated addresses are only resolved once, cached results are reused, and
+    the rest are resolved through a single GETINFO request.
+
+    ::
+
+      countries = controller.get_countries(['128.31.0.34', '86.59.21.38'])
+      print(countries)  # {'128.31.0.34': 'us', '86.59.21.38': 'at'}
+
+    .. versionadded:: 2.0.0
+
+    :param addresses: IPv4 or IPv6 addresses to be resolved
+    :param default: response if the query fails
+
+    :returns: **dict** mapping addresses to their two letter country code,
+      '??' if unknown
+
+    :raises:
+      * **ValueError** if an address is malformed
+      * :class:`stem.ProtocolError` if the geoip database is unavailable
+      * :class:`stem.ControllerError` if the call fails and we weren't
+        provided a default response
+    """
+
+    addresses = list(collections.OrderedDict.fromkeys(addresses))
+
+    if not addresses:
+      return {}
+
+    has_ipv6 = False
+
+    for address in addresses:
+      if stem.util.connection.is_valid_ipv6_address(address):
+        has_ipv6 = True
+      elif not stem.util.connection.is_valid_ipv4_address(address):
+        raise ValueError("'%s' isn't a valid IPv4 or IPv6 address" % address)
+
+    if has_ipv6 and await self.get_info('ip-to-country/ipv6-available', '0') != '1':
+      raise stem.ProtocolError('Tor IPv6 geoip database is unavailable')
+
+    countries = await self.get_info(['ip-to-country/%s' % address for address in addresses])
+    return dict((address, countries['ip-to-country/%s' % address]) for address in addresses)
+
   @with_default()
   async def get_version(self, default: Any = UNDEFINED) -> stem.version.Version:
     """
@@ -1851,6 +2182,10 @@ class Controller(BaseController):
     directly from disk instead, which will not work remotely or if our process
     lacks read permissions.
 
+    .. versionchanged:: 2.0.0
+       Descriptors are provided as they're received, rather than after
+       reading all of tor's reply.
+
     :param default: items to provide if the query fails
 
     :returns: iterates over
@@ -1861,12 +2196,7 @@ class Controller(BaseController):
       default was provided
     """
 
-    desc_content = await self.get_info('md/all', get_bytes = True)
-
-    if not desc_content:
-      raise stem.DescriptorUnavailable('Descriptor information is unavailable, tor might still be downloading it')
-
-    for desc in stem.descriptor.microdescriptor._parse_file(io.BytesIO(desc_content)):
+    async for desc in self._get_info_descriptors('md/all', b'onion-key', stem.descriptor.microdescriptor._parse_file):
       yield desc
 
   @with_default()
@@ -1945,6 +2275,10 @@ class Controller(BaseController):
     really need server descriptors then you can get them by setting
     'UseMicrodescriptors 0'.
 
+    .. versionchanged:: 2.0.0
+       Descriptors are provided as they're received, rather than after
+       reading all of tor's reply.
+
     :param default: items to provide if the query fails
 
     :returns: iterates over
@@ -1955,17 +2289,7 @@ class Controller(BaseController):
       default was provided
     """
 
-    # TODO: We should iterate over the descriptors as they're read from the
-    # socket rather than reading the whole thing into memory.
-    #
-    # https://github.com/torproject/stem/issues/30
-
-    desc_content = await self.get_info('desc/all-recent', get_bytes = True)
-
-    if not desc_content:
-      raise stem.DescriptorUnavailable('Descriptor information is unavailable, tor might still be downloading it')
-
-    for desc in stem.descriptor.server_descriptor._parse_file(io.BytesIO(desc_content)):
+    async for desc in self._get_info_descriptors('desc/all-recent', b'router ', stem.descriptor.server_descriptor._parse_file):
       yield desc  # type: ignore
 
   @with_default()
@@ -2045,25 +2369,64 @@ class Controller(BaseController):
       default was provided
     """
 
-    # TODO: We should iterate over the descriptors as they're read from the
-    # socket rather than reading the whole thing into memory.
-    #
-    # https://github.com/torproject/stem/issues/30
-
-    desc_content = await self.get_info('ns/all', get_bytes = True)
-
-    if not desc_content:
-      raise stem.DescriptorUnavailable('Descriptor information is unavailable, tor might still be downloading it')
-
-    desc_iterator = stem.descriptor.router_status_entry._parse_file(
-      io.BytesIO(desc_content),
-      False,
+    parse_file = functools.partial(
+      stem.descriptor.router_status_entry._parse_file,
+      validate = False,
       entry_class = stem.descriptor.router_status_entry.RouterStatusEntryV3,
     )
 
-    for desc in desc_iterator:
+    async for desc in self._get_info_descriptors('ns/all', b'r ', parse_file):
       yield desc  # type: ignore
 
+  async def get_relay_directory(self) -> 'stem.control.RelayDirectory':
+    """
+    Provides the network statuses and microdescriptors of the relays tor knows
+    about. These are fetched from tor on our first call, then kept current
+    through NEWCONSENSUS, NS, and NEWDESC events, so unlike
+    :func:`~stem.control.Controller.get_network_statuses` and
+    :func:`~stem.control.Controller.get_microdescriptors` lookups don't
+    involve tor.
+
+    ::
+
+      directory = controller.get_relay_directory()
+
+      for desc in directory.find_by_nickname('moria1'):
+        print('%s is at %s:%i' % (desc.fingerprint, desc.address, desc.or_port))
+
+    The directory is reloaded if we reconnect, since we might have missed
+    events while disconnected.
+
+    .. versionadded:: 2.0.0
+
+    :returns: :class:`~stem.control.RelayDirectory` shared by all callers
+
+    :raises: :class:`stem.ControllerError` if unable to fetch the relays
+    """
+
+    # Concurrent callers wait for the first to load our directory, rather than
+    # each making their own.
+
+    async with self._relay_directory_lock:
+      if self._relay_directory is None:
+        directory = RelayDirectory(self)
+
+        # Listening first so we don't miss changes while loading. Fetching
+        # microdescriptors for NEWDESC events takes a round trip, so this is
+        # queued to not delay other listeners.
+
+        await self.add_event_listener(directory._handle_event, EventType.NEWCONSENSUS, EventType.NS, EventType.NEWDESC, concurrency = 1)
+
+        try:
+          await directory._load()
+        except:
+          await self.remove_event_listener(directory._handle_event)
+          raise
+
+        self._relay_directory = directory
+
+      return self._relay_directory
+
   @with_default()
   async def get_hidden_service_descriptor(self, address: str, default: Any = UNDEFINED, servers: Optional[Sequence[str]] = None, await_result: bool = True, timeout: Optional[float] = None) -> stem.descriptor.hidden_service.HiddenServiceDescriptorV2:
     """
@@ -2485,27 +2848,21 @@ class Controller(BaseController):
     """
 
     start_time = time.time()
+    query, params_list = _set_options_query(params, reset)
+    response = stem.response._convert_to_single_line(await self.msg(query))
+    self._handle_set_options_response(query, params_list, response, start_time)
 
-    # constructs the SETCONF or RESETCONF query
-    query_comp = ['RESETCONF' if reset else 'SETCONF']
+  def _handle_set_options_response(self, query: str, params_list: Sequence[Tuple[str, Union[str, Sequence[str]]]], response: stem.response.SingleLineResponse, start_time: float) -> None:
+    """
+    Processes tor's reply to a SETCONF or RESETCONF query.
 
-    if isinstance(params, dict):
-      params_list = list(params.items())
-    else:
-      params_list = params  # type: ignore # type: Sequence[Tuple[str, Union[str, Sequence[str]]]]
-
-    for param, value in params_list:
-      if isinstance(value, str):
-        query_comp.append('%s="%s"' % (param, value.strip()))
-      elif isinstance(value, collections.abc.Iterable):
-        query_comp.extend(['%s="%s"' % (param, val.strip()) for val in value])
-      elif not value:
-        query_comp.append(param)
-      else:
-        raise ValueError('Cannot set %s to %s since the value was a %s but we only accept strings' % (param, value, type(value).__name__))
+    :param query: query that was sent to tor
+    :param params_list: **(key, value)** tuples that were set
+    :param response: tor's reply
+    :param start_time: unix timestamp when our query was issued
 
-    query = ' '.join(query_comp)
-    response = stem.response._convert_to_single_line(await self.msg(query))
+    :raises: same exceptions as :func:`~stem.control.Controller.set_options`
+    """
 
     if response.is_ok():
       log.debug('%s (runtime: %0.4f)' % (query, time.time() - start_time))
@@ -3200,7 +3557,7 @@ class Controller(BaseController):
     else:
       return response.credentials
 
-  async def add_event_listener(self, listener: Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], *events: 'stem.control.EventType') -> None:
+  async def add_event_listener(self, listener: Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], *events: 'stem.control.EventType', concurrency: Optional[int] = None, queue_size: int = 1000, overflow: 'stem.control.EventOverflow' = EventOverflow.BLOCK, lazy: bool = False, window: Optional[float] = None, sample: Optional[int] = None) -> None:
     """
     Directs further tor controller events to a given function. The function is
     expected to take a single argument, which is a
@@ -3226,15 +3583,72 @@ class Controller(BaseController):
     If tor emits a malformed event it can be received by listening for the
     stem.control.MALFORMED_EVENTS constant.
 
+    Listeners are called one after another as events arrive, so a slow
+    listener delays all others. When a **concurrency** is provided the
+    listener instead receives events through its own queue, with that many
+    tasks awaiting it. Events are then delivered in order only if its
+    concurrency is one. If the queue fills the **overflow** policy decides if
+    we wait for it or drop events.
+
+    Events are parsed as they arrive, unless every listener for their type is
+    **lazy**. Lazy listeners receive events whose attributes are parsed upon
+    first access, which is far cheaper for listeners that only read a field or
+    two of frequent events such as BW or STREAM_BW. Malformed events then raise
+    a :class:`stem.ProtocolError` when read rather than going to
+    **MALFORMED_EVENTS** listeners.
+
+    Bandwidth events (**BW**, **STREAM_BW**, **CIRC_BW**, **CONN_BW**, and
+    **CELL_STATS**) arrive every second for each circuit, stream, and
+    connection. When a **window** is provided these are coalesced, and the
+    listener instead receives a :class:`~stem.control.BandwidthSummary` for
+    each type every that many seconds...
+
+    ::
+
+      def print_circuits(summary):
+        for circ_id, (read, written) in summary.by_id.items():
+          print('circuit %s: %i read, %i written' % (circ_id, read, written))
+
+      controller.add_event_listener(print_circuits, EventType.CIRC_BW, window = 10)
+
+    A **sample** rate keeps one of every that many bandwidth events. These are
+    the summary's **samples**, or delivered individually if we lack a window.
+
     .. versionchanged:: 1.7.0
        Listener exceptions and malformed events no longer break further event
        processing. Added the **MALFORMED_EVENTS** constant.
 
+    .. versionchanged:: 2.0.0
+       Added the **concurrency**, **queue_size**, **overflow**, **lazy**,
+       **window**, and **sample** arguments.
+
     :param listener: function to be called when an event is received
     :param events: event types to be listened for
+    :param concurrency: number of events the listener may process at once,
+      delivering events through its own queue if set
+    :param queue_size: maximum number of events the listener's queue holds
+    :param overflow: :data:`~stem.control.EventOverflow` action when the
+      listener's queue is full
+    :param lazy: parse event attributes upon first access
+    :param window: seconds over which bandwidth events are coalesced
+    :param sample: deliver one of every this many bandwidth events
 
-    :raises: :class:`stem.ProtocolError` if unable to set the events
-    """
+    :raises:
+      * :class:`stem.ProtocolError` if unable to set the events
+      * **ValueError** if the concurrency, queue_size, or sample are less than
+        one, or the window isn't positive
+    """
+
+    if concurrency is not None and concurrency < 1:
+      raise ValueError('Listener concurrency must be at least one, got %i' % concurrency)
+    elif queue_size < 1:
+      raise ValueError('Listener queue size must be at least one, got %i' % queue_size)
+    elif overflow not in EventOverflow:
+      raise ValueError("'%s' isn't an EventOverflow" % overflow)
+    elif window is not None and window <= 0:
+      raise ValueError('Listener window must be positive, got %s' % window)
+    elif sample is not None and sample < 1:
+      raise ValueError('Listener sample rate must be at least one, got %i' % sample)
 
     # first checking that tor supports these event types
 
@@ -3249,6 +3663,27 @@ class Controller(BaseController):
       for event_type in events:
         self._event_listeners.setdefault(event_type, []).append(listener)
 
+      if lazy:
+        self._lazy_listeners.add(listener)
+      else:
+        self._lazy_listeners.discard(listener)
+
+      prior_aggregator = self._listener_aggregators.pop(listener, None)
+
+      if prior_aggregator:
+        prior_aggregator.stop()
+
+      if window is not None or sample is not None:
+        self._listener_aggregators[listener] = _EventAggregator(functools.partial(self._deliver_event, listener), window, sample)
+
+      if concurrency is not None:
+        prior_queue = self._listener_queues.pop(listener, None)
+
+        if prior_queue:
+          prior_queue.stop()
+
+        self._listener_queues[listener] = _ListenerQueue(listener, concurrency, queue_size, overflow)
+
       failed_events = (await self._attach_listeners())[1]
 
       # restricted the failures to just things we requested
@@ -3278,6 +3713,16 @@ class Controller(BaseController):
             event_types_changed = True
             del self._event_listeners[event_type]
 
+      listener_queue = self._listener_queues.pop(listener, None)
+      listener_aggregator = self._listener_aggregators.pop(listener, None)
+      self._lazy_listeners.discard(listener)
+
+      if listener_aggregator:
+        listener_aggregator.stop()
+
+      if listener_queue:
+        listener_queue.stop()
+
       if event_types_changed:
         response = await self.msg('SETEVENTS %s' % ' '.join(self._event_listeners.keys()))
 
@@ -3298,8 +3743,7 @@ class Controller(BaseController):
       if not self.is_caching_enabled():
         return None
 
-      cache_key = '%s.%s' % (namespace, param) if namespace else param
-      return self._request_cache.get(cache_key, None)
+      return self._request_cache.get(param, namespace)
 
   def _get_cache_map(self, params: Sequence[str], namespace: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -3316,10 +3760,10 @@ class Controller(BaseController):
 
       if self.is_caching_enabled():
         for param in params:
-          cache_key = '%s.%s' % (namespace, param) if namespace else param
+          value = self._request_cache.get(param, namespace)
 
-          if cache_key in self._request_cache:
-            cached_values[param] = self._request_cache[cache_key]
+          if value is not None:
+            cached_values[param] = value
 
       return cached_values
 
@@ -3339,10 +3783,7 @@ class Controller(BaseController):
       # if params is None then clear the namespace
 
       if params is None and namespace:
-        for cache_key in list(self._request_cache.keys()):
-          if cache_key.startswith('%s.' % namespace):
-            del self._request_cache[cache_key]
-
+        self._request_cache.clear(namespace)
         return
 
       # remove uncacheable items
@@ -3354,16 +3795,7 @@ class Controller(BaseController):
             del params[key]
 
       for key, value in list(params.items()):
-        if namespace:
-          cache_key = '%s.%s' % (namespace, key)
-        else:
-          cache_key = key
-
-        if value is None:
-          if cache_key in list(self._request_cache.keys()):
-            del self._request_cache[cache_key]
-        else:
-          self._request_cache[cache_key] = value
+        self._request_cache.set(key, value, namespace)
 
   def _confchanged_cache_invalidation(self, params: Mapping[str, Any]) -> None:
     """
@@ -3416,9 +3848,29 @@ class Controller(BaseController):
     """
 
     with self._cache_lock:
-      self._request_cache = {}
+      self._request_cache.clear()
       self._last_newnym = 0.0
 
+  def get_cache(self) -> stem.util.cache.RequestCache:
+    """
+    Provides the cache we store tor's responses within. This can be used to
+    check its effectiveness or adjust its size and expiration. For example...
+
+    ::
+
+      cache = controller.get_cache()
+      cache.set_max_size(10000)
+      cache.set_ttl('getinfo', 3600)
+
+      print('cache hit ratio: %0.2f' % cache.stats().hit_ratio())
+
+    .. versionadded:: 2.0.0
+
+    :returns: :class:`~stem.util.cache.RequestCache` used by this controller
+    """
+
+    return self._request_cache
+
   async def load_conf(self, configtext: str) -> None:
     """
     Sends the configuration text to Tor and loads it as if it has been read from
@@ -3818,6 +4270,17 @@ class Controller(BaseController):
     """
 
     response = stem.response._convert_to_single_line(await self.msg('SIGNAL %s' % signal))
+    self._handle_signal_response(signal, response)
+
+  def _handle_signal_response(self, signal: stem.Signal, response: stem.response.SingleLineResponse) -> None:
+    """
+    Processes tor's reply to a SIGNAL request.
+
+    :param signal: signal that was sent
+    :param response: tor's reply
+
+    :raises: same exceptions as :func:`~stem.control.Controller.signal`
+    """
 
     if response.is_ok():
       if signal == stem.Signal.NEWNYM:
@@ -3976,11 +4439,30 @@ class Controller(BaseController):
       else:
         log.warn('We were unable assert ownership of tor through TAKEOWNERSHIP, despite being configured to be the owning process through __OwningControllerProcess. (%s)' % response)
 
+    # we might have missed events while disconnected
+
+    if self._relay_directory:
+      try:
+        await self._relay_directory._load()
+      except stem.ControllerError as exc:
+        log.warn('Unable to reload our relay directory (%s)' % exc)
+
   async def _handle_event(self, event_message: stem.response.ControlMessage) -> None:
     event = None  # type: Optional[stem.response.events.Event]
 
+    # Check who's listening before parsing the event. When nobody is we can
+    # skip its conversion entirely.
+
+    event_type = stem.response.events._event_type(event_message)
+    event_listeners = self._event_listeners.get(event_type, ())
+
+    if not event_listeners and MALFORMED_EVENTS not in self._event_listeners:
+      return
+
+    lazy = bool(event_listeners) and all([listener in self._lazy_listeners for listener in event_listeners])
+
     try:
-      event = stem.response._convert_to_event(event_message)
+      event = stem.response._convert_to_event(event_message, lazy = lazy)
       event_type = event.type
     except stem.ProtocolError as exc:
       # TODO: We should change this so malformed events convert to the base
@@ -3991,17 +4473,44 @@ class Controller(BaseController):
       log.error('Tor sent a malformed event (%s): %s' % (exc, event_message))
       event_type = MALFORMED_EVENTS
 
-    async with self._event_listeners_lock:
-      for listener_type, event_listeners in list(self._event_listeners.items()):
-        if listener_type == event_type:
-          for listener in event_listeners:
-            try:
-              listener_call = listener(event)
+    # Copying our listeners so they can be added or removed while we're
+    # awaiting them (including by the listeners themselves).
+
+    event_listeners = list(self._event_listeners.get(event_type, ()))
+    is_malformed = False
+
+    for listener in event_listeners:
+      listener_aggregator = self._listener_aggregators.get(listener)
+
+      if listener_aggregator and event_type in COALESCED_EVENTS:
+        try:
+          is_individual = listener_aggregator.add(event)
+        except stem.ProtocolError as exc:
+          # Lazy events aren't parsed until we aggregate them, so this is
+          # where we learn that they're malformed.
+
+          if not is_malformed:
+            log.error('Tor sent a malformed event (%s): %s' % (exc, event_message))
+
+          is_malformed = True
+          continue
+
+        if not is_individual:
+          continue  # coalesced into a summary or skipped by our sample rate
 
-              if asyncio.iscoroutine(listener_call):
-                await listener_call
-            except Exception as exc:
-              log.warn('Event listener raised an uncaught exception (%s): %s' % (exc, event))
+      await self._deliver_event(listener, event)
+
+    if is_malformed:
+      for listener in list(self._event_listeners.get(MALFORMED_EVENTS, ())):
+        await self._deliver_event(listener, event_message)  # type: ignore
+
+  async def _deliver_event(self, listener: Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], event: Union[stem.response.events.Event, 'stem.control.BandwidthSummary']) -> None:
+    listener_queue = self._listener_queues.get(listener)
+
+    if listener_queue:
+      await listener_queue.put(event)
+    else:
+      await _notify_listener(listener, event)
 
   async def _attach_listeners(self) -> Tuple[Sequence[str], Sequence[str]]:
     """
@@ -4045,10 +4554,896 @@ class Controller(BaseController):
 
     return (set_events, failed_events)
 
+  async def _get_info_descriptors(self, param: str, start_keyword: bytes, parse_file: Callable[[BinaryIO], Iterator[stem.descriptor.Descriptor]]) -> AsyncIterator[stem.descriptor.Descriptor]:
+    """
+    Provides the descriptors of a GETINFO data reply, parsing them while the
+    rest of the reply is still being received.
 
-def _parse_circ_path(path: str) -> Sequence[Tuple[str, str]]:
-  """
-  Parses a circuit path as a list of **(fingerprint, nickname)** tuples. Tor
+    :param param: GETINFO parameter to request
+    :param start_keyword: keyword of the line that begins each descriptor
+    :param parse_file: function that parses descriptors from a file
+
+    :returns: iterates over the descriptors of tor's reply
+
+    :raises:
+      * :class:`stem.DescriptorUnavailable` if tor has no descriptors
+      * :class:`stem.ControllerError` if unable to query tor
+    """
+
+    stream = _DescriptorStream(start_keyword)
+
+    try:
+      waiter = (await self._send_pipelined(['GETINFO %s' % param], [stream.add_line]))[0]
+    except stem.SocketClosed:
+      await self.close()
+      raise
+
+    async def await_reply() -> Union[stem.response.ControlMessage, stem.ControllerError]:
+      # Unlike msg() we don't time out since large replies can take a while.
+
+      try:
+        return await waiter
+      finally:
+        await stream.finish()
+
+    reply_task = asyncio.ensure_future(await_reply())
+
+    try:
+      async for chunk in stream.chunks():
+        for desc in parse_file(io.BytesIO(chunk)):
+          yield desc
+
+      response = await reply_task
+
+      if isinstance(response, stem.SocketClosed):
+        await self.close()
+        raise response
+      elif isinstance(response, stem.ControllerError):
+        raise response
+
+      stem.response._convert_to_getinfo(response)._assert_matches(set([param]))
+
+      if not stream.received:
+        raise stem.DescriptorUnavailable('Descriptor information is unavailable, tor might still be downloading it')
+    finally:
+      # if our caller stops iterating early we discard the rest of the reply
+
+      stream.close()
+      reply_task.cancel()
+
+
+class _ListenerQueue(object):
+  """
+  Delivers events to a listener through a bounded queue, awaited by its own
+  tasks so a slow listener doesn't delay the others.
+
+  :var int dropped: number of events discarded because the queue was full
+  """
+
+  def __init__(self, listener: Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], concurrency: int, queue_size: int, overflow: 'stem.control.EventOverflow') -> None:
+    self.dropped = 0
+
+    self._listener = listener
+    self._concurrency = concurrency
+    self._queue_size = queue_size
+    self._overflow = overflow
+
+    self._queue = None  # type: Optional[asyncio.Queue[Union[stem.response.events.Event, stem.control.BandwidthSummary]]]
+    self._workers = []  # type: List[asyncio.Task]
+
+  async def put(self, event: Union[stem.response.events.Event, 'stem.control.BandwidthSummary']) -> None:
+    """
+    Enqueues an event for our listener, starting our tasks if they aren't
+    already running.
+
+    :param event: event to be delivered
+    """
+
+    if self._queue is None:
+      self._queue = asyncio.Queue(self._queue_size)
+      self._workers = [asyncio.ensure_future(self._deliver(self._queue)) for _ in range(self._concurrency)]
+
+    if self._queue.full():
+      if self._overflow == EventOverflow.DROP_NEWEST:
+        self._drop(event)
+        return
+      elif self._overflow == EventOverflow.DROP_OLDEST:
+        self._drop(self._queue.get_nowait())
+        self._queue.task_done()
+
+    await self._queue.put(event)
+
+  async def join(self) -> None:
+    """
+    Blocks until our listener has processed all enqueued events.
+    """
+
+    if self._queue is not None:
+      await self._queue.join()
+
+  def stop(self) -> None:
+    """
+    Stops our tasks, discarding any events that haven't yet been delivered.
+    These are restarted if more events are enqueued.
+    """
+
+    for worker in self._workers:
+      worker.cancel()
+
+    self._queue = None
+    self._workers = []
+
+  def _drop(self, event: Union[stem.response.events.Event, 'stem.control.BandwidthSummary']) -> None:
+    self.dropped += 1
+    log.log_once('stem.controller.listener_overflow-%s' % id(self._listener), log.WARN, 'Event listener %s is falling behind, dropping events (%s)' % (self._listener, event))
+
+  async def _deliver(self, queue: 'asyncio.Queue[Union[stem.response.events.Event, stem.control.BandwidthSummary]]') -> None:
+    while True:
+      event = await queue.get()
+
+      try:
+        await _notify_listener(self._listener, event)
+      finally:
+        queue.task_done()
+
+
+class _EventAggregator(object):
+  """
+  Coalesces a listener's bandwidth events into a
+  :class:`~stem.control.BandwidthSummary` for each type, delivered by our own
+  task at the end of every window.
+  """
+
+  def __init__(self, deliver: Callable[[Any], Awaitable[None]], window: Optional[float], sample: Optional[int]) -> None:
+    self._deliver = deliver
+    self._window = window
+    self._sample = sample
+
+    self._received = collections.Counter()  # type: collections.Counter[str]
+    self._summaries = {}  # type: Dict[str, stem.control.BandwidthSummary]
+    self._task = None  # type: Optional[asyncio.Task]
+
+  def add(self, event: stem.response.events.Event) -> bool:
+    """
+    Adds an event to our summary of its type.
+
+    :param event: bandwidth event that was received
+
+    :returns: **True** if the event should be delivered individually,
+      **False** otherwise
+    """
+
+    self._received[event.type] += 1
+    is_sampled = self._sample is None or (self._received[event.type] - 1) % self._sample == 0
+
+    if self._window is None:
+      return is_sampled
+
+    summary = self._summaries.get(event.type)
+
+    if summary is None:
+      summary = BandwidthSummary(event.type, time.time(), None, 0, 0, 0, {}, {}, [])
+
+    read = getattr(event, 'read', None) or 0
+    written = getattr(event, 'written', None) or 0
+
+    if event.type in ('STREAM_BW', 'CIRC_BW', 'CONN_BW'):
+      prior_read, prior_written = summary.by_id.get(event.id, (0, 0))
+      summary.by_id[event.id] = (prior_read + read, prior_written + written)
+    elif event.type == 'CELL_STATS':
+      cells = summary.cells.setdefault(event.id, collections.Counter())
+      cells.update(event.inbound_added or {})
+      cells.update(event.outbound_added or {})
+
+    if is_sampled:
+      summary.samples.append(event)
+
+    self._summaries[event.type] = summary._replace(events = summary.events + 1, read = summary.read + read, written = summary.written + written)
+
+    if self._task is None:
+      self._task = asyncio.ensure_future(self._flush_periodically())
+
+    return False
+
+  async def flush(self) -> None:
+    """
+    Delivers the summaries we've gathered so far.
+    """
+
+    summaries, self._summaries = self._summaries, {}
+
+    for summary in summaries.values():
+      await self._deliver(summary._replace(end = time.time()))
+
+  def stop(self) -> None:
+    """
+    Stops our task, discarding any summaries that haven't been delivered.
+    """
+
+    if self._task:
+      self._task.cancel()
+
+    self._task = None
+    self._summaries = {}
+
+  async def _flush_periodically(self) -> None:
+    while True:
+      await asyncio.sleep(self._window)
+      await self.flush()
+
+
+class _DescriptorStream(object):
+  """
+  Gathers the lines of a data reply into chunks of whole descriptors, so
+  they can be parsed while the rest of the reply is received. Our queue is
+  unbounded because it's filled by our reader loop, which must never wait on
+  our consumer. Otherwise requests made while iterating over our descriptors,
+  and events, couldn't be received.
+
+  :var bool received: **True** if the reply had any content, **False** otherwise
+  """
+
+  def __init__(self, start_keyword: bytes) -> None:
+    self.received = False
+
+    self._start_keyword = start_keyword
+    self._queue = asyncio.Queue()  # type: asyncio.Queue[Optional[bytes]]
+    self._lines = []  # type: List[bytes]
+    self._size = 0
+    self._is_closed = False
+
+  async def add_line(self, line: Optional[bytes]) -> None:
+    """
+    Adds a line from our data reply, or **None** when it concludes.
+
+    :param line: content of the line without its CRLF
+    """
+
+    if self._is_closed:
+      return
+    elif line is None:
+      await self._flush()
+      return
+
+    if self._size >= DATA_STREAM_CHUNK_SIZE and line.startswith(self._start_keyword):
+      await self._flush()
+
+    self.received = True
+    self._lines.append(line)
+    self._size += len(line) + 1
+
+  async def chunks(self) -> AsyncIterator[bytes]:
+    """
+    Provides our chunks as they become available, concluding after
+    :func:`~stem.control._DescriptorStream.finish` is called.
+    """
+
+    while True:
+      chunk = await self._queue.get()
+
+      if chunk is None:
+        break
+
+      yield chunk
+
+  async def finish(self) -> None:
+    """
+    Indicates that we won't receive any further content.
+    """
+
+    if not self._is_closed:
+      await self._queue.put(None)
+
+  def close(self) -> None:
+    """
+    Discards any remaining content.
+    """
+
+    self._is_closed = True
+
+    while not self._queue.empty():
+      self._queue.get_nowait()
+
+  async def _flush(self) -> None:
+    if self._lines:
+      chunk = b'\n'.join(self._lines)
+      self._lines, self._size = [], 0
+      await self._queue.put(chunk)
+
+
+async def _notify_listener(listener: Callable[[stem.response.events.Event], Union[None, Awaitable[None]]], event: Union[stem.response.events.Event, 'stem.control.BandwidthSummary']) -> None:
+  """
+  Provides an event to a listener, logging rather than raising its exceptions.
+  """
+
+  try:
+    listener_call = listener(event)
+
+    if asyncio.iscoroutine(listener_call):
+      await listener_call
+  except Exception as exc:
+    log.warn('Event listener raised an uncaught exception (%s): %s' % (exc, event))
+
+
+class RequestBatch(object):
+  """
+  Gathers :class:`~stem.control.Controller` requests so they can be sent to
+  tor together. Adjacent GETINFO and GETCONF requests are merged into a single
+  query, and everything is written to the socket at once so the batch costs a
+  single round trip. This is provided by the
+  :func:`~stem.control.Controller.batch` method...
+
+  ::
+
+    async with controller.batch() as batch:
+      version = batch.get_info('version')
+      traffic = batch.get_info(['traffic/read', 'traffic/written'])
+      exit_policy = batch.get_conf('ExitPolicy', multiple = True)
+      batch.signal(Signal.NEWNYM)
+
+    print('tor version: %s' % version.result())
+
+  Our methods provide an **asyncio.Future** that's resolved when the batch is
+  sent. Their results are the same as the
+  :class:`~stem.control.Controller` method of the same name. If a request
+  fails its future raises the exception, unless it was provided a default.
+
+  GETINFO and GETCONF requests are only merged when they aren't separated by
+  a SETCONF or SIGNAL, so reads reflect the changes made before them. If a
+  merged query fails then every request within it fails. Batched reads are
+  always sent to tor rather than answered by our cache.
+
+  Synchronous callers can use **with** rather than **async with**, except
+  within our controller's event loop (such as an event listener), where
+  waiting for our replies would block the loop that receives them.
+
+  .. versionadded:: 2.0.0
+  """
+
+  def __init__(self, controller: 'stem.control.Controller') -> None:
+    self._controller = controller
+    self._requests = []  # type: List[Tuple[str, Any, asyncio.Future]]
+    self._is_sent = False
+
+  def get_info(self, params: Union[str, Sequence[str]], default: Any = UNDEFINED, get_bytes: bool = False) -> asyncio.Future:
+    """
+    Queues a GETINFO request. See :func:`~stem.control.Controller.get_info`
+    for our arguments and result.
+
+    :returns: **asyncio.Future** for the GETINFO response
+    """
+
+    if not isinstance(params, (bytes, str)) and not params:
+      future = self._add('GETINFO', None, queue = False)
+      future.set_result({})
+      return future
+
+    return self._add('GETINFO', (params, default, get_bytes))
+
+  def get_conf(self, param: str, default: Any = UNDEFINED, multiple: bool = False) -> asyncio.Future:
+    """
+    Queues a GETCONF request. See :func:`~stem.control.Controller.get_conf`
+    for our arguments and result.
+
+    :returns: **asyncio.Future** for the configuration value
+    """
+
+    param = param.lower().strip()
+
+    if not param:
+      future = self._add('GETCONF', None, queue = False)
+      future.set_result(default if default != UNDEFINED else None)
+      return future
+
+    return self._add('GETCONF', (param, default, multiple))
+
+  def set_conf(self, param: str, value: Union[str, Sequence[str]]) -> asyncio.Future:
+    """
+    Queues a SETCONF request. See :func:`~stem.control.Controller.set_conf`
+    for our arguments.
+
+    :returns: **asyncio.Future** that's resolved with **None** when successful
+
+    :raises: **ValueError** if the value isn't a str, list, or None
+    """
+
+    return self._add('SETCONF', _set_options_query({param: value}, False))
+
+  def signal(self, signal: stem.Signal) -> asyncio.Future:
+    """
+    Queues a SIGNAL request. See :func:`~stem.control.Controller.signal` for
+    our arguments.
+
+    :returns: **asyncio.Future** that's resolved with **None** when successful
+    """
+
+    return self._add('SIGNAL', signal)
+
+  async def send(self) -> None:
+    """
+    Sends our requests to tor and resolves their futures. This is done
+    automatically when our context exits, and is a no-op if we've already been
+    sent.
+    """
+
+    if self._is_sent:
+      return
+
+    self._is_sent = True
+    start_time = time.time()
+
+    # group requests that can be merged into a single query
+
+    groups = []  # type: List[Tuple[str, List[Tuple[str, Any, asyncio.Future]]]]
+    mergeable = {}  # type: Dict[str, List[Tuple[str, Any, asyncio.Future]]]
+
+    for request in self._requests:
+      command = request[0]
+
+      if command in ('GETINFO', 'GETCONF'):
+        if command not in mergeable:
+          mergeable[command] = []
+          groups.append((command, mergeable[command]))
+
+        mergeable[command].append(request)
+      else:
+        mergeable = {}
+        groups.append((command, [request]))
+
+    if not groups:
+      return
+
+    queries = [RequestBatch._query(command, requests) for command, requests in groups]
+
+    try:
+      waiters = await self._controller._send_pipelined(queries)
+      replies = await asyncio.wait_for(asyncio.gather(*waiters), MSG_TIMEOUT)  # type: Sequence[Union[stem.response.ControlMessage, stem.ControllerError]]
+    except asyncio.TimeoutError:
+      replies = [stem.ControllerError('%s failed to receive a reply within %i seconds' % (query, MSG_TIMEOUT)) for query in queries]
+    except stem.ControllerError as exc:
+      replies = [exc] * len(queries)
+
+    if any([isinstance(reply, stem.SocketClosed) for reply in replies]):
+      # as with msg(), assure callers that we're shut down when we provide
+      # them a SocketClosed
+
+      await self._controller.close()
+
+    for (command, requests), reply in zip(groups, replies):
+      self._resolve(command, requests, reply, start_time)
+
+    log.debug('Batch of %i requests (runtime: %0.4f)' % (len(self._requests), time.time() - start_time))
+
+  def _add(self, command: str, args: Any, queue: bool = True) -> asyncio.Future:
+    if self._is_sent:
+      raise ValueError('Requests cannot be added to a batch that has been sent')
+
+    future = self._controller._loop.create_future()
+
+    if queue:
+      self._requests.append((command, args, future))
+
+    return future
+
+  @staticmethod
+  def _query(command: str, requests: Sequence[Tuple[str, Any, asyncio.Future]]) -> str:
+    """
+    Provides the query for a group of requests.
+    """
+
+    if command in ('GETINFO', 'GETCONF'):
+      params = []  # type: List[str]
+
+      for _, args, _ in requests:
+        request_params = [args[0]] if isinstance(args[0], (bytes, str)) else args[0]
+
+        for param in request_params:
+          if command == 'GETCONF':
+            param = MAPPED_CONFIG_KEYS.get(param, param)
+
+          if param.lower() not in [entry.lower() for entry in params]:
+            params.append(param)
+
+      return '%s %s' % (command, ' '.join(params))
+    elif command == 'SETCONF':
+      return requests[0][1][0]
+    else:
+      return 'SIGNAL %s' % requests[0][1]
+
+  def _resolve(self, command: str, requests: Sequence[Tuple[str, Any, asyncio.Future]], reply: Union[stem.response.ControlMessage, stem.ControllerError], start_time: float) -> None:
+    """
+    Provides a group of requests with their results.
+    """
+
+    try:
+      if isinstance(reply, stem.ControllerError):
+        raise reply
+      elif command == 'GETINFO':
+        entries = stem.response._convert_to_getinfo(reply).entries  # type: Mapping[str, Any]
+      elif command == 'GETCONF':
+        entries = stem.response._convert_to_getconf(reply).entries
+      elif command == 'SETCONF':
+        query, params_list = requests[0][1]
+        self._controller._handle_set_options_response(query, params_list, stem.response._convert_to_single_line(reply), start_time)
+      else:
+        self._controller._handle_signal_response(requests[0][1], stem.response._convert_to_single_line(reply))
+    except stem.ControllerError as exc:
+      for _, args, future in requests:
+        default = args[1] if command in ('GETINFO', 'GETCONF') else UNDEFINED
+        RequestBatch._set_future(future, default, exc = exc)
+
+      return
+
+    for _, args, future in requests:
+      try:
+        if command == 'GETINFO':
+          params, default, get_bytes = args
+
+          def value(param: str) -> Any:
+            try:
+              content = _case_insensitive_lookup(entries, param)
+            except ValueError:
+              raise stem.ProtocolError("GETINFO reply doesn't include '%s'" % param)
+
+            return content if get_bytes else stem.util.str_tools._to_unicode(content)
+
+          if isinstance(params, (bytes, str)):
+            result = value(params)
+          else:
+            result = dict([(param, value(param)) for param in params])
+        elif command == 'GETCONF':
+          param, default, multiple = args
+          result = _case_insensitive_lookup(self._controller._get_conf_dict_to_response(entries, default, multiple), param, default)
+        else:
+          default, result = UNDEFINED, None
+
+        RequestBatch._set_future(future, default, result = result)
+      except Exception as exc:
+        RequestBatch._set_future(future, default, exc = exc)
+
+  @staticmethod
+  def _set_future(future: asyncio.Future, default: Any, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    if future.done():
+      pass
+    elif exc is None:
+      future.set_result(result)
+    elif default != UNDEFINED:
+      future.set_result(default)
+    else:
+      future.set_exception(exc)
+
+  def _cancel(self) -> None:
+    self._is_sent = True
+
+    for _, _, future in self._requests:
+      future.cancel()
+
+  async def __aenter__(self) -> 'stem.control.RequestBatch':
+    return self
+
+  async def __aexit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+    if exit_type is None:
+      await self.send()
+    else:
+      self._cancel()
+
+  def __enter__(self) -> 'stem.control.RequestBatch':
+    try:
+      is_within_loop = asyncio.get_running_loop() is self._controller._loop
+    except RuntimeError:
+      is_within_loop = False  # not within an event loop
+
+    if is_within_loop:
+      raise RuntimeError("Batches can't be used synchronously within our controller's event loop, please use 'async with controller.batch()' instead")
+
+    return self
+
+  def __exit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+    if exit_type is None:
+      asyncio.run_coroutine_threadsafe(self.send(), self._controller._loop).result()
+    else:
+      self._cancel()
+
+
+class RelayDirectory(object):
+  """
+  Network statuses and microdescriptors of the relays tor knows about, indexed
+  for quick lookups. This is provided by
+  :func:`~stem.control.Controller.get_relay_directory`, which keeps it in
+  sync with tor's NEWCONSENSUS, NS, and NEWDESC events.
+
+  Fingerprints, nicknames, and addresses are matched case insensitively.
+
+  .. versionadded:: 2.0.0
+  """
+
+  def __init__(self, controller: 'stem.control.Controller') -> None:
+    self._controller = controller
+    self._lock = threading.RLock()
+
+    self._statuses = {}  # type: Dict[str, stem.descriptor.router_status_entry.RouterStatusEntryV3]
+    self._microdescriptors = {}  # type: Dict[str, stem.descriptor.microdescriptor.Microdescriptor]
+
+    # lowercase nickname or address => fingerprints
+
+    self._by_nickname = {}  # type: Dict[str, Set[str]]
+    self._by_address = {}  # type: Dict[str, Set[str]]
+
+    # events that arrive while we're loading, which are applied afterward so
+    # our snapshot doesn't clobber them
+
+    self._pending = []  # type: Optional[List[stem.response.events.Event]]
+
+  def get_network_status(self, fingerprint: str) -> Optional[stem.descriptor.router_status_entry.RouterStatusEntryV3]:
+    """
+    Provides the router status entry of a relay.
+
+    :param fingerprint: fingerprint of the relay
+
+    :returns: :class:`~stem.descriptor.router_status_entry.RouterStatusEntryV3`
+      of the relay, or **None** if it isn't in the consensus
+    """
+
+    return self._statuses.get(fingerprint.upper())
+
+  def get_network_statuses(self) -> List[stem.descriptor.router_status_entry.RouterStatusEntryV3]:
+    """
+    Provides the router status entries of all relays.
+
+    :returns: **list** of :class:`~stem.descriptor.router_status_entry.RouterStatusEntryV3`
+    """
+
+    with self._lock:
+      return list(self._statuses.values())
+
+  def get_microdescriptor(self, fingerprint: str) -> Optional[stem.descriptor.microdescriptor.Microdescriptor]:
+    """
+    Provides the microdescriptor of a relay.
+
+    :param fingerprint: fingerprint of the relay
+
+    :returns: :class:`~stem.descriptor.microdescriptor.Microdescriptor` of the
+      relay, or **None** if tor doesn't have it
+    """
+
+    return self._microdescriptors.get(fingerprint.upper())
+
+  def get_microdescriptors(self) -> List[stem.descriptor.microdescriptor.Microdescriptor]:
+    """
+    Provides the microdescriptors of all relays.
+
+    :returns: **list** of :class:`~stem.descriptor.microdescriptor.Microdescriptor`
+    """
+
+    with self._lock:
+      return list(self._microdescriptors.values())
+
+  def find_by_nickname(self, nickname: str) -> List[stem.descriptor.router_status_entry.RouterStatusEntryV3]:
+    """
+    Provides the relays with a nickname. Nicknames aren't unique, so this can
+    match several relays.
+
+    :param nickname: nickname to look for
+
+    :returns: **list** of :class:`~stem.descriptor.router_status_entry.RouterStatusEntryV3`
+      for relays with this nickname
+    """
+
+    with self._lock:
+      return [self._statuses[fingerprint] for fingerprint in sorted(self._by_nickname.get(nickname.lower(), ()))]
+
+  def find_by_address(self, address: str) -> List[stem.descriptor.router_status_entry.RouterStatusEntryV3]:
+    """
+    Provides the relays with an IPv4 or IPv6 address, either as their address
+    or among their ORPorts.
+
+    :param address: address to look for
+
+    :returns: **list** of :class:`~stem.descriptor.router_status_entry.RouterStatusEntryV3`
+      for relays with this address
+    """
+
+    with self._lock:
+      return [self._statuses[fingerprint] for fingerprint in sorted(self._by_address.get(_address_key(address), ()))]
+
+  def __len__(self) -> int:
+    return len(self._statuses)
+
+  async def _load(self) -> None:
+    """
+    Fetches the network statuses and microdescriptors of all relays, replacing
+    our present content. Events we receive meanwhile are applied afterward.
+
+    :raises: :class:`stem.ControllerError` if unable to query tor
+    """
+
+    if self._pending is None:
+      self._pending = []
+
+    try:
+      statuses = [desc async for desc in self._controller.get_network_statuses()]
+      microdescriptors = await self._fetch_microdescriptors([desc.fingerprint for desc in statuses])
+
+      with self._lock:
+        self._set_statuses(statuses)
+        self._microdescriptors = microdescriptors
+    finally:
+      # Events that arrive while we replay are appended to this list too, so
+      # they're still applied in order.
+
+      while self._pending:
+        await self._apply_event(self._pending.pop(0))
+
+      self._pending = None
+
+  async def _handle_event(self, event: stem.response.events.Event) -> None:
+    if self._pending is not None:
+      self._pending.append(event)
+    else:
+      await self._apply_event(event)
+
+  async def _apply_event(self, event: stem.response.events.Event) -> None:
+    if isinstance(event, stem.response.events.NewConsensusEvent):
+      # relays absent from a new consensus are no longer listed
+
+      with self._lock:
+        previous = set(self._statuses)
+        self._set_statuses(event.entries())
+
+        for fingerprint in set(self._microdescriptors).difference(self._statuses):
+          del self._microdescriptors[fingerprint]
+
+        fingerprints = [fingerprint for fingerprint in self._statuses if fingerprint not in previous]
+    elif isinstance(event, stem.response.events.NetworkStatusEvent):
+      with self._lock:
+        fingerprints = [desc.fingerprint.upper() for desc in event.descriptors if desc.fingerprint.upper() not in self._statuses]
+
+        for desc in event.descriptors:
+          self._remove_status(desc.fingerprint)
+          self._add_status(desc)
+    elif isinstance(event, stem.response.events.NewDescEvent):
+      fingerprints = [fingerprint for fingerprint, _ in event.relays if fingerprint]
+    else:
+      return
+
+    # relays we've just learned about need their microdescriptors too
+
+    if fingerprints:
+      try:
+        microdescriptors = await self._fetch_microdescriptors(fingerprints)
+      except stem.ControllerError as exc:
+        log.info('Unable to fetch new microdescriptors (%s)' % exc)
+        return
+
+      with self._lock:
+        self._microdescriptors.update(microdescriptors)
+
+  async def _fetch_microdescriptors(self, fingerprints: Sequence[str]) -> Dict[str, stem.descriptor.microdescriptor.Microdescriptor]:
+    """
+    Requests microdescriptors from tor in batches. Tor rejects a request if it
+    lacks any of its microdescriptors, so when that happens we retry without
+    them.
+    """
+
+    microdescriptors = {}
+
+    for i in range(0, len(fingerprints), MICRODESCRIPTOR_BATCH_SIZE):
+      params = ['md/id/%s' % fingerprint.upper() for fingerprint in fingerprints[i:i + MICRODESCRIPTOR_BATCH_SIZE]]
+      reply = {}  # type: Dict[str, bytes]
+
+      while params:
+        try:
+          reply = await self._controller.get_info(params, get_bytes = True)
+          break
+        except stem.InvalidArguments as exc:
+          unavailable = set(exc.arguments or ())
+          available = [param for param in params if param not in unavailable]
+
+          if len(available) == len(params):
+            raise
+
+          params = available
+
+      for param, desc_content in reply.items():
+        if desc_content:
+          microdescriptors[param[6:].upper()] = stem.descriptor.microdescriptor.Microdescriptor(desc_content)
+
+    return microdescriptors
+
+  def _set_statuses(self, statuses: Sequence[stem.descriptor.router_status_entry.RouterStatusEntryV3]) -> None:
+    self._statuses, self._by_nickname, self._by_address = {}, {}, {}
+
+    for desc in statuses:
+      self._add_status(desc)
+
+  def _add_status(self, desc: stem.descriptor.router_status_entry.RouterStatusEntryV3) -> None:
+    fingerprint = desc.fingerprint.upper()
+    self._statuses[fingerprint] = desc
+    self._by_nickname.setdefault(desc.nickname.lower(), set()).add(fingerprint)
+
+    for address in _status_addresses(desc):
+      self._by_address.setdefault(address, set()).add(fingerprint)
+
+  def _remove_status(self, fingerprint: str) -> None:
+    desc = self._statuses.pop(fingerprint.upper(), None)
+
+    if desc is None:
+      return
+
+    for index, keys in ((self._by_nickname, [desc.nickname.lower()]), (self._by_address, _status_addresses(desc))):
+      for key in keys:
+        fingerprints = index.get(key)
+
+        if fingerprints:
+          fingerprints.discard(desc.fingerprint.upper())
+
+          if not fingerprints:
+            del index[key]
+
+
+def _status_addresses(desc: stem.descriptor.router_status_entry.RouterStatusEntryV3) -> Set[str]:
+  """
+  Provides the normalized addresses of a router status entry.
+  """
+
+  addresses = set([_address_key(desc.address)]) if desc.address else set()
+
+  for address, _, _ in desc.or_addresses:
+    addresses.add(_address_key(address))
+
+  return addresses
+
+
+def _address_key(address: str) -> str:
+  """
+  Normalizes an address so differently written IPv6 addresses match.
+  """
+
+  address = address.strip('[]')
+
+  if stem.util.connection.is_valid_ipv6_address(address):
+    return stem.util.connection.expand_ipv6_address(address).lower()
+
+  return address.lower()
+
+
+def _set_options_query(params: Union[Mapping[str, Union[str, Sequence[str]]], Sequence[Tuple[str, Union[str, Sequence[str]]]]], reset: bool) -> Tuple[str, Sequence[Tuple[str, Union[str, Sequence[str]]]]]:
+  """
+  Constructs the SETCONF or RESETCONF query for
+  :func:`~stem.control.Controller.set_options`.
+
+  :param params: mapping of configuration options to the values we're setting
+    it to
+  :param reset: issues a RESETCONF if **True**
+
+  :returns: **tuple** of the form **(query, params_list)**
+
+  :raises: **ValueError** if a value isn't a str, list, or None
+  """
+
+  query_comp = ['RESETCONF' if reset else 'SETCONF']
+
+  if isinstance(params, dict):
+    params_list = list(params.items())
+  else:
+    params_list = params  # type: ignore # type: Sequence[Tuple[str, Union[str, Sequence[str]]]]
+
+  for param, value in params_list:
+    if isinstance(value, str):
+      query_comp.append('%s="%s"' % (param, value.strip()))
+    elif isinstance(value, collections.abc.Iterable):
+      query_comp.extend(['%s="%s"' % (param, val.strip()) for val in value])
+    elif not value:
+      query_comp.append(param)
+    else:
+      raise ValueError('Cannot set %s to %s since the value was a %s but we only accept strings' % (param, value, type(value).__name__))
+
+  return ' '.join(query_comp), params_list
+
+
+def _parse_circ_path(path: str) -> Sequence[Tuple[str, str]]:
+  """
+  Parses a circuit path as a list of **(fingerprint, nickname)** tuples. Tor
   circuit paths are defined as being of the form...
 
   ::
@@ -4126,6 +5521,14 @@ def _parse_circ_entry(entry: str) -> Tuple[str, str]:
   return (fingerprint, nickname)
 
 
+def _is_geoip_lookup(param: str) -> bool:
+  """
+  Checks if a GETINFO parameter resolves an address with tor's geoip database.
+  """
+
+  return param.startswith('ip-to-country/') and param not in ('ip-to-country/0.0.0.0', 'ip-to-country/ipv4-available', 'ip-to-country/ipv6-available')
+
+
 @with_default()
 def _case_insensitive_lookup(entries: Union[Sequence[str], Mapping[str, Any]], key: str, default: Any = UNDEFINED) -> Any:
   """
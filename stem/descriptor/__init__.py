@@ -9,6 +9,7 @@ Package for parsing and processing descriptor data.
 ::
 
   parse_file - Parses the descriptors in a file.
+  parse_files - Parses the descriptors of several files across processes.
   create_signing_key - Cretes a signing key that can be used for creating descriptors.
 
   Compression - method of descriptor decompression
@@ -107,10 +108,13 @@ Package for parsing and processing descriptor data.
 import base64
 import codecs
 import collections
+import concurrent.futures
 import copy
 import datetime
+import functools
 import hashlib
 import io
+import mmap
 import os
 import random
 import re
@@ -122,7 +126,8 @@ import stem.util.enum
 import stem.util.str_tools
 import stem.util.system
 
-from typing import Any, BinaryIO, Callable, Dict, IO, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, Union
+from types import TracebackType
+from typing import Any, BinaryIO, Callable, Deque, Dict, IO, Iterator, List, Mapping, Optional, Pattern, Sequence, Tuple, Type, Union
 
 __all__ = [
   'bandwidth_file',
@@ -139,6 +144,7 @@ __all__ = [
 
   'Descriptor',
   'parse_file',
+  'parse_files',
 ]
 
 UNSEEKABLE_MSG = """\
@@ -156,6 +162,28 @@ PGP_BLOCK_START = re.compile('^-----BEGIN ([%s%s]+)-----$' % (KEYWORD_CHAR, WHIT
 PGP_BLOCK_END = '-----END %s-----'
 EMPTY_COLLECTION = ([], {}, set())  # type: ignore
 
+# Descriptor types that parse_files() can split into chunks, mapped to the
+# keyword each of these descriptors begins with.
+
+SPLITTABLE_TYPES = {
+  'server-descriptor': 'router',
+  'bridge-server-descriptor': 'router',
+  'extra-info': 'extra-info',
+  'bridge-extra-info': 'extra-info',
+  'microdescriptor': 'onion-key',
+}
+
+SPLITTABLE_FILENAMES = {
+  'cached-descriptors': 'router',
+  'cached-descriptors.new': 'router',
+  'cached-extrainfo': 'extra-info',
+  'cached-extrainfo.new': 'extra-info',
+  'cached-microdescs': 'onion-key',
+  'cached-microdescs.new': 'onion-key',
+}
+
+PARSE_CHUNK_SIZE = 1048576  # content parse_files() provides each worker at a time
+
 DIGEST_TYPE_INFO = b'\x00\x01'
 DIGEST_PADDING = b'\xFF'
 DIGEST_SEPARATOR = b'\x00'
@@ -198,7 +226,7 @@ class _Compression(object):
   .. versionadded:: 1.8.0
   """
 
-  def __init__(self, name: str, module: Optional[str], encoding: str, extension: str, decompression_func: Callable[[Any, bytes], bytes]) -> None:
+  def __init__(self, name: str, module: Optional[str], encoding: str, extension: str, decompression_func: Callable[[Any, bytes], bytes], decompressor_func: Callable[[Any], Any]) -> None:
     if module is None:
       self._module = None
       self.available = True
@@ -227,6 +255,7 @@ class _Compression(object):
     self._name = name
     self._module_name = module
     self._decompression_func = decompression_func
+    self._decompressor_func = decompressor_func
 
   def decompress(self, content: bytes) -> bytes:
     """
@@ -243,6 +272,40 @@ class _Compression(object):
       * **ImportError** if this method if decompression is unavalable
     """
 
+    self._assert_available()
+
+    try:
+      return self._decompression_func(self._module, content)
+    except Exception as exc:
+      raise OSError('Failed to decompress as %s: %s' % (self, exc))
+
+  def decompressor(self) -> '_Decompressor':
+    """
+    Provides an incremental decompressor, for content that's received
+    piecemeal. For example...
+
+    ::
+
+      decompressor = Compression.GZIP.decompressor()
+
+      for chunk in compressed_chunks:
+        process(decompressor.decompress(chunk))
+
+      process(decompressor.flush())
+
+    .. versionadded:: 2.0.0
+
+    :returns: decompressor with **decompress(content)** and **flush()**
+      methods, which provide **bytes** and raise an **OSError** if the content
+      isn't compressed with this
+
+    :raises: **ImportError** if this method of decompression is unavailable
+    """
+
+    self._assert_available()
+    return _Decompressor(self, self._decompressor_func(self._module))
+
+  def _assert_available(self) -> None:
     if not self.available:
       if self._name == 'zstd':
         raise ImportError('Decompressing zstd data requires https://pypi.org/project/zstandard/')
@@ -251,13 +314,33 @@ class _Compression(object):
       else:
         raise ImportError("'%s' decompression module is unavailable" % self._module_name)
 
+  def __str__(self) -> str:
+    return self._name
+
+
+class _Decompressor(object):
+  """
+  Incremental decompression, normalizing the interface and exceptions of our
+  compression modules.
+  """
+
+  def __init__(self, compression: _Compression, decompressor: Any) -> None:
+    self._compression = compression
+    self._decompressor = decompressor
+
+  def decompress(self, content: bytes) -> bytes:
     try:
-      return self._decompression_func(self._module, content)
+      return self._decompressor.decompress(content) if self._decompressor is not None else content
     except Exception as exc:
-      raise OSError('Failed to decompress as %s: %s' % (self, exc))
+      raise OSError('Failed to decompress as %s: %s' % (self._compression, exc))
 
-  def __str__(self) -> str:
-    return self._name
+  def flush(self) -> bytes:
+    flush = getattr(self._decompressor, 'flush', None)
+
+    try:
+      return flush() if flush else b''
+    except Exception as exc:
+      raise OSError('Failed to decompress as %s: %s' % (self._compression, exc))
 
 
 def _zstd_decompress(module: Any, content: bytes) -> bytes:
@@ -270,11 +353,11 @@ def _zstd_decompress(module: Any, content: bytes) -> bytes:
 
 
 Compression = stem.util.enum.Enum(
-  ('PLAINTEXT', _Compression('plaintext', None, 'identity', '.txt', lambda module, content: content)),
-  ('GZIP', _Compression('gzip', 'zlib', 'gzip', '.gz', lambda module, content: module.decompress(content, module.MAX_WBITS | 32))),
-  ('BZ2', _Compression('bzip2', 'bz2', 'bzip2', '.bz2', lambda module, content: module.decompress(content))),
-  ('LZMA', _Compression('lzma', 'lzma', 'x-tor-lzma', '.xz', lambda module, content: module.decompress(content))),
-  ('ZSTD', _Compression('zstd', 'zstd', 'x-zstd', '.zst', _zstd_decompress)),
+  ('PLAINTEXT', _Compression('plaintext', None, 'identity', '.txt', lambda module, content: content, lambda module: None)),
+  ('GZIP', _Compression('gzip', 'zlib', 'gzip', '.gz', lambda module, content: module.decompress(content, module.MAX_WBITS | 32), lambda module: module.decompressobj(module.MAX_WBITS | 32))),
+  ('BZ2', _Compression('bzip2', 'bz2', 'bzip2', '.bz2', lambda module, content: module.decompress(content), lambda module: module.BZ2Decompressor())),
+  ('LZMA', _Compression('lzma', 'lzma', 'x-tor-lzma', '.xz', lambda module, content: module.decompress(content), lambda module: module.LZMADecompressor())),
+  ('ZSTD', _Compression('zstd', 'zstd', 'x-zstd', '.zst', _zstd_decompress, lambda module: module.ZstdDecompressor().decompressobj())),
 )
 
 
@@ -356,6 +439,12 @@ def parse_file(descriptor_file: Union[str, BinaryIO, tarfile.TarFile, IO[bytes]]
 
     my_descriptor_file = open(descriptor_path, 'rb')
 
+  Paths are read through a memory map when possible, which is faster than
+  reading an opened file for large documents such as consensuses.
+
+  .. versionchanged:: 2.0.0
+     Memory map files when provided a path.
+
   :param descriptor_file: path or opened file with the descriptor contents
   :param descriptor_type: `descriptor type <https://metrics.torproject.org/collector.html#data-formats>`_, this is guessed if not provided
   :param validate: checks the validity of the descriptor's content if **True**,
@@ -454,8 +543,17 @@ def parse_file(descriptor_file: Union[str, BinaryIO, tarfile.TarFile, IO[bytes]]
 
 
 def _parse_file_for_path(descriptor_file: str, *args: Any, **kwargs: Any) -> Iterator['stem.descriptor.Descriptor']:
-  with open(descriptor_file, 'rb') as desc_file:
-    for desc in parse_file(desc_file, *args, **kwargs):
+  # Memory map the file when we can so its content is read directly from the
+  # page cache. Empty files and some filesystems can't be mapped, in which
+  # case we read it normally.
+
+  try:
+    desc_file = MappedFile(descriptor_file)  # type: Union[MappedFile, BinaryIO]
+  except (ValueError, OSError):
+    desc_file = open(descriptor_file, 'rb')
+
+  with desc_file:
+    for desc in parse_file(desc_file, *args, **kwargs):  # type: ignore
       yield desc
 
 
@@ -476,12 +574,224 @@ def _parse_file_for_tarfile(descriptor_file: tarfile.TarFile, *args: Any, **kwar
 
       try:
         for desc in parse_file(entry, *args, **kwargs):
-          desc._set_archive_path(entry.name)
+          desc._set_archive_path(tar_entry.name)
           yield desc
       finally:
         entry.close()
 
 
+def parse_files(descriptor_files: Union[str, Sequence[str]], descriptor_type: Optional[str] = None, validate: bool = False, document_handler: 'stem.descriptor.DocumentHandler' = DocumentHandler.ENTRIES, normalize_newlines: Optional[bool] = None, workers: Optional[int] = None, **kwargs: Any) -> Iterator['stem.descriptor.Descriptor']:
+  """
+  Parses the descriptors of several files across a pool of processes. This
+  accepts the same arguments as :func:`~stem.descriptor.__init__.parse_file`
+  and provides descriptors in the same order, but unlike it is able to make
+  use of more than one core.
+
+  Files can be descriptor files, tarballs, or directories containing either.
+  Tarballs are read entry by entry, and concatenated server, extrainfo, and
+  microdescriptors are split at descriptor boundaries so large files can be
+  spread across our workers too.
+
+  Descriptors are parsed in batches of roughly **PARSE_CHUNK_SIZE** bytes,
+  and only a few batches per worker are read ahead so memory usage doesn't
+  grow with the amount of content we're parsing.
+
+  ::
+
+    import stem.descriptor
+
+    for desc in stem.descriptor.parse_files(['server-descriptors-2020-06.tar.xz'], workers = 8):
+      print('%s (%s)' % (desc.nickname, desc.fingerprint))
+
+  .. versionadded:: 2.0.0
+
+  :param descriptor_files: paths with descriptor content
+  :param descriptor_type: `descriptor type <https://metrics.torproject.org/collector.html#data-formats>`_, this is guessed if not provided
+  :param validate: checks the validity of the descriptor's content if
+    **True**, skips these checks otherwise
+  :param document_handler: method in which to parse the
+    :class:`~stem.descriptor.networkstatus.NetworkStatusDocument`
+  :param normalize_newlines: converts windows newlines (CRLF)
+  :param workers: number of processes to parse with, this is our number of
+    cores if not provided
+  :param kwargs: additional arguments for the descriptor constructor
+
+  :returns: iterator for :class:`~stem.descriptor.__init__.Descriptor` instances in the files
+
+  :raises:
+    * **ValueError** if the contents is malformed and validate is True
+    * **TypeError** if we can't match the contents of a file to a descriptor type
+    * **OSError** if unable to read from the descriptor_files
+  """
+
+  if isinstance(descriptor_files, (bytes, str)):
+    descriptor_files = [descriptor_files]
+
+  if workers is None:
+    workers = os.cpu_count() or 1
+  elif workers < 1:
+    raise ValueError('parse_files() requires at least one worker, got %i' % workers)
+
+  batches = _parse_batches(_parse_units(descriptor_files, descriptor_type))
+  parse_args = (descriptor_type, validate, document_handler, normalize_newlines, kwargs)
+
+  if workers == 1:
+    for batch in batches:
+      for desc in _parse_batch(batch, *parse_args):
+        yield desc
+
+    return
+
+  pending = collections.deque()  # type: Deque[concurrent.futures.Future]
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+    try:
+      for batch in batches:
+        pending.append(executor.submit(_parse_batch, batch, *parse_args))
+
+        while len(pending) > workers * 2:
+          for desc in pending.popleft().result():
+            yield desc
+
+      while pending:
+        for desc in pending.popleft().result():
+          yield desc
+    finally:
+      for future in pending:
+        future.cancel()
+
+
+def _parse_units(descriptor_files: Sequence[str], descriptor_type: Optional[str]) -> Iterator[Tuple[bytes, str, str, Optional[str]]]:
+  """
+  Reads the given paths, providing tuples of the form...
+
+    (content, name, path, archive_path)
+
+  ... with the content of each file or tarball entry. Concatenated descriptors
+  are divided into several of these.
+  """
+
+  for path in descriptor_files:
+    if os.path.isdir(path):
+      paths = []
+
+      for root, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        paths += [os.path.join(root, filename) for filename in sorted(filenames)]
+    else:
+      paths = [path]
+
+    for path in paths:
+      if stem.util.system.is_tarfile(path):
+        with tarfile.open(path) as tar_file:
+          for tar_entry in tar_file:
+            if not tar_entry.isfile() or tar_entry.size == 0:
+              continue
+
+            with tar_file.extractfile(tar_entry) as entry:
+              content = entry.read()
+
+            for chunk in _split_descriptors(content, tar_entry.name, descriptor_type):
+              yield (chunk, tar_entry.name, os.path.abspath(path), tar_entry.name)
+      else:
+        with open(path, 'rb') as desc_file:
+          content = desc_file.read()
+
+        for chunk in _split_descriptors(content, path, descriptor_type):
+          yield (chunk, path, os.path.abspath(path), None)
+
+
+def _split_descriptors(content: bytes, name: str, descriptor_type: Optional[str]) -> Iterator[bytes]:
+  """
+  Divides concatenated descriptors into chunks of roughly PARSE_CHUNK_SIZE.
+  Chunks begin on a descriptor boundary (including any annotations that
+  precede it), and repeat the file's @type annotation if it has one.
+  """
+
+  header = b''
+  keyword = None
+
+  if descriptor_type is None and content.startswith(b'@type '):
+    header = content[:content.find(b'\n') + 1] if b'\n' in content else content
+    descriptor_type = stem.util.str_tools._to_unicode(header[6:].strip())
+
+  if descriptor_type is not None:
+    keyword = SPLITTABLE_TYPES.get(descriptor_type.split(' ')[0])
+  else:
+    keyword = SPLITTABLE_FILENAMES.get(os.path.basename(name))
+
+  if keyword is None or len(content) <= PARSE_CHUNK_SIZE:
+    yield content
+    return
+
+  keyword_line = re.compile(b'^%s(?:[ \t\r]|$)' % stem.util.str_tools._to_bytes(keyword), re.MULTILINE)
+  start = len(header)
+
+  while True:
+    match = keyword_line.search(content, start + PARSE_CHUNK_SIZE)
+
+    if not match:
+      break
+
+    end = match.start()
+
+    while True:
+      line_start = content.rfind(b'\n', 0, end - 1) + 1
+
+      if line_start <= start or not content.startswith(b'@', line_start):
+        break
+
+      end = line_start  # annotations belong to the descriptor that follows them
+
+    yield header + content[start:end]
+    start = end
+
+  yield header + content[start:]
+
+
+def _parse_batches(units: Iterator[Tuple[bytes, str, str, Optional[str]]]) -> Iterator[List[Tuple[bytes, str, str, Optional[str]]]]:
+  """
+  Groups units of content into batches of at least PARSE_CHUNK_SIZE so small
+  files (such as the individual descriptors of CollecTor tarballs) don't each
+  cost a round trip to our workers.
+  """
+
+  batch, batch_size = [], 0
+
+  for unit in units:
+    batch.append(unit)
+    batch_size += len(unit[0])
+
+    if batch_size >= PARSE_CHUNK_SIZE:
+      yield batch
+      batch, batch_size = [], 0
+
+  if batch:
+    yield batch
+
+
+def _parse_batch(batch: Sequence[Tuple[bytes, str, str, Optional[str]]], descriptor_type: Optional[str], validate: bool, document_handler: 'stem.descriptor.DocumentHandler', normalize_newlines: Optional[bool], kwargs: Dict[str, Any]) -> List['stem.descriptor.Descriptor']:
+  """
+  Parses a batch of content from parse_files(). This is run by our workers.
+  """
+
+  results = []
+
+  for content, name, path, archive_path in batch:
+    descriptor_file = io.BytesIO(content)
+    descriptor_file.name = name  # type: ignore
+
+    for desc in parse_file(descriptor_file, descriptor_type, validate, document_handler, normalize_newlines, **kwargs):
+      desc._set_path(path)
+
+      if archive_path:
+        desc._set_archive_path(archive_path)
+
+      results.append(desc)
+
+  return results
+
+
 def _parse_metrics_file(descriptor_type: str, major_version: int, minor_version: int, descriptor_file: BinaryIO, validate: bool, document_handler: 'stem.descriptor.DocumentHandler', **kwargs: Any) -> Iterator['stem.descriptor.Descriptor']:
   # Parses descriptor files from metrics, yielding individual descriptors. This
   # throws a TypeError if the descriptor_type or version isn't recognized.
@@ -1028,6 +1338,41 @@ class Descriptor(object):
         if validate:
           raise
 
+  def _compact(self, shared_lines: Sequence[str] = ()) -> None:
+    """
+    Parses everything we've yet to lazy load, then drops the content we
+    retained to do so. Lines within **shared_lines** are commonly identical
+    between descriptors, so the attributes they provide are shared between
+    instances rather than each having its own copy.
+
+    :param shared_lines: keywords of lines whose attributes should be shared
+    """
+
+    for keyword, values in self._entries.items():
+      parser = self.PARSER_FOR_LINE.get(keyword)
+
+      try:
+        if parser and keyword in shared_lines:
+          for attr, value in _shared_attributes(type(self), keyword, tuple(values)):
+            setattr(self, attr, value)
+        elif not self._lazy_loading:
+          continue  # already parsed, such as by get_unrecognized_lines()
+        elif parser:
+          parser(self, self._entries)
+        else:
+          for value, block_type, block_contents in values:
+            line = '%s %s' % (keyword, value)
+
+            if block_contents:
+              line += '\n%s' % block_contents
+
+            self._unrecognized_lines.append(line)
+      except (ValueError, KeyError):
+        pass  # malformed lines leave their attributes with default values
+
+    self._lazy_loading = False
+    self._entries = {}
+
   def _set_path(self, path: str) -> None:
     self._path = path
 
@@ -1219,6 +1564,111 @@ class NewlineNormalizer(object):
     return self._wrapped_file.tell(*args)
 
 
+class MappedFile(object):
+  """
+  Read-only file backed by a memory map. Besides avoiding buffered copies of
+  its content, this lets us find descriptor boundaries with a regular
+  expression search over the mapping rather than reading it line by line.
+
+  .. versionadded:: 2.0.0
+
+  :var str name: path of the mapped file
+  """
+
+  def __init__(self, path: str) -> None:
+    self.name = path
+
+    with open(path, 'rb') as mapped_file:
+      self._map = mmap.mmap(mapped_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+  def read(self, size: int = -1) -> bytes:
+    return self._map.read(None if size is None or size < 0 else size)
+
+  def readline(self) -> bytes:
+    return self._map.readline()
+
+  def readlines(self) -> List[bytes]:
+    return list(iter(self._map.readline, b''))
+
+  def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+    self._map.seek(offset, whence)
+    return self._map.tell()
+
+  def seekable(self) -> bool:
+    return True
+
+  def tell(self) -> int:
+    return self._map.tell()
+
+  def close(self) -> None:
+    self._map.close()
+
+  def _read_until_match(self, pattern: Pattern[bytes], inclusive: bool = False, ignore_first: bool = False, skip: bool = False, end_position: Optional[int] = None) -> Tuple[Optional[List[bytes]], Optional[str]]:
+    """
+    Counterpart for :func:`~stem.descriptor._read_until_keywords` that
+    searches the mapping for our ending line.
+    """
+
+    start = self._map.tell()
+
+    if ignore_first:
+      self._map.readline()
+
+    size = len(self._map)
+    section_end = size
+
+    if end_position:
+      # reading ends with the first line that starts at or after end_position
+
+      if end_position <= self._map.tell():
+        section_end = self._map.tell()
+      elif end_position < size and self._map[end_position - 1:end_position] != b'\n':
+        line_end = self._map.find(b'\n', end_position)
+        section_end = size if line_end == -1 else line_end + 1
+      else:
+        section_end = min(end_position, size)
+
+    match = pattern.search(self._map, self._map.tell())  # type: ignore
+    ending_keyword = None
+
+    if match and match.start() < section_end:
+      ending_keyword = stem.util.str_tools._to_unicode(match.group(1))
+      stop = match.start()
+
+      if inclusive:
+        line_end = self._map.find(b'\n', stop)
+        stop = size if line_end == -1 else line_end + 1
+    else:
+      stop = section_end
+
+    self._map.seek(stop)
+
+    if skip:
+      return None, ending_keyword
+
+    content = self._map[start:stop]
+
+    if not content:
+      return [], ending_keyword
+
+    lines = [line + b'\n' for line in content.split(b'\n')]
+    lines[-1] = lines[-1][:-1]
+
+    if not lines[-1]:
+      lines.pop()
+
+    return lines, ending_keyword
+
+  def __iter__(self) -> Iterator[bytes]:
+    return iter(self._map.readline, b'')
+
+  def __enter__(self) -> 'stem.descriptor.MappedFile':
+    return self
+
+  def __exit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+    self.close()
+
+
 def _read_until_keywords(keywords: Union[str, Sequence[str]], descriptor_file: BinaryIO, inclusive: bool = False, ignore_first: bool = False, skip: bool = False, end_position: Optional[int] = None) -> List[bytes]:
   return _read_until_keywords_with_ending_keyword(keywords, descriptor_file, inclusive, ignore_first, skip, end_position, include_ending_keyword = False)  # type: ignore
 
@@ -1242,12 +1692,21 @@ def _read_until_keywords_with_ending_keyword(keywords: Union[str, Sequence[str]]
     **True**
   """
 
-  content = None if skip else []  # type: Optional[List[bytes]]
-  ending_keyword = None
-
   if isinstance(keywords, (bytes, str)):
     keywords = (keywords,)
 
+  if isinstance(descriptor_file, MappedFile):
+    pattern = _mapped_keyword_pattern(tuple(keywords))
+    content, ending_keyword = descriptor_file._read_until_match(pattern, inclusive, ignore_first, skip, end_position)
+
+    if include_ending_keyword:
+      return (content, ending_keyword)  # type: ignore
+    else:
+      return content  # type: ignore
+
+  content = None if skip else []  # type: Optional[List[bytes]]
+  ending_keyword = None
+
   if ignore_first:
     first_line = descriptor_file.readline()
 
@@ -1287,6 +1746,40 @@ def _read_until_keywords_with_ending_keyword(keywords: Union[str, Sequence[str]]
     return content  # type: ignore
 
 
+@functools.lru_cache()
+def _mapped_keyword_pattern(keywords: Tuple[str, ...]) -> Pattern[bytes]:
+  """
+  Multi-line equivalent of SPECIFIC_KEYWORD_LINE, for searching mapped files.
+  """
+
+  keyword_regex = '|'.join(keywords)
+  return re.compile(stem.util.str_tools._to_bytes('^(%s)(?:[%s]+[^\n]*)?$' % (keyword_regex, WHITESPACE)), re.MULTILINE)
+
+
+@functools.lru_cache(maxsize = 4096)
+def _shared_attributes(desc_type: Type['stem.descriptor.Descriptor'], keyword: str, values: Tuple[Tuple[str, Optional[str], Optional[str]], ...]) -> Tuple[Tuple[str, Any], ...]:
+  """
+  Provides the attributes a line provides for the given descriptor type. These
+  are cached so descriptors with an identical line share these values.
+
+  :param desc_type: descriptor type the line belongs to
+  :param keyword: keyword of the line
+  :param values: (value, block_type, block_contents) tuples for the keyword
+
+  :returns: **tuple** of (attribute, value) pairs the line's parser provides
+
+  :raises: **ValueError** if the line is malformed
+  """
+
+  desc = desc_type.__new__(desc_type)
+  Descriptor.__init__(desc, b'')
+  parser = desc_type.PARSER_FOR_LINE[keyword]
+  parser(desc, {keyword: list(values)})
+
+  parsed = vars(desc)
+  return tuple((attr, parsed[attr]) for attr, (default, attr_parser) in desc_type.ATTRIBUTES.items() if attr_parser == parser and attr in parsed)
+
+
 def _bytes_for_block(content: str) -> bytes:
   """
   Provides the base64 decoded content of a pgp-style block.
@@ -1305,40 +1798,38 @@ def _bytes_for_block(content: str) -> bytes:
   return base64.b64decode(stem.util.str_tools._to_bytes(content))
 
 
-def _get_pseudo_pgp_block(remaining_contents: List[str]) -> Tuple[str, str]:
+def _get_pseudo_pgp_block(lines: List[str], index: int = 0) -> Tuple[Optional[Tuple[str, str]], int]:
   """
-  Checks if given contents begins with a pseudo-Open-PGP-style block and, if
-  so, pops it off and provides it back to the caller.
+  Checks if the given line begins a pseudo-Open-PGP-style block and, if so,
+  provides it back to the caller.
 
-  :param remaining_contents: lines to be checked for a public key block
+  :param lines: lines of the content we're reading
+  :param index: position of the line to be checked for a public key block
 
-  :returns: **tuple** of the (block_type, content) or None if it doesn't exist
+  :returns: **tuple** of the form **((block_type, content), next_index)**, the
+    first value being **None** if a block doesn't start at this index
 
   :raises: **ValueError** if the contents starts with a key block but it's
     malformed (for instance, if it lacks an ending line)
   """
 
-  if not remaining_contents:
-    return None  # nothing left
+  if index >= len(lines):
+    return None, index  # nothing left
 
-  block_match = PGP_BLOCK_START.match(remaining_contents[0])
+  block_match = PGP_BLOCK_START.match(lines[index])
 
-  if block_match:
-    block_type = block_match.groups()[0]
-    block_lines = []  # type: List[str]
-    end_line = PGP_BLOCK_END % block_type
+  if not block_match:
+    return None, index
 
-    while True:
-      if not remaining_contents:
-        raise ValueError("Unterminated pgp style block (looking for '%s'):\n%s" % (end_line, '\n'.join(block_lines)))
+  block_type = block_match.groups()[0]
+  end_line = PGP_BLOCK_END % block_type
 
-      line = remaining_contents.pop(0)
-      block_lines.append(line)
+  try:
+    end_index = lines.index(end_line, index + 1)
+  except ValueError:
+    raise ValueError("Unterminated pgp style block (looking for '%s'):\n%s" % (end_line, '\n'.join(lines[index:])))
 
-      if line == end_line:
-        return (block_type, '\n'.join(block_lines))
-  else:
-    return None
+  return (block_type, '\n'.join(lines[index:end_index + 1])), end_index + 1
 
 
 def create_signing_key(private_key: Optional['cryptography.hazmat.backends.openssl.rsa._RSAPrivateKey'] = None) -> 'stem.descriptor.SigningKey':  # type: ignore
@@ -1475,10 +1966,16 @@ def _descriptor_components_with_extra(raw_contents: bytes, validate: bool, extra
 
   entries = collections.OrderedDict()  # type: ENTRY_TYPE
   extra_entries = []  # entries with a keyword in extra_keywords
-  remaining_lines = stem.util.str_tools._to_unicode(raw_contents).split('\n')
 
-  while remaining_lines:
-    line = remaining_lines.pop(0)
+  # Walk our lines by index rather than popping them off the front of a list,
+  # which is quadratic for large documents like votes and bandwidth files.
+
+  lines = stem.util.str_tools._to_unicode(raw_contents).split('\n')
+  line_count, index = len(lines), 0
+
+  while index < line_count:
+    line = lines[index]
+    index += 1
 
     # V2 network status documents explicitly can contain blank lines...
     #
@@ -1512,7 +2009,7 @@ def _descriptor_components_with_extra(raw_contents: bytes, validate: bool, extra
       value = ''
 
     try:
-      block_attr = _get_pseudo_pgp_block(remaining_lines)
+      block_attr, index = _get_pseudo_pgp_block(lines, index)
 
       if block_attr:
         block_type, block_contents = block_attr
@@ -1520,6 +2017,7 @@ def _descriptor_components_with_extra(raw_contents: bytes, validate: bool, extra
         block_type, block_contents = None, None
     except ValueError:
       if not validate:
+        index = line_count  # unterminated blocks consume the rest of our content
         continue
 
       raise
@@ -52,6 +52,7 @@ Doing the same is trivial with server descriptors...
 ::
 
   Microdescriptor - Tor microdescriptor.
+    +- compact - reduces the memory used by this microdescriptor
 """
 
 import functools
@@ -94,6 +95,12 @@ SINGLE_FIELDS = (
   'pr',
 )
 
+SHARED_FIELDS = (
+  'p',
+  'p6',
+  'pr',
+)
+
 
 def _parse_file(descriptor_file: BinaryIO, validate: bool = False, **kwargs: Any) -> Iterator['stem.descriptor.microdescriptor.Microdescriptor']:
   """
@@ -177,7 +184,7 @@ def _parse_id_line(descriptor: 'stem.descriptor.Descriptor', entries: ENTRY_TYPE
 _parse_onion_key_line = _parse_key_block('onion-key', 'onion_key', 'RSA PUBLIC KEY')
 _parse_ntor_onion_key_line = _parse_simple_line('ntor-onion-key', 'ntor_onion_key')
 _parse_family_line = _parse_simple_line('family', 'family', func = lambda v: v.split(' '))
-_parse_p6_line = _parse_simple_line('p6', 'exit_policy_v6', func = lambda v: stem.exit_policy.MicroExitPolicy(v))
+_parse_p6_line = _parse_simple_line('p6', 'exit_policy_v6', func = stem.exit_policy.intern_micro_policy)
 _parse_pr_line = _parse_protocol_line('pr', 'protocols')
 
 
@@ -222,7 +229,7 @@ class Microdescriptor(Descriptor):
     'ntor_onion_key': (None, _parse_ntor_onion_key_line),
     'or_addresses': ([], _parse_a_line),
     'family': ([], _parse_family_line),
-    'exit_policy': (stem.exit_policy.MicroExitPolicy('reject 1-65535'), _parse_p_line),
+    'exit_policy': (stem.exit_policy.intern_micro_policy('reject 1-65535'), _parse_p_line),
     'exit_policy_v6': (None, _parse_p6_line),
     'identifiers': ({}, _parse_id_line),
     'protocols': ({}, _parse_pr_line),
@@ -316,6 +323,22 @@ class Microdescriptor(Descriptor):
 
     return self._annotation_lines
 
+  def compact(self) -> None:
+    """
+    Reduces the memory this microdescriptor uses. Unless we were parsed with
+    validation this retains the content we need to lazy load our attributes,
+    which is many times larger than the microdescriptor itself. This parses
+    everything and discards that content.
+
+    Exit policies and protocols are commonly the same between relays, so
+    compacted microdescriptors share these rather than having copies, and they
+    should not be modified.
+
+    .. versionadded:: 2.0.0
+    """
+
+    self._compact(SHARED_FIELDS)
+
   def _check_constraints(self, entries: ENTRY_TYPE) -> None:
     """
     Does a basic check that the entries conform to this descriptor type's
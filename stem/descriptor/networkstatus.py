@@ -47,8 +47,18 @@ For more information see :func:`~stem.descriptor.__init__.DocumentHandler`...
   NetworkStatusDocument - Network status document
     |- NetworkStatusDocumentV2 - Version 2 network status document
     |- NetworkStatusDocumentV3 - Version 3 network status document
+    |  +- to_columns - columnar view of the document's relays
+    |
     +- BridgeNetworkStatusDocument - Version 3 network status document for bridges
 
+  RelayTable - Columnar view of router status entries
+    |- flag_mask - bitmask for a set of flags
+    |- has_flags - relays with the given flags
+    |- in_subnet - relays within an IPv4 subnet
+    |- can_exit_to - relays whose exit policy allows a port
+    |- match - relays matching several criteria
+    +- select - router status entries for matching relays
+
   KeyCertificate - Certificate used to authenticate an authority
   DocumentSignature - Signature of a document by a directory authority
   DetachedSignature - Stand alone signature used when making the consensus
@@ -61,6 +71,8 @@ import hashlib
 import io
 
 import stem.descriptor.router_status_entry
+import stem.exit_policy
+import stem.util.connection
 import stem.util.str_tools
 import stem.util.tor_tools
 import stem.version
@@ -1320,6 +1332,21 @@ class NetworkStatusDocumentV3(NetworkStatusDocument):
     else:
       return False  # malformed document
 
+  def to_columns(self, use_numpy: bool = True) -> 'stem.descriptor.networkstatus.RelayTable':
+    """
+    Provides a columnar view of our relays, which can be filtered with array
+    operations rather than iterating over our router status entries.
+
+    .. versionadded:: 2.0.0
+
+    :param use_numpy: provides `numpy <https://numpy.org/>`_ arrays if it's
+      available, lists otherwise
+
+    :returns: :class:`~stem.descriptor.networkstatus.RelayTable` for our routers
+    """
+
+    return RelayTable(list(self.routers.values()), use_numpy)
+
   def _header(self, document_file: BinaryIO, validate: bool) -> None:
     content = bytes.join(b'', _read_until_keywords((AUTH_START, ROUTERS_START, FOOTER_START), document_file))
     entries = _descriptor_components(content, validate)
@@ -1405,6 +1432,249 @@ class NetworkStatusDocumentV3(NetworkStatusDocument):
         raise ValueError("'%s' value on the params line must be in the range of %i - %i, was %i" % (key, minimum, maximum, value))
 
 
+class RelayTable(object):
+  """
+  Columnar view of router status entries. Each attribute is an array with a
+  value per relay, so relays can be selected through array operations rather
+  than iterating over router status entries. These are `numpy
+  <https://numpy.org/>`_ arrays if it's available, and lists otherwise.
+
+  Methods like :func:`~stem.descriptor.networkstatus.RelayTable.has_flags`
+  provide masks of matching relays. With numpy these can be combined with the
+  usual array operators...
+
+  ::
+
+    from stem import Flag
+
+    table = consensus.to_columns()
+    mask = table.has_flags(Flag.EXIT, Flag.FAST) & (table.bandwidth > 5000) & table.in_subnet('85.25.0.0/16')
+
+    for router in table.select(mask):
+      print(router.nickname)
+
+  ... or if numpy is unavailable :func:`~stem.descriptor.networkstatus.RelayTable.match`
+  does this for you...
+
+  ::
+
+    mask = table.match(flags = (Flag.EXIT, Flag.FAST), min_bandwidth = 5000, subnet = '85.25.0.0/16')
+
+  .. versionadded:: 2.0.0
+
+  :var list routers: router status entry for each row
+  :var array fingerprint: relay fingerprints
+  :var array nickname: relay nicknames
+  :var array address: IPv4 addresses
+  :var array address_int: integer representation of each address
+  :var array or_port: ORPorts
+  :var array dir_port: DirPorts, **0** if unset
+  :var array bandwidth: bandwidth weights, **0** if unavailable
+  :var array measured: measured bandwidth, **0** if unavailable
+  :var array flags: bitmask of each relay's flags
+  :var array exit_policy: exit policy summaries (such as 'accept 80,443'),
+    **None** if unavailable
+  :var dict flag_bits: mapping of flags to their bit within our flags
+  """
+
+  def __init__(self, routers: Sequence['stem.descriptor.router_status_entry.RouterStatusEntry'], use_numpy: bool = True) -> None:
+    """
+    :param routers: router status entries to provide a view of
+    :param use_numpy: provides numpy arrays if it's available, lists otherwise
+    """
+
+    numpy = None
+
+    if use_numpy:
+      try:
+        import numpy
+      except ImportError:
+        pass
+
+    self._numpy = numpy
+    self.routers = list(routers)
+    self.flag_bits = dict((flag, 1 << i) for i, flag in enumerate(stem.Flag))  # type: Dict[str, int]
+
+    flags, policy_ids = [], []  # type: List[int], List[int]
+    policy_index = {}  # type: Dict[Optional[str], int] # exit policy summary => index in self._policies
+    self._policies = []  # type: List[Optional[stem.exit_policy.MicroExitPolicy]]
+
+    for router in self.routers:
+      relay_flags = 0
+
+      for flag in (router.flags or ()):
+        if flag not in self.flag_bits:
+          self.flag_bits[flag] = 1 << len(self.flag_bits)
+
+        relay_flags |= self.flag_bits[flag]
+
+      flags.append(relay_flags)
+
+      policy = getattr(router, 'exit_policy', None)
+      summary = str(policy) if policy is not None else None
+
+      if summary not in policy_index:
+        policy_index[summary] = len(self._policies)
+        self._policies.append(policy)
+
+      policy_ids.append(policy_index[summary])
+
+    self.fingerprint = self._column([router.fingerprint for router in self.routers], object)
+    self.nickname = self._column([router.nickname for router in self.routers], object)
+    self.address = self._column([router.address for router in self.routers], object)
+    self.address_int = self._column([stem.util.connection.address_to_int(router.address) if router.address else 0 for router in self.routers], 'int64')
+    self.or_port = self._column([router.or_port or 0 for router in self.routers], 'int64')
+    self.dir_port = self._column([router.dir_port or 0 for router in self.routers], 'int64')
+    self.bandwidth = self._column([getattr(router, 'bandwidth', None) or 0 for router in self.routers], 'int64')
+    self.measured = self._column([getattr(router, 'measured', None) or 0 for router in self.routers], 'int64')
+
+    # Flags are bits within an int64, so if relays have more flags than that
+    # can hold (which would require tor to add dozens) our column instead
+    # holds python ints.
+
+    self.flags = self._column(flags, 'int64' if len(self.flag_bits) <= 63 else object)
+
+    summaries = list(policy_index)
+    self.exit_policy = self._column([summaries[policy_id] for policy_id in policy_ids], object)
+    self._policy_ids = self._column(policy_ids, 'int64')
+
+  def flag_mask(self, *flags: str) -> int:
+    """
+    Provides the bitmask of the given flags within our **flags** column.
+
+    :param flags: :data:`~stem.Flag` to provide the mask of
+
+    :returns: **int** bitmask of these flags
+
+    :raises: **ValueError** if no relay has one of these flags
+    """
+
+    mask = 0
+
+    for flag in flags:
+      if flag not in self.flag_bits:
+        raise ValueError("No relay has the '%s' flag" % flag)
+
+      mask |= self.flag_bits[flag]
+
+    return mask
+
+  def has_flags(self, *flags: str) -> Sequence[bool]:
+    """
+    Provides a mask of relays that have all the given flags.
+
+    :param flags: :data:`~stem.Flag` that relays must have
+
+    :returns: mask of relays that have these flags
+    """
+
+    if any(flag not in self.flag_bits for flag in flags):
+      return self._column([False] * len(self.routers), bool)
+
+    mask = self.flag_mask(*flags)
+
+    if self._numpy:
+      return (self.flags & mask) == mask
+    else:
+      return [(relay_flags & mask) == mask for relay_flags in self.flags]
+
+  def in_subnet(self, subnet: str) -> Sequence[bool]:
+    """
+    Provides a mask of relays with an address in the given subnet.
+
+    :param subnet: IPv4 subnet of the form 'address/bits' (such as
+      '85.25.0.0/16')
+
+    :returns: mask of relays within this subnet
+
+    :raises: **ValueError** if the subnet is malformed
+    """
+
+    address, bits_str = subnet.split('/', 1) if '/' in subnet else (subnet, '32')
+
+    if not stem.util.connection.is_valid_ipv4_address(address) or not bits_str.isdigit() or int(bits_str) > 32:
+      raise ValueError("'%s' isn't a valid IPv4 subnet" % subnet)
+
+    mask = (0xFFFFFFFF << (32 - int(bits_str))) & 0xFFFFFFFF
+    network = stem.util.connection.address_to_int(address) & mask
+
+    if self._numpy:
+      return (self.address_int & mask) == network
+    else:
+      return [(address_int & mask) == network for address_int in self.address_int]
+
+  def can_exit_to(self, port: int) -> Sequence[bool]:
+    """
+    Provides a mask of relays whose exit policy allows exiting to the given
+    port. Relays without an exit policy (such as those of a microdescriptor
+    consensus) are never included.
+
+    :param port: port to check
+
+    :returns: mask of relays that can exit to this port
+    """
+
+    allowed = [policy.can_exit_to(port = port) if policy is not None else False for policy in self._policies]
+
+    if self._numpy:
+      return self._numpy.array(allowed, dtype = bool)[self._policy_ids]
+    else:
+      return [allowed[policy_id] for policy_id in self._policy_ids]
+
+  def match(self, flags: Sequence[str] = (), min_bandwidth: Optional[int] = None, subnet: Optional[str] = None, exit_port: Optional[int] = None) -> Sequence[bool]:
+    """
+    Provides a mask of relays that meet all the given criteria.
+
+    :param flags: :data:`~stem.Flag` that relays must have
+    :param min_bandwidth: minimum bandwidth weight of relays
+    :param subnet: IPv4 subnet relays must be within
+    :param exit_port: port relays must be able to exit to
+
+    :returns: mask of relays that meet these criteria
+
+    :raises: **ValueError** if the subnet is malformed
+    """
+
+    masks = [self.has_flags(*flags)]
+
+    if min_bandwidth is not None:
+      if self._numpy:
+        masks.append(self.bandwidth >= min_bandwidth)
+      else:
+        masks.append([bandwidth >= min_bandwidth for bandwidth in self.bandwidth])
+
+    if subnet is not None:
+      masks.append(self.in_subnet(subnet))
+
+    if exit_port is not None:
+      masks.append(self.can_exit_to(exit_port))
+
+    if self._numpy:
+      return self._numpy.logical_and.reduce(masks)
+    else:
+      return [all(row) for row in zip(*masks)]
+
+  def select(self, mask: Sequence[bool]) -> List['stem.descriptor.router_status_entry.RouterStatusEntry']:
+    """
+    Provides the router status entries of the relays in a mask.
+
+    :param mask: mask of relays to provide
+
+    :returns: **list** of router status entries for these relays
+    """
+
+    if self._numpy:
+      return [self.routers[i] for i in self._numpy.flatnonzero(mask)]
+    else:
+      return [router for router, is_selected in zip(self.routers, mask) if is_selected]
+
+  def _column(self, values: List[Any], dtype: Any) -> Any:
+    return self._numpy.array(values, dtype = dtype) if self._numpy else values
+
+  def __len__(self) -> int:
+    return len(self.routers)
+
+
 def _check_for_missing_and_disallowed_fields(document: 'stem.descriptor.networkstatus.NetworkStatusDocumentV3', entries: ENTRY_TYPE, fields: Sequence[Tuple[str, bool, bool, bool]]) -> None:
   """
   Checks that we have mandatory fields for our type, and that we don't have
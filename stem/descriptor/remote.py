@@ -57,6 +57,10 @@ content. For example...
     |- start - issues the query if it isn't already running
     +- run - blocks until the request is finished and provides the results
 
+  ConnectionPool - Reusable DirPort connections
+    |- request - downloads a resource from a DirPort
+    +- close - closes our unused connections
+
   DescriptorDownloader - Configurable class for issuing queries
     |- use_directory_mirrors - use directory mirrors to download future descriptors
     |- their_server_descriptor - provides the server descriptor of the relay we download from
@@ -68,7 +72,8 @@ content. For example...
     |- get_key_certificates - provides present authority key certificates
     |- get_bandwidth_file - provides bandwidth heuristics used to make the next consensus
     |- get_detached_signatures - authority signatures used to make the next consensus
-    +- query - request an arbitrary descriptor resource
+    |- query - request an arbitrary descriptor resource
+    +- close - closes our pooled connections
 
 .. versionadded:: 1.1.0
 
@@ -84,9 +89,10 @@ content. For example...
 """
 
 import asyncio
+import functools
 import io
 import random
-import sys
+import socket
 import threading
 import time
 
@@ -95,12 +101,14 @@ import stem.client
 import stem.descriptor
 import stem.descriptor.networkstatus
 import stem.directory
+import stem.util.asyncio
 import stem.util.enum
 import stem.util.tor_tools
 
 from stem.descriptor import Compression
 from stem.util import log, str_tools
-from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from types import TracebackType
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Type, Union
 
 # Tor has a limited number of descriptors we can fetch explicitly by their
 # fingerprint or hashes due to a limit on the url length by squid proxies.
@@ -108,8 +116,35 @@ from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence,
 MAX_FINGERPRINTS = 96
 MAX_MICRODESCRIPTOR_HASHES = 90
 
+# Resources for lists of fingerprints or hashes that can be sharded, with the
+# divider between their entries and how many can be requested at a time.
+
+SHARDABLE_RESOURCES = (
+  ('/tor/server/fp/', '+', MAX_FINGERPRINTS),
+  ('/tor/extra/fp/', '+', MAX_FINGERPRINTS),
+  ('/tor/keys/fp/', '+', MAX_FINGERPRINTS),
+  ('/tor/micro/d/', '-', MAX_MICRODESCRIPTOR_HASHES),
+)
+
 SINGLETON_DOWNLOADER = None
 
+# bytes we read at a time from DirPort connections
+
+HTTP_READ_SIZE = 65536
+
+# Descriptor types that begin with a keyword, so our responses can be parsed
+# in chunks of about STREAM_CHUNK_SIZE bytes while they're downloaded.
+
+STREAM_CHUNK_SIZE = 65536
+
+STREAMABLE_DESCRIPTOR_TYPES = {
+  'server-descriptor': b'router ',
+  'bridge-server-descriptor': b'router ',
+  'extra-info': b'extra-info ',
+  'bridge-extra-info': b'extra-info ',
+  'microdescriptor': b'onion-key',
+}
+
 # Some authorities intentionally break their DirPort to discourage DOS. In
 # particular they throttle the rate to such a degree that requests can take
 # hours to complete. Unfortunately Python's socket timeouts only kick in
@@ -260,6 +295,9 @@ class Query(object):
       print(desc.fingerprint)
 
   In either case exceptions are available via our 'error' attribute.
+  Iterating provides descriptors as they're downloaded, whereas
+  :func:`~stem.descriptor.remote.Query.run` provides them once our download
+  completes.
 
   Tor provides quite a few different descriptor resources via its directory
   protocol (see section 4.2 and later of the `dir-spec
@@ -322,6 +360,33 @@ class Query(object):
      Using :class:`~stem.descriptor.__init__.Compression` for our compression
      argument.
 
+  .. versionchanged:: 2.0.0
+     Added the hedge, hedge_delay, and shards arguments.
+
+  .. versionchanged:: 2.0.0
+     Added the connection_pool and relay_pool arguments.
+
+  Slow endpoints can dominate how long our downloads take. To avoid this
+  requests can be **hedged**, where if we don't have a response within
+  **hedge_delay** seconds the request is also sent to another endpoint, up to
+  **hedge** endpoints at a time. The first valid response is used, and the
+  others are cancelled.
+
+  Requests for many fingerprints or microdescriptor hashes can also be split
+  into **shards** that are downloaded from several endpoints in parallel, then
+  merged in the order they were requested. Shards are no larger than what can be requested at a time (see
+  :data:`~stem.descriptor.remote.MAX_FINGERPRINTS`), so sharded requests can
+  include any number of descriptors.
+
+  ::
+
+    query = Query(
+      '/tor/server/fp/%s' % '+'.join(fingerprints),
+      hedge = 2,
+      hedge_delay = 1.5,
+      shards = 4,
+    )
+
   :var str resource: resource being fetched, such as '/tor/server/all'
   :var str descriptor_type: type of descriptors being fetched (for options see
     :func:`~stem.descriptor.__init__.parse_file`), this is guessed from the
@@ -336,13 +401,20 @@ class Query(object):
     fails
   :var bool fall_back_to_authority: when retrying request issues the last
     request to a directory authority if **True**
+  :var int hedge: maximum number of endpoints to concurrently request a
+    resource from
+  :var float hedge_delay: seconds to wait for a response before also
+    requesting the resource from another endpoint
+  :var int shards: number of parts to split requests for fingerprints or
+    hashes into, which are downloaded in parallel
 
   :var list downloaded: downloaded descriptors, **None** if not yet retrieved
   :var Exception error: exception if a problem occured
 
   :var float start_time: unix timestamp when we first started running
-  :var dict reply_headers: headers provided in the response,
-    **None** if we haven't yet made our request
+  :var dict reply_headers: headers provided in the response we used (the
+    first shard's if our request was sharded), **None** if we haven't yet
+    received one
   :var float runtime: time our query took, this is **None** if it's not yet
     finished
 
@@ -356,19 +428,36 @@ class Query(object):
   :class:`~stem.DirPort`...
 
   :var float timeout: duration before we'll time out our request
-  :var str download_url: last url used to download the descriptor, this is
-    unset until we've actually made a download attempt
+  :var str download_url: url of the response we used (the first shard's if
+    our request was sharded), or our last attempt's until then. This is unset
+    until we've actually made a download attempt
+  :var stem.descriptor.remote.ConnectionPool connection_pool: reusable
+    connections to download through, a new connection is made for each request
+    if **None**
+
+  Following are only applicable when downloading from a
+  :class:`~stem.ORPort`...
+
+  :var stem.client.RelayPool relay_pool: reusable relay connections and
+    circuits to download through, a new connection and circuit is made for
+    each request if **None**
 
   :param start: start making the request when constructed (default is **True**)
   :param block: only return after the request has been completed, this is
     the same as running **query.run(True)** (default is **False**)
   """
 
-  def __init__(self, resource: str, descriptor_type: Optional[str] = None, endpoints: Optional[Sequence[stem.Endpoint]] = None, compression: Union[stem.descriptor._Compression, Sequence[stem.descriptor._Compression]] = (Compression.GZIP,), retries: int = 2, fall_back_to_authority: bool = False, timeout: Optional[float] = None, start: bool = True, block: bool = False, validate: bool = False, document_handler: stem.descriptor.DocumentHandler = stem.descriptor.DocumentHandler.ENTRIES, **kwargs: Any) -> None:
+  def __init__(self, resource: str, descriptor_type: Optional[str] = None, endpoints: Optional[Sequence[stem.Endpoint]] = None, compression: Union[stem.descriptor._Compression, Sequence[stem.descriptor._Compression]] = (Compression.GZIP,), retries: int = 2, fall_back_to_authority: bool = False, timeout: Optional[float] = None, start: bool = True, block: bool = False, validate: bool = False, document_handler: stem.descriptor.DocumentHandler = stem.descriptor.DocumentHandler.ENTRIES, hedge: int = 1, hedge_delay: float = 0.0, shards: int = 1, connection_pool: Optional['stem.descriptor.remote.ConnectionPool'] = None, relay_pool: Optional['stem.client.RelayPool'] = None, **kwargs: Any) -> None:
     super(Query, self).__init__()
 
     if not resource.startswith('/'):
       raise ValueError("Resources should start with a '/': %s" % resource)
+    elif hedge < 1:
+      raise ValueError('Hedged requests must use at least one endpoint, got %i' % hedge)
+    elif hedge_delay < 0:
+      raise ValueError('Hedge delay cannot be negative, got %s' % hedge_delay)
+    elif shards < 1:
+      raise ValueError('Requests must have at least one shard, got %i' % shards)
 
     if resource.endswith('.z'):
       compression = [Compression.GZIP]
@@ -407,6 +496,11 @@ class Query(object):
     self.compression = compression
     self.retries = retries
     self.fall_back_to_authority = fall_back_to_authority
+    self.hedge = hedge
+    self.hedge_delay = hedge_delay
+    self.shards = shards
+    self.connection_pool = connection_pool
+    self.relay_pool = relay_pool
 
     self.downloaded = None  # type: Optional[List[stem.descriptor.Descriptor]]
     self.error = None  # type: Optional[BaseException]
@@ -424,11 +518,15 @@ class Query(object):
     self._downloader_task = None  # type: Optional[asyncio.Task]
     self._downloader_lock = threading.RLock()
 
+    self._received = []  # type: List[stem.descriptor.Descriptor]
+    self._received_waiters = []  # type: List[asyncio.Future]
+
     # background thread if outside an asyncio context
 
     self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
     self._loop_thread = None  # type: Optional[threading.Thread]
     self._loop_lock = threading.RLock()
+    self._runtime = None  # type: Optional[stem.util.asyncio.Runtime]
 
     if start:
       self.start()
@@ -448,16 +546,29 @@ class Query(object):
             try:
               self._loop = asyncio.get_running_loop()
             except RuntimeError:
-              self._loop = asyncio.new_event_loop()
-              self._loop_thread = threading.Thread(
-                name = 'stem.descriptor.remote query',
-                target = self._loop.run_forever,
-                daemon = True,
-              )
+              self._runtime = stem.util.asyncio.get_runtime()
+
+              if self._runtime:
+                self._loop, self._loop_thread = self._runtime.acquire()
+              else:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                  name = 'stem.descriptor.remote query',
+                  target = self._loop.run_forever,
+                  daemon = True,
+                )
 
-              self._loop_thread.start()
+                self._loop_thread.start()
 
-        self._downloader_task = self._loop.create_task(self._download_descriptors(self.retries, self.timeout))
+        if self._loop_thread and threading.current_thread() != self._loop_thread:
+          # tasks can only be safely created within their loop's thread
+
+          async def create_task() -> asyncio.Task:
+            return asyncio.ensure_future(self._download_descriptors(self.retries, self.timeout))
+
+          self._downloader_task = asyncio.run_coroutine_threadsafe(create_task(), self._loop).result()
+        else:
+          self._downloader_task = self._loop.create_task(self._download_descriptors(self.retries, self.timeout))
 
   def stop(self) -> None:
     """
@@ -470,7 +581,14 @@ class Query(object):
         self._downloader_task.cancel()
 
     with self._loop_lock:
-      if self._loop_thread and self._loop_thread.is_alive():
+      if self._runtime:
+        # Shared loops keep running. Forgetting their thread ensures that
+        # stopping us again won't stop it.
+
+        self._runtime.release(self._loop)
+        self._runtime = None
+        self._loop_thread = None
+      elif self._loop_thread and self._loop_thread.is_alive():
         self._loop.call_soon_threadsafe(self._loop.stop)
         self._loop_thread.join()
 
@@ -529,17 +647,38 @@ class Query(object):
         * :class:`~stem.DownloadFailed` if our request fails
     """
 
-    with self._downloader_lock:
-      if not self.downloaded and not self.error:
+    if self.downloaded is None and not self.error:
+      with self._downloader_lock:
         if not self._downloader_task:
           self.start()
 
-        try:
-          self.downloaded = await self._downloader_task
-        except Exception as exc:
-          self.error = exc
+      # provide descriptors as they're parsed, while the rest of the response
+      # is still being downloaded
 
-    if self.error:
+      index = 0
+
+      while True:
+        while index < len(self._received):
+          yield self._received[index]
+          index += 1
+
+        if self._downloader_task.done():
+          break
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._received_waiters.append(waiter)
+        await asyncio.wait([self._downloader_task, waiter], return_when = asyncio.FIRST_COMPLETED)
+
+      with self._downloader_lock:
+        if self.downloaded is None and not self.error:
+          try:
+            self.downloaded = self._downloader_task.result()
+          except Exception as exc:
+            self.error = exc
+
+      if self.error and not suppress:
+        raise self.error
+    elif self.error:
       if suppress:
         return
 
@@ -549,85 +688,283 @@ class Query(object):
         yield desc
 
   def __iter__(self) -> Iterator[stem.descriptor.Descriptor]:
-    for desc in self.run(True):
+    with self._loop_lock:
+      if self.downloaded is None and not self.error and self._loop is None:
+        self.start()
+
+      is_streamable = self.downloaded is None and not self.error and self._loop_thread is not None
+
+    if not is_streamable:
+      for desc in self.run(True):
+        yield desc
+
+      return
+
+    # provide descriptors as they're downloaded
+
+    for desc in stem.util.asyncio._iterate(self.run_async(True), self._loop):
       yield desc
 
+    self.stop()
+
   async def __aiter__(self) -> AsyncIterator[stem.descriptor.Descriptor]:
     async for desc in self.run_async(True):
       yield desc
 
-  def _pick_endpoint(self, use_authority: bool = False) -> stem.Endpoint:
+  def _pick_endpoint(self, use_authority: bool = False, exclude: Optional[Set[stem.Endpoint]] = None) -> stem.Endpoint:
     """
     Provides an endpoint to query. If we have multiple endpoints then one
     is picked at random.
 
     :param use_authority: ignores our endpoints and uses a directory
       authority instead
+    :param exclude: endpoints to avoid unless they're all that remain
 
     :returns: :class:`stem.Endpoint` for the location to be downloaded
       from by this request
     """
 
     if use_authority or not self.endpoints:
-      picked = random.choice([auth for auth in stem.directory.Authority.from_cache().values() if auth.nickname not in DIR_PORT_BLACKLIST])
-      return stem.DirPort(picked.address, picked.dir_port)
+      authorities = [auth for auth in stem.directory.Authority.from_cache().values() if auth.nickname not in DIR_PORT_BLACKLIST]
+      candidates = [stem.DirPort(auth.address, auth.dir_port) for auth in authorities]  # type: Sequence[stem.Endpoint]
     else:
-      return random.choice(self.endpoints)
+      candidates = self.endpoints
+
+    if exclude:
+      unused = [endpoint for endpoint in candidates if endpoint not in exclude]
+
+      if unused:
+        candidates = unused
+
+    return random.choice(candidates)
 
   async def _download_descriptors(self, retries: int, timeout: Optional[float]) -> List['stem.descriptor.Descriptor']:
     self.start_time = time.time()
 
-    retries = self.retries
-    time_remaining = self.timeout
+    deadline = asyncio.get_event_loop().time() + timeout if timeout is not None else None
+    used_endpoints = set()  # type: Set[stem.Endpoint]
+    resources = _shard_resource(self.resource, self.shards) if self.shards > 1 else [self.resource]
 
-    while True:
-      endpoint = self._pick_endpoint(use_authority = retries == 0 and self.fall_back_to_authority)
+    if len(resources) == 1:
+      await self._download_resource(resources[0], retries, deadline, used_endpoints, self._publish, True)
+    else:
+      # Shards are merged in order. Descriptors of our earliest unfinished
+      # shard are provided as they're parsed, whereas later shards are
+      # buffered until those before them finish.
+
+      buffered = [[] for _ in resources]  # type: List[List[stem.descriptor.Descriptor]]
+      finished = [False] * len(resources)
+      head = 0
+
+      def shard_publisher(index: int) -> Callable[[List['stem.descriptor.Descriptor']], None]:
+        def publish(descriptors: List['stem.descriptor.Descriptor']) -> None:
+          if index == head:
+            self._publish(descriptors)
+          else:
+            buffered[index].extend(descriptors)
+
+        return publish
+
+      async def download_shard(index: int, resource: str) -> None:
+        nonlocal head
+
+        await self._download_resource(resource, retries, deadline, used_endpoints, shard_publisher(index), index == 0)
+        finished[index] = True
+
+        while head < len(resources) and finished[head]:
+          head += 1
+
+          if head < len(resources) and buffered[head]:
+            self._publish(buffered[head])
+            buffered[head] = []
+
+      shards = [asyncio.ensure_future(download_shard(index, resource)) for index, resource in enumerate(resources)]
+
+      try:
+        await asyncio.gather(*shards)
+      finally:
+        for shard in shards:
+          shard.cancel()
+
+    self.runtime = time.time() - self.start_time
+    return list(self._received)
+
+  async def _download_resource(self, resource: str, retries: int, deadline: Optional[float], used_endpoints: Set[stem.Endpoint], publish: Callable[[List['stem.descriptor.Descriptor']], None], is_reported: bool) -> None:
+    """
+    Downloads a resource, concurrently requesting it from up to **hedge**
+    endpoints if they're slow to respond.
+
+    Descriptors are provided to our caller as they're parsed. Until then we
+    can retry or hedge our request, but once the first descriptors of a
+    response are provided the other requests are cancelled, and this response
+    must succeed.
+
+    :param resource: resource to be downloaded
+    :param retries: number of times to attempt the request if it fails
+    :param deadline: event loop time by which we must finish
+    :param used_endpoints: endpoints we've requested from, which we avoid
+      reusing when possible
+    :param publish: provides parsed descriptors to our caller
+    :param is_reported: sets our download_url and reply_headers for the
+      response we use if **True**
+    """
+
+    loop = asyncio.get_event_loop()
+    attempts_remaining = max(retries, 1) + self.hedge - 1
+    pending = {}  # type: Dict[asyncio.Future, str]
+    streams = {}  # type: Dict[asyncio.Future, _ResponseStream]
+    urls = {}  # type: Dict[_ResponseStream, Optional[str]]
+    selected = None  # type: Optional[_ResponseStream]
+    downloaded_from = None
+    error = None  # type: Optional[BaseException]
+
+    parse = functools.partial(
+      stem.descriptor.parse_file,
+      descriptor_type = self.descriptor_type,
+      validate = self.validate,
+      document_handler = self.document_handler,
+      **self.kwargs
+    )
+
+    start_keyword = STREAMABLE_DESCRIPTOR_TYPES.get(self.descriptor_type.split(' ')[0])
+
+    def report(stream: _ResponseStream) -> None:
+      if not is_reported:
+        return
+
+      if urls[stream]:
+        self.download_url = urls[stream]
+
+      if stream.headers is not None:
+        self.reply_headers = stream.headers
+
+    def on_descriptors(stream: _ResponseStream, descriptors: List['stem.descriptor.Descriptor']) -> None:
+      nonlocal attempts_remaining, selected
+
+      if selected is None:
+        selected = stream
+        attempts_remaining = 0
+        report(stream)
+
+        for task, task_stream in streams.items():
+          if task_stream is not stream:
+            task.cancel()
+
+      if stream is selected:
+        publish(descriptors)
+
+    def start_attempt() -> None:
+      nonlocal attempts_remaining, downloaded_from
+
+      attempts_remaining -= 1
+      endpoint = self._pick_endpoint(use_authority = attempts_remaining == 0 and self.fall_back_to_authority, exclude = used_endpoints)
+      used_endpoints.add(endpoint)
 
       if isinstance(endpoint, stem.ORPort):
-        downloaded_from = 'ORPort %s:%s (resource %s)' % (endpoint.address, endpoint.port, self.resource)
+        downloaded_from = 'ORPort %s:%s (resource %s)' % (endpoint.address, endpoint.port, resource)
+        url = None
       elif isinstance(endpoint, stem.DirPort):
-        downloaded_from = 'http://%s:%i/%s' % (endpoint.address, endpoint.port, self.resource.lstrip('/'))
-        self.download_url = downloaded_from
+        downloaded_from = url = 'http://%s:%i/%s' % (endpoint.address, endpoint.port, resource.lstrip('/'))
       else:
         raise ValueError("BUG: endpoints can only be ORPorts or DirPorts, '%s' was a %s" % (endpoint, type(endpoint).__name__))
 
-      try:
-        response = await asyncio.wait_for(self._download_from(endpoint), time_remaining)
-        content, self.reply_headers = _http_body_and_headers(response)
-
-        self.runtime = time.time() - self.start_time
-
-        log.trace('Descriptors retrieved from %s in %0.2fs' % (downloaded_from, self.runtime))
-
-        try:
-          return list(stem.descriptor.parse_file(
-            io.BytesIO(content),
-            self.descriptor_type,
-            validate = self.validate,
-            document_handler = self.document_handler,
-            **self.kwargs
-          ))
-        except ValueError:
-          raise  # parsing failed
-      except asyncio.TimeoutError as exc:
-        raise stem.DownloadTimeout(downloaded_from, exc, sys.exc_info()[2], self.timeout)
-      except:
-        exception = sys.exc_info()[1]
-        retries -= 1
+      if is_reported and url:
+        self.download_url = url  # until we have a response to use
 
-        if time_remaining is not None:
-          time_remaining -= time.time() - self.start_time
+      stream = _ResponseStream(parse, start_keyword, on_descriptors)
+      task = asyncio.ensure_future(self._download_and_parse(endpoint, resource, downloaded_from, stream))
 
-        if retries > 0:
-          log.debug("Failed to download descriptors from '%s' (%i retries remaining): %s" % (downloaded_from, retries, exception))
-        else:
-          log.debug("Failed to download descriptors from '%s': %s" % (self.download_url, exception))
+      pending[task] = downloaded_from
+      streams[task] = stream
+      urls[stream] = url
+
+    try:
+      start_attempt()
+
+      while pending:
+        can_hedge = len(pending) < self.hedge and attempts_remaining > 0
+        wait_time = self.hedge_delay if can_hedge else None
+
+        if deadline is not None:
+          time_remaining = max(deadline - loop.time(), 0)
+          wait_time = time_remaining if wait_time is None else min(wait_time, time_remaining)
+
+        done, _ = await asyncio.wait(list(pending.keys()), timeout = wait_time, return_when = asyncio.FIRST_COMPLETED)
+
+        if not done:
+          if deadline is not None and loop.time() >= deadline:
+            raise stem.DownloadTimeout(downloaded_from, asyncio.TimeoutError(), None, self.timeout)
+
+          log.trace('No response from %s after %0.2fs, also requesting it elsewhere' % (downloaded_from, self.hedge_delay))
+          start_attempt()
+          continue
+
+        for task in done:
+          task_from = pending.pop(task)
+          task_stream = streams.pop(task)
+
+          if task.cancelled() or (selected is not None and task_stream is not selected):
+            continue  # superseded by another response
+
+          try:
+            task.result()
+            report(task_stream)
+            return
+          except Exception as exc:
+            if task_stream is selected:
+              raise  # we've already provided part of this response
+
+            error = exc
+
+            if attempts_remaining > 0 or pending:
+              log.debug("Failed to download descriptors from '%s' (%i retries remaining): %s" % (task_from, attempts_remaining, exc))
+            else:
+              log.debug("Failed to download descriptors from '%s': %s" % (task_from, exc))
+
+        if attempts_remaining > 0 and len(pending) < self.hedge:
+          start_attempt()
+
+      raise error
+    finally:
+      for task in pending:
+        task.cancel()
+
+  async def _download_and_parse(self, endpoint: stem.Endpoint, resource: str, downloaded_from: str, stream: '_ResponseStream') -> None:
+    remainder = await self._download_from(endpoint, resource, stream.feed)
 
-          raise
+    if remainder:
+      stream.feed(remainder)
+
+    stream.finish()
+    log.trace('Descriptors retrieved from %s in %0.2fs' % (downloaded_from, time.time() - self.start_time))
+
+  def _publish(self, descriptors: List['stem.descriptor.Descriptor']) -> None:
+    """
+    Provides descriptors to those iterating over our results.
+    """
+
+    self._received.extend(descriptors)
+    waiters, self._received_waiters = self._received_waiters, []
+
+    for waiter in waiters:
+      if not waiter.done():
+        waiter.set_result(None)
+
+  async def _download_from(self, endpoint: stem.Endpoint, resource: Optional[str] = None, handler: Optional[Callable[[bytes], None]] = None) -> bytes:
+    """
+    Requests a resource from the given endpoint.
+
+    :param endpoint: endpoint to download from
+    :param resource: resource to request, our own if **None**
+    :param handler: if provided this is called with the response as it's
+      received
+
+    :returns: **bytes** with the portion of the response that wasn't
+      provided to our handler
+    """
 
-  async def _download_from(self, endpoint: stem.Endpoint) -> bytes:
     http_request = '\r\n'.join((
-      'GET %s HTTP/1.0' % self.resource,
+      'GET %s HTTP/1.0' % (resource if resource else self.resource),
       'Accept-Encoding: %s' % ', '.join(map(lambda c: c.encoding, self.compression)),
       'User-Agent: %s' % stem.USER_AGENT,
     )) + '\r\n\r\n'
@@ -635,23 +972,265 @@ class Query(object):
     if isinstance(endpoint, stem.ORPort):
       link_protocols = endpoint.link_protocols if endpoint.link_protocols else [3]
 
+      if self.relay_pool:
+        return await self.relay_pool.directory(endpoint.address, endpoint.port, http_request, link_protocols)
+
       async with await stem.client.Relay.connect(endpoint.address, endpoint.port, link_protocols) as relay:
         async with await relay.create_circuit() as circ:
           return await circ.directory(http_request, stream_id = 1)
     elif isinstance(endpoint, stem.DirPort):
+      if self.connection_pool:
+        return await self.connection_pool.request(endpoint, resource if resource else self.resource, self.compression, handler)
+
       reader, writer = await asyncio.open_connection(endpoint.address, endpoint.port)
-      writer.write(str_tools._to_bytes(http_request))
 
-      return await reader.read()
+      try:
+        writer.write(str_tools._to_bytes(http_request))
+
+        if not handler:
+          return await reader.read()
+
+        while True:
+          data = await reader.read(HTTP_READ_SIZE)
+
+          if not data:
+            return b''
+
+          handler(data)
+      finally:
+        writer.close()
     else:
       raise ValueError("BUG: endpoints can only be ORPorts or DirPorts, '%s' was a %s" % (endpoint, type(endpoint).__name__))
 
 
+class _ResponseStream(object):
+  """
+  Decompresses and parses a HTTP response as it's received. Descriptors that
+  can be told apart by the keyword they begin with are parsed in chunks as
+  they arrive, while other documents are parsed when the response concludes.
+
+  :var dict headers: headers of the response, **None** until they're received
+  """
+
+  def __init__(self, parse: Callable[[BinaryIO], Iterator['stem.descriptor.Descriptor']], start_keyword: Optional[bytes], on_descriptors: Callable[['stem.descriptor.remote._ResponseStream', List['stem.descriptor.Descriptor']], None]) -> None:
+    self.headers = None  # type: Optional[Dict[str, str]]
+
+    self._parse = parse
+    self._divider = b'\n' + start_keyword if start_keyword else None
+    self._on_descriptors = on_descriptors
+
+    self._head = bytearray()
+    self._decompressor = None  # type: Optional[stem.descriptor._Decompressor]
+    self._content = bytearray()
+    self._is_parsed = False
+
+  def feed(self, data: bytes) -> None:
+    """
+    Adds content from the response.
+
+    :param data: next portion of the response
+
+    :raises:
+      * **stem.ProtocolError** if response was unsuccessful or malformed
+      * **ValueError** if the encoding or descriptor content is invalid
+      * **OSError** if unable to decompress the content
+    """
+
+    if self._decompressor is None:
+      self._head += data
+
+      if b'\r\n\r\n' not in self._head:
+        return
+
+      header_end = self._head.index(b'\r\n\r\n')
+      self.headers, compression = _http_headers(bytes(self._head[:header_end]))
+      self._decompressor = compression.decompressor()
+
+      data = bytes(self._head[header_end + 4:])
+      self._head = bytearray()
+
+    self._content += self._decompressor.decompress(data)
+
+    if self._divider and len(self._content) >= STREAM_CHUNK_SIZE:
+      divider = self._content.rfind(self._divider)
+
+      if divider > 0:
+        chunk = bytes(self._content[:divider + 1])
+        del self._content[:divider + 1]
+        self._parse_chunk(chunk)
+
+  def finish(self) -> None:
+    """
+    Parses the remainder of our response once it's been fully received.
+
+    :raises:
+      * **stem.ProtocolError** if response was malformed
+      * **ValueError** if the descriptor content is invalid
+      * **OSError** if unable to decompress the content
+    """
+
+    if self._decompressor is None:
+      raise stem.ProtocolError('HTTP response concluded before its headers: %s' % str_tools._to_unicode(bytes(self._head)))
+
+    self._content += self._decompressor.flush()
+    content = bytes(self._content).rstrip()
+    self._content = bytearray()
+
+    if content or not self._is_parsed:
+      self._parse_chunk(content)
+
+  def _parse_chunk(self, chunk: bytes) -> None:
+    self._is_parsed = True
+    descriptors = list(self._parse(io.BytesIO(chunk)))
+
+    if descriptors:
+      self._on_descriptors(self, descriptors)
+
+
+class ConnectionPool(object):
+  """
+  DirPort connections that are kept open so they can be reused by later
+  requests to the same endpoint. Requests use HTTP/1.1 keep-alive, and if the
+  endpoint closes our connection or won't keep it alive we simply open a new
+  one.
+
+  Connections are not bound to an event loop, so a pool can be shared by
+  queries running in different threads.
+
+  .. versionadded:: 2.0.0
+
+  :var int max_idle: maximum number of unused connections kept per endpoint
+  :var float idle_timeout: seconds an unused connection is kept
+  """
+
+  def __init__(self, max_idle: int = 4, idle_timeout: float = 30.0) -> None:
+    self.max_idle = max_idle
+    self.idle_timeout = idle_timeout
+
+    self._idle = {}  # type: Dict[stem.DirPort, List[Tuple[socket.socket, float]]]
+    self._lock = threading.RLock()
+
+  async def request(self, endpoint: stem.DirPort, resource: str, compression: Sequence[stem.descriptor._Compression], handler: Optional[Callable[[bytes], None]] = None) -> bytes:
+    """
+    Requests a resource from the given DirPort.
+
+    :param endpoint: DirPort to download from
+    :param resource: resource to be requested
+    :param compression: encodings we're willing to accept
+    :param handler: if provided this is called with the response as it's
+      received rather than returning it
+
+    :returns: **bytes** with the HTTP response headers and body
+
+    :raises:
+      * **OSError** if unable to connect or the connection fails
+      * :class:`stem.ProtocolError` if the response is malformed
+    """
+
+    http_request = str_tools._to_bytes('\r\n'.join((
+      'GET %s HTTP/1.1' % resource,
+      'Host: %s:%i' % (endpoint.address, endpoint.port),
+      'Accept-Encoding: %s' % ', '.join(map(lambda c: c.encoding, compression)),
+      'User-Agent: %s' % stem.USER_AGENT,
+    )) + '\r\n\r\n')
+
+    sock = self._acquire(endpoint)
+
+    if sock is not None:
+      is_received = False
+
+      def received(data: bytes) -> None:
+        nonlocal is_received
+        is_received = True
+        handler(data)
+
+      try:
+        response, keep_alive = await _http_request(sock, http_request, received if handler else None)
+        self._release(endpoint, sock, keep_alive)
+        return response
+      except (OSError, stem.ProtocolError) as exc:
+        sock.close()
+
+        if is_received:
+          raise  # our handler has a partial response, so we can't retry
+
+        log.trace('Reused connection to %s:%i failed (%s), opening a new one' % (endpoint.address, endpoint.port, exc))
+      except:
+        sock.close()
+        raise
+
+    sock = await _connect(endpoint)
+
+    try:
+      response, keep_alive = await _http_request(sock, http_request, handler)
+    except:
+      sock.close()
+      raise
+
+    self._release(endpoint, sock, keep_alive)
+    return response
+
+  def close(self) -> None:
+    """
+    Closes our unused connections.
+    """
+
+    with self._lock:
+      for connections in self._idle.values():
+        for sock, _ in connections:
+          sock.close()
+
+      self._idle = {}
+
+  def _acquire(self, endpoint: stem.DirPort) -> Optional[socket.socket]:
+    """
+    Provides an unused connection to this endpoint, closing those that have
+    expired.
+    """
+
+    with self._lock:
+      connections = self._idle.get(endpoint, [])
+
+      while connections:
+        sock, idle_since = connections.pop()
+
+        if time.monotonic() - idle_since < self.idle_timeout:
+          return sock
+
+        sock.close()
+
+      return None
+
+  def _release(self, endpoint: stem.DirPort, sock: socket.socket, keep_alive: bool) -> None:
+    """
+    Returns a connection to our pool if it can be reused.
+    """
+
+    with self._lock:
+      connections = self._idle.setdefault(endpoint, [])
+
+      if keep_alive and len(connections) < self.max_idle:
+        connections.append((sock, time.monotonic()))
+      else:
+        sock.close()
+
+
 class DescriptorDownloader(object):
   """
   Configurable class that issues :class:`~stem.descriptor.remote.Query`
   instances on your behalf.
 
+  Queries share a :class:`~stem.descriptor.remote.ConnectionPool` so
+  DirPort connections are reused across requests to the same endpoint, and a
+  :class:`~stem.client.RelayPool` so ORPort requests reuse the same relay
+  connection and circuit.
+
+  .. versionchanged:: 2.0.0
+     Reusing DirPort connections between queries.
+
+  .. versionchanged:: 2.0.0
+     Reusing ORPort connections and circuits between queries.
+
   :param use_mirrors: downloads the present consensus and uses the directory
     mirrors to fetch future requests, this fails silently if the consensus
     cannot be downloaded
@@ -661,6 +1240,8 @@ class DescriptorDownloader(object):
 
   def __init__(self, use_mirrors: bool = False, **default_args: Any) -> None:
     self._default_args = default_args
+    self._connection_pool = ConnectionPool()
+    self._relay_pool = stem.client.RelayPool()
 
     self._endpoints = None  # type: Optional[List[stem.DirPort]]
 
@@ -726,7 +1307,8 @@ class DescriptorDownloader(object):
     :returns: :class:`~stem.descriptor.remote.Query` for the server descriptors
 
     :raises: **ValueError** if we request more than 96 descriptors by their
-      fingerprints (this is due to a limit on the url length by squid proxies).
+      fingerprints without sharding (this is due to a limit on the url length
+      by squid proxies).
     """
 
     resource = '/tor/server/all'
@@ -735,7 +1317,7 @@ class DescriptorDownloader(object):
       fingerprints = [fingerprints]
 
     if fingerprints:
-      if len(fingerprints) > MAX_FINGERPRINTS:
+      if len(fingerprints) > MAX_FINGERPRINTS and not self._is_sharded(query_args):
         raise ValueError('Unable to request more than %i descriptors at a time by their fingerprints' % MAX_FINGERPRINTS)
 
       resource = '/tor/server/fp/%s' % '+'.join(fingerprints)
@@ -756,7 +1338,8 @@ class DescriptorDownloader(object):
     :returns: :class:`~stem.descriptor.remote.Query` for the extrainfo descriptors
 
     :raises: **ValueError** if we request more than 96 descriptors by their
-      fingerprints (this is due to a limit on the url length by squid proxies).
+      fingerprints without sharding (this is due to a limit on the url length
+      by squid proxies).
     """
 
     resource = '/tor/extra/all'
@@ -765,7 +1348,7 @@ class DescriptorDownloader(object):
       fingerprints = [fingerprints]
 
     if fingerprints:
-      if len(fingerprints) > MAX_FINGERPRINTS:
+      if len(fingerprints) > MAX_FINGERPRINTS and not self._is_sharded(query_args):
         raise ValueError('Unable to request more than %i descriptors at a time by their fingerprints' % MAX_FINGERPRINTS)
 
       resource = '/tor/extra/fp/%s' % '+'.join(fingerprints)
@@ -806,13 +1389,14 @@ class DescriptorDownloader(object):
     :returns: :class:`~stem.descriptor.remote.Query` for the microdescriptors
 
     :raises: **ValueError** if we request more than 92 microdescriptors by their
-      hashes (this is due to a limit on the url length by squid proxies).
+      hashes without sharding (this is due to a limit on the url length by
+      squid proxies).
     """
 
     if isinstance(hashes, str):
       hashes = [hashes]
 
-    if len(hashes) > MAX_MICRODESCRIPTOR_HASHES:
+    if len(hashes) > MAX_MICRODESCRIPTOR_HASHES and not self._is_sharded(query_args):
       raise ValueError('Unable to request more than %i microdescriptors at a time by their hashes' % MAX_MICRODESCRIPTOR_HASHES)
 
     return self.query('/tor/micro/d/%s' % '-'.join(hashes), **query_args)
@@ -896,8 +1480,8 @@ class DescriptorDownloader(object):
     :returns: :class:`~stem.descriptor.remote.Query` for the key certificates
 
     :raises: **ValueError** if we request more than 96 key certificates by
-      their identity fingerprints (this is due to a limit on the url length by
-      squid proxies).
+      their identity fingerprints without sharding (this is due to a limit on
+      the url length by squid proxies).
     """
 
     resource = '/tor/keys/all'
@@ -906,7 +1490,7 @@ class DescriptorDownloader(object):
       authority_v3idents = [authority_v3idents]
 
     if authority_v3idents:
-      if len(authority_v3idents) > MAX_FINGERPRINTS:
+      if len(authority_v3idents) > MAX_FINGERPRINTS and not self._is_sharded(query_args):
         raise ValueError('Unable to request more than %i key certificates at a time by their identity fingerprints' % MAX_FINGERPRINTS)
 
       resource = '/tor/keys/fp/%s' % '+'.join(authority_v3idents)
@@ -1006,8 +1590,204 @@ class DescriptorDownloader(object):
     if 'endpoints' not in args:
       args['endpoints'] = self._endpoints
 
+    if 'connection_pool' not in args:
+      args['connection_pool'] = self._connection_pool
+
+    if 'relay_pool' not in args:
+      args['relay_pool'] = self._relay_pool
+
     return Query(resource, **args)
 
+  def close(self) -> None:
+    """
+    Closes the DirPort and relay connections our queries pool, along with the
+    thread managing our relay connections. Later queries open new ones.
+
+    .. versionadded:: 2.0.0
+    """
+
+    self._connection_pool.close()
+    self._relay_pool.close()
+
+  def __enter__(self) -> 'stem.descriptor.remote.DescriptorDownloader':
+    return self
+
+  def __exit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+    self.close()
+
+  def _is_sharded(self, query_args: Dict[str, Any]) -> bool:
+    """
+    Checks if queries with these arguments are split into shards, in which
+    case they can request any number of descriptors.
+    """
+
+    return query_args.get('shards', self._default_args.get('shards', 1)) > 1
+
+
+async def _connect(endpoint: stem.DirPort) -> socket.socket:
+  """
+  Opens a non-blocking connection to the given DirPort.
+
+  :param endpoint: DirPort to connect to
+
+  :returns: connected **socket.socket**
+
+  :raises: **OSError** if unable to connect
+  """
+
+  loop = asyncio.get_event_loop()
+  family, sock_type, proto, _, address = (await loop.getaddrinfo(endpoint.address, endpoint.port, type = socket.SOCK_STREAM))[0]
+  sock = socket.socket(family, sock_type, proto)
+  sock.setblocking(False)
+
+  try:
+    await loop.sock_connect(sock, address)
+  except:
+    sock.close()
+    raise
+
+  return sock
+
+
+async def _http_request(sock: socket.socket, http_request: bytes, handler: Optional[Callable[[bytes], None]] = None) -> Tuple[bytes, bool]:
+  """
+  Sends a HTTP request and reads its response. The response's body is
+  delimited by its Content-Length, chunked transfer encoding, or by the
+  connection closing.
+
+  :param sock: connection to send the request over
+  :param http_request: request to be sent
+  :param handler: if provided this is called with the response as it's
+    received rather than returning it
+
+  :returns: **tuple** of the form (response, keep_alive), where the response
+    has any transfer encoding removed and keep_alive indicates if the
+    connection can be reused
+
+  :raises:
+    * **OSError** if the connection fails
+    * :class:`stem.ProtocolError` if the response is malformed
+  """
+
+  loop = asyncio.get_event_loop()
+  await loop.sock_sendall(sock, http_request)
+
+  buffer = bytearray()
+  response = []  # type: List[bytes]
+  emit = handler if handler else response.append
+
+  async def recv() -> bool:
+    data = await loop.sock_recv(sock, HTTP_READ_SIZE)
+    buffer.extend(data)
+    return bool(data)
+
+  while b'\r\n\r\n' not in buffer:
+    if not await recv():
+      raise stem.ProtocolError('Connection closed before we received a complete HTTP response')
+
+  header_end = buffer.index(b'\r\n\r\n')
+  head = bytes(buffer[:header_end])
+  del buffer[:header_end + 4]
+
+  status_line, _, header_data = head.partition(b'\r\n')
+  headers = {}
+
+  for line in header_data.split(b'\r\n'):
+    key, _, value = line.partition(b':')
+    headers[key.strip().lower()] = value.strip().lower()
+
+  if status_line.startswith(b'HTTP/1.1 '):
+    keep_alive = headers.get(b'connection') != b'close'
+  else:
+    keep_alive = headers.get(b'connection') == b'keep-alive'
+
+  if headers.get(b'transfer-encoding') == b'chunked':
+    emit(b'\r\n'.join([line for line in head.split(b'\r\n') if not line.lower().startswith(b'transfer-encoding:')]) + b'\r\n\r\n')
+
+    while True:
+      while b'\r\n' not in buffer:
+        if not await recv():
+          raise stem.ProtocolError('Connection closed within a chunked HTTP response')
+
+      size_line, _, _ = bytes(buffer[:buffer.index(b'\r\n')]).partition(b';')
+
+      try:
+        chunk_size = int(size_line, 16)
+      except ValueError:
+        raise stem.ProtocolError("'%s' is not a valid HTTP chunk size" % str_tools._to_unicode(size_line))
+
+      chunk_end = buffer.index(b'\r\n') + 2 + chunk_size
+
+      if chunk_size == 0:
+        while b'\r\n\r\n' not in buffer[chunk_end - 2:]:  # trailers end with a blank line
+          if not await recv():
+            raise stem.ProtocolError('Connection closed within a chunked HTTP response')
+
+        break
+
+      while len(buffer) < chunk_end + 2:
+        if not await recv():
+          raise stem.ProtocolError('Connection closed within a chunked HTTP response')
+
+      emit(bytes(buffer[chunk_end - chunk_size:chunk_end]))
+      del buffer[:chunk_end + 2]
+  elif b'content-length' in headers:
+    try:
+      content_length = int(headers[b'content-length'])
+    except ValueError:
+      raise stem.ProtocolError("'%s' is not a valid HTTP Content-Length" % str_tools._to_unicode(headers[b'content-length']))
+
+    emit(head + b'\r\n\r\n')
+    received = 0
+
+    while True:
+      if buffer:
+        emit(bytes(buffer[:content_length - received]))
+        received += min(len(buffer), content_length - received)
+        del buffer[:]
+
+      if received >= content_length:
+        break
+      elif not await recv():
+        raise stem.ProtocolError('Connection closed after %i of %i HTTP content bytes' % (received, content_length))
+  else:
+    emit(head + b'\r\n\r\n')
+
+    while True:
+      if buffer:
+        emit(bytes(buffer))
+        del buffer[:]
+
+      if not await recv():
+        break
+
+    keep_alive = False
+
+  return b''.join(response), keep_alive
+
+
+def _shard_resource(resource: str, shards: int) -> List[str]:
+  """
+  Splits a request for fingerprints or hashes into several smaller requests,
+  each within the limit of what can be requested at a time.
+
+  :param resource: resource to be split
+  :param shards: minimum number of parts to split the resource into
+
+  :returns: **list** of resources, this is just our resource if it isn't for
+    fingerprints or hashes
+  """
+
+  for prefix, divider, limit in SHARDABLE_RESOURCES:
+    if resource.startswith(prefix):
+      items = resource[len(prefix):].split(divider)
+      shard_count = min(len(items), max(shards, (len(items) + limit - 1) // limit))
+      shard_size = (len(items) + shard_count - 1) // shard_count
+
+      return [prefix + divider.join(items[i:i + shard_size]) for i in range(0, len(items), shard_size)]
+
+  return [resource]
+
 
 def _http_body_and_headers(data: bytes) -> Tuple[bytes, Dict[str, str]]:
   """
@@ -1036,10 +1816,28 @@ def _http_body_and_headers(data: bytes) -> Tuple[bytes, Dict[str, str]]:
     * **ImportError** if missing the decompression module
   """
 
-  first_line, data = data.split(b'\r\n', 1)
-  header_data, body_data = data.split(b'\r\n\r\n', 1)
+  head, body_data = data.split(b'\r\n\r\n', 1)
+  headers, compression = _http_headers(head)
+
+  return compression.decompress(body_data).rstrip(), headers
+
+
+def _http_headers(head: bytes) -> Tuple[Dict[str, str], stem.descriptor._Compression]:
+  """
+  Parse the status and headers of a HTTP response.
+
+  :param head: HTTP response up to the blank line that concludes its headers
+
+  :returns: **tuple** with the headers and compression of the response body
+
+  :raises:
+    * **stem.ProtocolError** if response was unsuccessful or malformed
+    * **ValueError** if encoding is unrecognized
+  """
+
+  first_line, _, header_data = head.partition(b'\r\n')
 
-  if not first_line.startswith(b'HTTP/1.0 2'):
+  if not (first_line.startswith(b'HTTP/1.0 2') or first_line.startswith(b'HTTP/1.1 2')):
     raise stem.ProtocolError("Response should begin with HTTP success, but was '%s'" % str_tools._to_unicode(first_line))
 
   headers = {}
@@ -1054,11 +1852,11 @@ def _http_body_and_headers(data: bytes) -> Tuple[bytes, Dict[str, str]]:
   encoding = headers.get('Content-Encoding')
 
   if encoding == 'deflate':
-    return stem.descriptor.Compression.GZIP.decompress(body_data).rstrip(), headers
+    return headers, stem.descriptor.Compression.GZIP
 
   for compression in stem.descriptor.Compression:
     if encoding == compression.encoding:
-      return compression.decompress(body_data).rstrip(), headers
+      return headers, compression
 
   raise ValueError("'%s' is an unrecognized encoding" % encoding)
 
@@ -14,6 +14,8 @@ sources...
 ::
 
   RouterStatusEntry - Common parent for router status entries
+    |- compact - reduces the memory used by this entry
+    |
     |- RouterStatusEntryV2 - Entry for a network status v2 document
     |   +- RouterStatusEntryBridgeV2 - Entry for a bridge flavored v2 document
     |
@@ -281,7 +283,7 @@ def _parse_p_line(descriptor: 'stem.descriptor.Descriptor', entries: ENTRY_TYPE)
   value = _value('p', entries)
 
   try:
-    descriptor.exit_policy = stem.exit_policy.MicroExitPolicy(value)
+    descriptor.exit_policy = stem.exit_policy.intern_micro_policy(value)
   except ValueError as exc:
     raise ValueError('%s exit policy is malformed (%s): p %s' % (descriptor._name(), exc, value))
 
@@ -476,6 +478,29 @@ class RouterStatusEntry(Descriptor):
     else:
       self._entries = entries
 
+  def compact(self) -> None:
+    """
+    Reduces the memory this entry uses. Unless we were parsed with validation
+    this retains the content we need to lazy load our attributes, which is
+    many times larger than the entry itself. This parses everything and
+    discards that content.
+
+    Values that are commonly the same between relays, such as their flags,
+    version, and protocols, are shared between compacted entries rather than
+    copied, so they should not be modified.
+
+    ::
+
+      consensus = stem.descriptor.parse_file(path, document_handler = DocumentHandler.DOCUMENT)
+
+      for router in consensus.routers.values():
+        router.compact()
+
+    .. versionadded:: 2.0.0
+    """
+
+    self._compact(self._shared_fields())
+
   def _name(self, is_plural: bool = False) -> str:
     """
     Name for this descriptor type.
@@ -497,6 +522,13 @@ class RouterStatusEntry(Descriptor):
 
     return ()
 
+  def _shared_fields(self) -> Tuple[str, ...]:
+    """
+    Provides lines that are commonly identical between relays.
+    """
+
+    return ('s', 'v')
+
 
 class RouterStatusEntryV2(RouterStatusEntry):
   """
@@ -622,6 +654,9 @@ class RouterStatusEntryV3(RouterStatusEntry):
   def _single_fields(self) -> Tuple[str, ...]:
     return ('r', 's', 'v', 'w', 'p', 'pr')
 
+  def _shared_fields(self) -> Tuple[str, ...]:
+    return ('s', 'v', 'p', 'pr')
+
 
 class RouterStatusEntryMicroV3(RouterStatusEntry):
   """
@@ -687,3 +722,6 @@ class RouterStatusEntryMicroV3(RouterStatusEntry):
 
   def _single_fields(self) -> Tuple[str, ...]:
     return ('r', 's', 'v', 'w', 'm', 'pr')
+
+  def _shared_fields(self) -> Tuple[str, ...]:
+    return ('s', 'v', 'pr')
@@ -136,8 +136,8 @@ BridgeDistribution = stem.util.enum.Enum(
   ('HYPHAE', 'hyphae'),
 )
 
-DEFAULT_IPV6_EXIT_POLICY = stem.exit_policy.MicroExitPolicy('reject 1-65535')
-REJECT_ALL_POLICY = stem.exit_policy.ExitPolicy('reject *:*')
+DEFAULT_IPV6_EXIT_POLICY = stem.exit_policy.intern_micro_policy('reject 1-65535')
+REJECT_ALL_POLICY = stem.exit_policy.intern_policy('reject *:*')
 DEFAULT_BRIDGE_DISTRIBUTION = 'any'
 
 
@@ -393,7 +393,7 @@ def _parse_exit_policy(descriptor: 'stem.descriptor.Descriptor', entries: ENTRY_
     if descriptor._unparsed_exit_policy and stem.util.str_tools._to_unicode(descriptor._unparsed_exit_policy[0]) == 'reject *:*':
       descriptor.exit_policy = REJECT_ALL_POLICY
     else:
-      descriptor.exit_policy = stem.exit_policy.ExitPolicy(*descriptor._unparsed_exit_policy)
+      descriptor.exit_policy = stem.exit_policy.intern_policy(*descriptor._unparsed_exit_policy)
 
     del descriptor._unparsed_exit_policy
 
@@ -405,7 +405,7 @@ _parse_contact_line = _parse_bytes_line('contact', 'contact')
 _parse_published_line = _parse_timestamp_line('published', 'published')
 _parse_read_history_line = functools.partial(_parse_history_line, 'read-history', 'read_history_end', 'read_history_interval', 'read_history_values')
 _parse_write_history_line = functools.partial(_parse_history_line, 'write-history', 'write_history_end', 'write_history_interval', 'write_history_values')
-_parse_ipv6_policy_line = _parse_simple_line('ipv6-policy', 'exit_policy_v6', func = lambda v: stem.exit_policy.MicroExitPolicy(v))
+_parse_ipv6_policy_line = _parse_simple_line('ipv6-policy', 'exit_policy_v6', func = stem.exit_policy.intern_micro_policy)
 _parse_allow_single_hop_exits_line = _parse_if_present('allow-single-hop-exits', 'allow_single_hop_exits')
 _parse_tunneled_dir_server_line = _parse_if_present('tunnelled-dir-server', 'allow_tunneled_dir_requests')
 _parse_proto_line = _parse_protocol_line('proto', 'protocols')
@@ -24,10 +24,14 @@ exiting to a destination is permissible or not. For instance...
 
 ::
 
+  intern_policy - shared ExitPolicy for the given rules
+  intern_micro_policy - shared MicroExitPolicy for the given policy
+
   ExitPolicy - Exit policy for a Tor relay
     |- MicroExitPolicy - Microdescriptor exit policy
     |
     |- can_exit_to - check if exiting to this destination is allowed or not
+    |- can_exit_to_many - check if exiting to several destinations is allowed
     |- is_exiting_allowed - check if any exiting is allowed
     |- summary - provides a short label, similar to a microdescriptor
     |- has_private - checks if policy has anything expanded from the 'private' keyword
@@ -63,7 +67,10 @@ exiting to a destination is permissible or not. For instance...
   ============ ===========
 """
 
+import bisect
 import functools
+import threading
+import weakref
 import zlib
 
 import stem.util
@@ -71,7 +78,7 @@ import stem.util.connection
 import stem.util.enum
 import stem.util.str_tools
 
-from typing import Any, Iterator, List, Optional, Sequence, Set, Union
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 AddressType = stem.util.enum.Enum(('WILDCARD', 'Wildcard'), ('IPv4', 'IPv4'), ('IPv6', 'IPv6'))
 
@@ -90,6 +97,65 @@ PRIVATE_ADDRESSES = (
   '172.16.0.0/12',
 )
 
+# Policies shared by intern_policy() and intern_micro_policy(), keyed by their
+# text. These are only kept while something refers to them.
+
+_INTERN_LOCK = threading.RLock()
+_INTERNED_POLICIES = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary[Tuple[str, ...], ExitPolicy]
+_INTERNED_MICRO_POLICIES = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary[str, MicroExitPolicy]
+
+
+def intern_policy(*rules: Union[str, bytes]) -> 'stem.exit_policy.ExitPolicy':
+  """
+  Provides an :class:`~stem.exit_policy.ExitPolicy` for the given rules. Relays
+  commonly publish identical policies, so rather than each descriptor parsing
+  its own copy this provides the same instance for the same rules.
+
+  Interned policies are shared, so they should be treated as immutable.
+
+  .. versionadded:: 2.0.0
+
+  :param rules: exit policy rules
+
+  :returns: :class:`~stem.exit_policy.ExitPolicy` for these rules
+  """
+
+  key = tuple([stem.util.str_tools._to_unicode(rule) for rule in rules])
+
+  with _INTERN_LOCK:
+    policy = _INTERNED_POLICIES.get(key)
+
+    if policy is None:
+      policy = ExitPolicy(*key)
+      _INTERNED_POLICIES[key] = policy
+
+    return policy
+
+
+def intern_micro_policy(policy: str) -> 'stem.exit_policy.MicroExitPolicy':
+  """
+  Provides a :class:`~stem.exit_policy.MicroExitPolicy` for the given policy,
+  the same instance for the same policy text. This is the microdescriptor
+  counterpart of :func:`~stem.exit_policy.intern_policy`.
+
+  .. versionadded:: 2.0.0
+
+  :param policy: policy string that describes this policy
+
+  :returns: :class:`~stem.exit_policy.MicroExitPolicy` for this policy
+
+  :raises: **ValueError** if the policy is malformed
+  """
+
+  with _INTERN_LOCK:
+    micro_policy = _INTERNED_MICRO_POLICIES.get(policy)
+
+    if micro_policy is None:
+      micro_policy = MicroExitPolicy(policy)
+      _INTERNED_MICRO_POLICIES[policy] = micro_policy
+
+    return micro_policy
+
 
 def _flag_private_rules(rules: Sequence['ExitPolicyRule']) -> None:
   """
@@ -224,6 +290,42 @@ class ExitPolicy(object):
 
     return self._is_allowed_default
 
+  def can_exit_to_many(self, addresses: Sequence[str], ports: Sequence[int]) -> List[bool]:
+    """
+    Checks if this policy allows exiting to several destinations. This is
+    equivalent to calling :func:`~stem.exit_policy.ExitPolicy.can_exit_to`
+    for each address and port pair, but rather than walking our rules for each
+    destination the policy is compiled into sorted, non-overlapping address
+    and port ranges that are binary searched.
+
+    ::
+
+      >>> policy = ExitPolicy('reject 10.0.0.0/8:*', 'accept *:80', 'reject *:*')
+      >>> policy.can_exit_to_many(['10.0.0.1', '75.119.206.243', '75.119.206.243'], [80, 80, 443])
+      [False, True, False]
+
+    .. versionadded:: 2.0.0
+
+    :param addresses: IPv4 or IPv6 addresses (with or without brackets)
+    :param ports: port number of each destination
+
+    :returns: **list** with a **bool** for each destination, **True** if
+      exiting to it is allowed and **False** otherwise
+
+    :raises: **ValueError** if provided with a malformed address or port, or
+      a different number of addresses and ports
+    """
+
+    if len(addresses) != len(ports):
+      raise ValueError('can_exit_to_many() requires a port for each address, but had %i addresses and %i ports' % (len(addresses), len(ports)))
+
+    compiled = self._compile()
+
+    if compiled is None:
+      return [self.can_exit_to(address, port) for address, port in zip(addresses, ports)]
+
+    return [compiled.can_exit_to(address, port) for address, port in zip(addresses, ports)]
+
   @functools.lru_cache()
   def is_exiting_allowed(self) -> bool:
     """
@@ -381,6 +483,24 @@ class ExitPolicy(object):
 
     return ExitPolicy(*[rule for rule in self._get_rules() if not rule.is_default()])
 
+  @functools.lru_cache()
+  def _compile(self) -> Optional['stem.exit_policy._CompiledExitPolicy']:
+    # Provides our policy as sorted address and port ranges, or None if it
+    # has rules that can't be represented that way (masks such as
+    # '255.255.0.255' cover a set of addresses rather than a range).
+
+    if not self.is_exiting_allowed():
+      return _CompiledExitPolicy(None, None)
+
+    rules = self._get_rules()
+    ipv4 = _compile_address_ranges(rules, AddressType.IPv4, 32, self._is_allowed_default)
+    ipv6 = _compile_address_ranges(rules, AddressType.IPv6, 128, self._is_allowed_default)
+
+    if ipv4 is None or ipv6 is None:
+      return None
+
+    return _CompiledExitPolicy(ipv4, ipv6)
+
   def _get_rules(self) -> Sequence['stem.exit_policy.ExitPolicyRule']:
     # Local reference to our input_rules so this can be lock free. Otherwise
     # another thread might unset our input_rules while processing them.
@@ -1024,6 +1144,145 @@ class MicroExitPolicyRule(ExitPolicyRule):
     return not self == other
 
 
+class _CompiledExitPolicy(object):
+  """
+  Exit policy reduced to sorted, non-overlapping ranges. Each address family
+  is a list of address range starts, each with a table of port range starts
+  and whether they're accepted. Lookups are two binary searches regardless of
+  how many rules the policy has.
+
+  Families are **None** if the policy doesn't allow any exiting.
+  """
+
+  def __init__(self, ipv4: Optional['_AddressRanges'], ipv6: Optional['_AddressRanges']) -> None:
+    self._ipv4 = ipv4
+    self._ipv6 = ipv6
+
+  def can_exit_to(self, address: str, port: int) -> bool:
+    is_ipv6, address_int = _address_to_int(address)
+
+    if not stem.util.connection.is_valid_port(port):
+      raise ValueError("'%s' isn't a valid port" % port)
+
+    ranges = self._ipv6 if is_ipv6 else self._ipv4
+
+    if ranges is None:
+      return False
+
+    address_starts, port_tables = ranges
+    port_starts, port_results = port_tables[bisect.bisect_right(address_starts, address_int) - 1]
+
+    return port_results[bisect.bisect_right(port_starts, int(port)) - 1]
+
+
+# Address range starts, each with a table of (port range starts, is_accept).
+
+_PortRanges = Tuple[Tuple[int, ...], Tuple[bool, ...]]
+_AddressRanges = Tuple[List[int], List[_PortRanges]]
+
+
+@functools.lru_cache(maxsize = 4096)
+def _address_to_int(address: str) -> Tuple[bool, int]:
+  # Provides a tuple of the form (is_ipv6, address_int). This is cached since
+  # scanners commonly check the same addresses against many policies.
+
+  if stem.util.connection.is_valid_ipv4_address(address):
+    return False, stem.util.connection.address_to_int(address)
+  elif stem.util.connection.is_valid_ipv6_address(address, allow_brackets = True):
+    return True, stem.util.connection.address_to_int(address.lstrip('[').rstrip(']'))
+  else:
+    raise ValueError("'%s' isn't a valid IPv4 or IPv6 address" % address)
+
+
+def _compile_address_ranges(rules: Sequence['ExitPolicyRule'], address_type: AddressType, address_bits: int, is_allowed_default: bool) -> Optional[_AddressRanges]:
+  """
+  Splits an address family into the ranges where the same rules apply, and
+  resolves the first match for each port within them.
+
+  :param rules: rules of the policy
+  :param address_type: address family to compile
+  :param address_bits: number of bits in an address of this family
+  :param is_allowed_default: result when no rules match
+
+  :returns: **tuple** of the form (address_starts, port_tables), or **None**
+    if a rule's mask doesn't cover a contiguous range of addresses
+  """
+
+  max_address = (1 << address_bits) - 1
+  family_rules = []  # (min_address, max_address, min_port, max_port, is_accept)
+
+  for rule in rules:
+    if rule._skip_rule:
+      continue
+    elif rule.is_address_wildcard():
+      family_rules.append((0, max_address, rule.min_port, rule.max_port, rule.is_accept))
+    elif rule.get_address_type() == address_type:
+      if rule._masked_bits is None:
+        return None
+
+      min_address = rule._get_address_bin()
+      family_rules.append((min_address, min_address | (max_address ^ rule._get_mask_bin()), rule.min_port, rule.max_port, rule.is_accept))
+
+  boundaries = set([0])
+
+  for min_address, rule_max_address, _, _, _ in family_rules:
+    boundaries.add(min_address)
+
+    if rule_max_address < max_address:
+      boundaries.add(rule_max_address + 1)
+
+  address_starts = []  # type: List[int]
+  port_tables = []  # type: List[_PortRanges]
+  port_table_cache = {}  # type: Dict[Tuple[int, ...], _PortRanges]
+
+  for start in sorted(boundaries):
+    applicable = tuple([i for i, entry in enumerate(family_rules) if entry[0] <= start <= entry[1]])
+    port_table = port_table_cache.get(applicable)
+
+    if port_table is None:
+      port_table = _compile_port_ranges([family_rules[i][2:] for i in applicable], is_allowed_default)
+      port_table_cache[applicable] = port_table
+
+    if port_tables and port_tables[-1] == port_table:
+      continue  # same result as the prior range, so merge them
+
+    address_starts.append(start)
+    port_tables.append(port_table)
+
+  return address_starts, port_tables
+
+
+def _compile_port_ranges(rules: Sequence[Tuple[int, int, bool]], is_allowed_default: bool) -> _PortRanges:
+  # Provides the first matching (min_port, max_port, is_accept) rule for each
+  # range of ports, merging neighbors that have the same result.
+
+  boundaries = set([0])
+
+  for min_port, max_port, _ in rules:
+    boundaries.add(min_port)
+
+    if max_port < 65535:
+      boundaries.add(max_port + 1)
+
+  port_starts, port_results = [], []  # type: List[int], List[bool]
+
+  for port in sorted(boundaries):
+    result = is_allowed_default
+
+    for min_port, max_port, is_accept in rules:
+      if min_port <= port <= max_port:
+        result = is_accept
+        break
+
+    if port_results and port_results[-1] == result:
+      continue
+
+    port_starts.append(port)
+    port_results.append(result)
+
+  return tuple(port_starts), tuple(port_results)
+
+
 DEFAULT_POLICY_RULES = tuple([ExitPolicyRule(rule) for rule in (
   'reject *:25',
   'reject *:119',
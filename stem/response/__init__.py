@@ -139,7 +139,7 @@ def _convert_to_single_line(message: 'stem.response.ControlMessage', **kwargs: A
 
 
 def _convert_to_event(message: 'stem.response.ControlMessage', **kwargs: Any) -> 'stem.response.events.Event':
-  stem.response.convert('EVENT', message)
+  stem.response.convert('EVENT', message, **kwargs)
   return message  # type: ignore
 
 
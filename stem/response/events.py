@@ -5,7 +5,12 @@
 
 import datetime
 import io
+import os
 import re
+import struct
+import threading
+import time
+import zlib
 
 import stem
 import stem.control
@@ -15,7 +20,8 @@ import stem.util
 import stem.version
 
 from stem.util import connection, log, str_tools, tor_tools
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from types import TracebackType
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
 
 # Matches keyword=value arguments. This can't be a simple "(.*)=(.*)" pattern
 # because some positional arguments, like circuit paths, can have an equal
@@ -25,6 +31,28 @@ KW_ARG = re.compile('^(.*) ([A-Za-z0-9_]+)=(\\S*)$')
 QUOTED_KW_ARG = re.compile('^(.*) ([A-Za-z0-9_]+)="(.*)"$')
 CELL_TYPE = re.compile('^[a-z0-9_]+$')
 
+# Event logs written by our EventRecorder begin with this header, followed by
+# blocks of the form...
+#
+#   kind (1 byte) | is_compressed (1 byte) | payload length (4 bytes) | payload
+#
+# Event blocks ('E') contain records of the form...
+#
+#   arrived_at (8 byte double) | length (4 bytes) | raw event content
+#
+# Index blocks ('I') summarize the event blocks since the prior index with
+# entries of the form...
+#
+#   offset (8 bytes) | first arrived_at (8 bytes) | last arrived_at (8 bytes) | events (4 bytes)
+
+EVENT_LOG_HEADER = b'stem event log 1\n'
+EVENT_LOG_BLOCK_SIZE = 1000  # events within each block
+EVENT_LOG_INDEX_INTERVAL = 16  # event blocks between each index
+
+BLOCK_HEADER = struct.Struct('!cBI')
+RECORD_HEADER = struct.Struct('!dI')
+INDEX_ENTRY = struct.Struct('!QddI')
+
 
 class Event(stem.response.ControlMessage):
   """
@@ -32,6 +60,20 @@ class Event(stem.response.ControlMessage):
   `control-spec
   <https://gitweb.torproject.org/torspec.git/tree/control-spec.txt>`_.
 
+  Events are usually parsed when converted, but can instead be converted
+  lazily...
+
+  ::
+
+    stem.response.convert('EVENT', message, lazy = True)
+
+  Lazy events determine just their **type** up front, parsing their other
+  attributes when they're first accessed. Malformed content then raises a
+  :class:`stem.ProtocolError` upon that access rather than conversion.
+
+  .. versionchanged:: 2.0.0
+     Added lazy parsing.
+
   :var str type: event type
   :var list positional_args: positional arguments of the event
   :var dict keyword_args: key/value arguments of the event
@@ -47,25 +89,61 @@ class Event(stem.response.ControlMessage):
   _SKIP_PARSING = False    # skip parsing contents into our positional_args and keyword_args
   _VERSION_ADDED = stem.version.Version('0.1.1.1-alpha')  # minimum version with control-spec V1 event support
 
-  def _parse_message(self) -> None:
-    if not str(self).strip():
+  def _parse_message(self, lazy: bool = False) -> None:
+    event_type = _event_type(self)
+
+    if not event_type:
       raise stem.ProtocolError('Received a blank tor event. Events must at the very least have a type.')
 
-    self.type = str(self).split()[0]
-    self.positional_args = []  # type: List[str]
-    self.keyword_args = {}  # type: Dict[str, str]
+    self.type = event_type
 
     # if we're a recognized event type then translate ourselves into that subclass
 
     if self.type in EVENT_TYPE_TO_CLASS:
       self.__class__ = EVENT_TYPE_TO_CLASS[self.type]
+
+    if lazy:
+      self._unparsed = True
+    else:
+      self._parse_content()
+
+  def _parse_content(self) -> None:
+    self._unparsed = False
+
+    if self.type in EVENT_TYPE_TO_CLASS:
       self.__init__()  # type: ignore
 
+    self.positional_args = []  # type: List[str]
+    self.keyword_args = {}  # type: Dict[str, str]
+
     if not self._SKIP_PARSING:
       self._parse_standard_attr()
 
     self._parse()
 
+  def __getattr__(self, name: str) -> Any:
+    # Lazily parsed events populate their attributes upon first access. This
+    # is only called for attributes we don't yet have.
+
+    if not name.startswith('_') and self.__dict__.get('_unparsed'):
+      unparsed_attr = set(self.__dict__)
+
+      try:
+        self._parse_content()
+      except:
+        # drop what we partially parsed, so malformed content raises upon
+        # each access
+
+        for attr in set(self.__dict__).difference(unparsed_attr):
+          del self.__dict__[attr]
+
+        self._unparsed = True
+        raise
+
+      return getattr(self, name)
+
+    raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
   def __hash__(self) -> int:
     return stem.util._hash_attr(self, 'arrived_at', parent = stem.response.ControlMessage, cache = True)
 
@@ -175,6 +253,25 @@ class Event(stem.response.ControlMessage):
           log.log_once(log_id, log.INFO, unrecognized_msg)
 
 
+def _event_type(message: stem.response.ControlMessage) -> Optional[str]:
+  """
+  Provides the type of an event without parsing it, reading just the first
+  word of its first line.
+
+  :param message: event message
+
+  :returns: **str** with the event's type, **None** if it's blank
+  """
+
+  first_line = message._parsed_content[0][2].split(None, 1)
+
+  if first_line:
+    return stem.util.str_tools._to_unicode(first_line[0])
+
+  words = str(message).split()
+  return words[0] if words else None
+
+
 class AddrMapEvent(Event):
   """
   Event that indicates a new address mapping.
@@ -1489,6 +1586,278 @@ class TokenBucketEmptyEvent(Event):
     self._log_if_unrecognized('bucket', stem.TokenBucket)
 
 
+class EventRecorder(object):
+  """
+  Writes the events we receive to an append-only log, so they can later be
+  replayed with :func:`~stem.response.events.replay_events`. This is handy for
+  benchmarking listeners and event parsing against real traffic without a
+  live tor instance...
+
+  ::
+
+    from stem.control import Controller, EventType
+    from stem.response.events import EventRecorder
+
+    with EventRecorder('/tmp/events.log') as recorder:
+      with Controller.from_port() as controller:
+        controller.authenticate()
+        controller.add_event_listener(recorder.record, EventType.BW, EventType.CIRC_BW, lazy = True)
+        time.sleep(60)
+
+  Events are recorded as the raw content tor provided along with when they
+  arrived, and are written in blocks that are zlib compressed by default.
+  Periodic index blocks let replays skip over the portions of a log they
+  don't need.
+
+  If the log already exists we append to it, first discarding any partial
+  block left by a recorder that didn't close cleanly.
+
+  .. versionadded:: 2.0.0
+
+  :var str path: location of our event log
+
+  :param path: location of the event log to write
+  :param compress: compresses our blocks if **True**
+  :param block_size: number of events within each block
+
+  :raises:
+    * **ValueError** if the path exists but isn't an event log, or our
+      block_size is less than one
+    * **IOError** if unable to write to the path
+  """
+
+  def __init__(self, path: str, compress: bool = True, block_size: int = EVENT_LOG_BLOCK_SIZE) -> None:
+    if block_size < 1:
+      raise ValueError('Event log block size must be at least one, got %i' % block_size)
+
+    self.path = path
+
+    self._compress = compress
+    self._block_size = block_size
+    self._lock = threading.RLock()
+
+    self._records = []  # type: List[bytes]
+    self._first_arrival = None  # type: Optional[float]
+    self._last_arrival = None  # type: Optional[float]
+    self._unindexed = []  # type: List[bytes]
+
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+      with open(path, 'r+b') as log_file:
+        if log_file.read(len(EVENT_LOG_HEADER)) != EVENT_LOG_HEADER:
+          raise ValueError("%s isn't a stem event log" % path)
+
+        # Blocks are length prefixed, so appending after a partial block would
+        # misalign all that follow.
+
+        log_end = log_file.tell()
+
+        for _, offset, _, payload_size in _read_block_headers(log_file):
+          log_end = offset + BLOCK_HEADER.size + payload_size
+
+        if log_end < os.fstat(log_file.fileno()).st_size:
+          log.info('Discarding the partial block at the end of %s' % path)
+          log_file.truncate(log_end)
+
+    self._log_file = open(path, 'ab')
+
+    if self._log_file.tell() == 0:
+      self._log_file.write(EVENT_LOG_HEADER)
+
+  def record(self, event: stem.response.ControlMessage) -> None:
+    """
+    Adds an event to our log. This is usually used as an event listener.
+
+    :param event: event to be recorded
+    """
+
+    content = event.raw_content(get_bytes = True)
+    arrived_at = float(event.arrived_at)
+
+    with self._lock:
+      if self._log_file.closed:
+        raise ValueError('Unable to record to a closed EventRecorder')
+
+      self._records.append(RECORD_HEADER.pack(arrived_at, len(content)) + content)
+
+      if self._first_arrival is None:
+        self._first_arrival = arrived_at
+
+      self._last_arrival = arrived_at
+
+      if len(self._records) >= self._block_size:
+        self._write_event_block()
+
+        if len(self._unindexed) >= EVENT_LOG_INDEX_INTERVAL:
+          self._write_index_block()
+
+  def flush(self) -> None:
+    """
+    Writes the events we've buffered to disk, along with an index for them.
+    """
+
+    with self._lock:
+      if self._log_file.closed:
+        return
+
+      self._write_event_block()
+      self._write_index_block()
+      self._log_file.flush()
+
+  def close(self) -> None:
+    """
+    Flushes our buffered events and closes our log.
+    """
+
+    with self._lock:
+      self.flush()
+      self._log_file.close()
+
+  def _write_event_block(self) -> None:
+    if not self._records:
+      return
+
+    self._unindexed.append(INDEX_ENTRY.pack(self._log_file.tell(), self._first_arrival, self._last_arrival, len(self._records)))
+    self._write_block(b'E', b''.join(self._records))
+
+    self._records = []
+    self._first_arrival, self._last_arrival = None, None
+
+  def _write_index_block(self) -> None:
+    if self._unindexed:
+      self._write_block(b'I', b''.join(self._unindexed))
+      self._unindexed = []
+
+  def _write_block(self, kind: bytes, payload: bytes) -> None:
+    if self._compress:
+      payload = zlib.compress(payload)
+
+    self._log_file.write(BLOCK_HEADER.pack(kind, self._compress, len(payload)) + payload)
+
+  def __enter__(self) -> 'stem.response.events.EventRecorder':
+    return self
+
+  def __exit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+    self.close()
+
+
+def replay_events(path: str, speed: Optional[float] = None, start: Optional[float] = None, end: Optional[float] = None, lazy: bool = False) -> Iterator[stem.response.ControlMessage]:
+  """
+  Provides the events of a log written by an
+  :class:`~stem.response.events.EventRecorder`, converting them as a
+  :class:`~stem.control.Controller` would...
+
+  ::
+
+    from stem.response.events import replay_events
+
+    for event in replay_events('/tmp/events.log', speed = 10):
+      my_listener(event)
+
+  Events that tor sent malformed are provided without being parsed, as they
+  are to **MALFORMED_EVENTS** listeners.
+
+  .. versionadded:: 2.0.0
+
+  :param path: location of the event log to read
+  :param speed: multiple of the original rate to provide events at (for
+    instance, **1.0** to replay in real time or **10.0** for ten times faster),
+    **None** to provide them as quickly as we can
+  :param start: unix timestamp of the earliest events to provide
+  :param end: unix timestamp of the latest events to provide
+  :param lazy: parse event attributes upon first access
+
+  :returns: iterator for the :class:`~stem.response.events.Event` in our log
+
+  :raises:
+    * **ValueError** if the path isn't an event log or our speed isn't positive
+    * **IOError** if unable to read the path
+  """
+
+  if speed is not None and speed <= 0:
+    raise ValueError('Replay speed must be positive, got %s' % speed)
+
+  with open(path, 'rb') as log_file:
+    if log_file.read(len(EVENT_LOG_HEADER)) != EVENT_LOG_HEADER:
+      raise ValueError("%s isn't a stem event log" % path)
+
+    # Our index lets us skip event blocks outside our time range without
+    # decompressing them. Blocks since the last index (such as if our recorder
+    # didn't close cleanly) are always read.
+
+    event_blocks, indexed = [], {}
+
+    for kind, offset, is_compressed, payload_size in _read_block_headers(log_file):
+      if kind == b'E':
+        event_blocks.append((offset, is_compressed, payload_size))
+      elif kind == b'I':
+        index = _read_block_payload(log_file, offset, is_compressed, payload_size)
+
+        for entry_offset, first_arrival, last_arrival, _ in INDEX_ENTRY.iter_unpack(index):
+          indexed[entry_offset] = (first_arrival, last_arrival)
+
+    replay_started = None  # type: Optional[Tuple[float, float]]
+
+    for offset, is_compressed, payload_size in event_blocks:
+      if offset in indexed:
+        first_arrival, last_arrival = indexed[offset]
+
+        if (start is not None and last_arrival < start) or (end is not None and first_arrival > end):
+          continue
+
+      block = _read_block_payload(log_file, offset, is_compressed, payload_size)
+      block_offset = 0
+
+      while block_offset + RECORD_HEADER.size <= len(block):
+        arrived_at, content_size = RECORD_HEADER.unpack_from(block, block_offset)
+        content = block[block_offset + RECORD_HEADER.size:block_offset + RECORD_HEADER.size + content_size]
+        block_offset += RECORD_HEADER.size + content_size
+
+        if (start is not None and arrived_at < start) or (end is not None and arrived_at > end):
+          continue
+
+        if speed is not None:
+          if replay_started is None:
+            replay_started = (time.time(), arrived_at)
+          else:
+            time.sleep(max(0.0, replay_started[0] + (arrived_at - replay_started[1]) / speed - time.time()))
+
+        message = stem.response.ControlMessage.from_str(content, arrived_at = arrived_at)
+
+        try:
+          yield stem.response._convert_to_event(message, lazy = lazy)
+        except stem.ProtocolError as exc:
+          log.debug('Replayed a malformed event (%s): %s' % (exc, message))
+          yield message
+
+
+def _read_block_headers(log_file: BinaryIO) -> Iterator[Tuple[bytes, int, bool, int]]:
+  """
+  Provides the (kind, offset, is_compressed, payload_size) of our log's
+  blocks, stopping if the last was truncated.
+  """
+
+  while True:
+    offset = log_file.tell()
+    header = log_file.read(BLOCK_HEADER.size)
+
+    if len(header) < BLOCK_HEADER.size:
+      break
+
+    kind, is_compressed, payload_size = BLOCK_HEADER.unpack(header)
+
+    if offset + BLOCK_HEADER.size + payload_size > os.fstat(log_file.fileno()).st_size:
+      break
+
+    yield kind, offset, bool(is_compressed), payload_size
+    log_file.seek(offset + BLOCK_HEADER.size + payload_size)
+
+
+def _read_block_payload(log_file: BinaryIO, offset: int, is_compressed: bool, payload_size: int) -> bytes:
+  log_file.seek(offset + BLOCK_HEADER.size)
+  payload = log_file.read(payload_size)
+  return zlib.decompress(payload) if is_compressed else payload
+
+
 def _parse_cell_type_mapping(mapping: str) -> Dict[str, int]:
   """
   Parses a mapping of the form...
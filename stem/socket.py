@@ -82,6 +82,7 @@ Tor...
 """
 
 import asyncio
+import functools
 import re
 import socket
 import ssl
@@ -101,6 +102,16 @@ ERROR_MSG = 'Error while receiving a control message (%s): %s'
 
 TRUNCATE_LOGS = 10
 
+# Bytes we read at a time from relays. Cells are a little over 500 bytes, so
+# this lets bulk transfers receive many cells per read.
+
+RELAY_READ_SIZE = 65536
+
+# Provided the status code and first line of a data reply, this can provide a
+# coroutine function to stream its lines. See recv_message().
+
+_DataHandler = Callable[[str, bytes], Optional[Callable[[Optional[bytes]], Awaitable[None]]]]
+
 
 class BaseSocket(object):
   """
@@ -366,10 +377,10 @@ class RelaySocket(BaseSocket):
 
     async def wrapped_recv(reader: asyncio.StreamReader) -> Optional[bytes]:
       if timeout is None:
-        return await reader.read(1024)
+        return await reader.read(RELAY_READ_SIZE)
       else:
         try:
-          return await asyncio.wait_for(reader.read(1024), max(timeout, 0.0001))
+          return await asyncio.wait_for(reader.read(RELAY_READ_SIZE), max(timeout, 0.0001))
         except asyncio.TimeoutError:
           return None
 
@@ -398,25 +409,36 @@ class ControlSocket(BaseSocket):
   def __init__(self) -> None:
     super(ControlSocket, self).__init__()
 
-  async def send(self, message: Union[bytes, str]) -> None:
+  async def send(self, message: Union[bytes, str], raw: bool = False) -> None:
     """
     Formats and sends a message to the control socket. For more information see
     the :func:`~stem.socket.send_message` function.
 
+    .. versionchanged:: 2.0.0
+       Added the raw argument.
+
     :param message: message to be formatted and sent to the socket
+    :param raw: leaves the message formatting untouched, passing it to the
+      socket as-is
 
     :raises:
       * :class:`stem.SocketError` if a problem arises in using the socket
       * :class:`stem.SocketClosed` if the socket is known to be shut down
     """
 
-    await self._send(message, send_message)
+    await self._send(message, functools.partial(send_message, raw = raw))
 
-  async def recv(self) -> stem.response.ControlMessage:
+  async def recv(self, data_handler: Optional['stem.socket._DataHandler'] = None) -> stem.response.ControlMessage:
     """
     Receives a message from the control socket, blocking until we've received
     one. For more information see the :func:`~stem.socket.recv_message` function.
 
+    .. versionchanged:: 2.0.0
+       Added the **data_handler** argument.
+
+    :param data_handler: streams data replies, see
+      :func:`~stem.socket.recv_message`
+
     :returns: :class:`~stem.response.ControlMessage` for the message received
 
     :raises:
@@ -424,7 +446,10 @@ class ControlSocket(BaseSocket):
       * :class:`stem.SocketClosed` if the socket closes before we receive a complete message
     """
 
-    return await self._recv(recv_message)
+    if data_handler:
+      return await self._recv(functools.partial(recv_message, data_handler = data_handler))
+    else:
+      return await self._recv(recv_message)
 
 
 class ControlPort(ControlSocket):
@@ -553,12 +578,23 @@ async def _write_to_socket(writer: asyncio.StreamWriter, message: Union[str, byt
     raise stem.SocketClosed('file has been closed')
 
 
-async def recv_message(reader: asyncio.StreamReader, arrived_at: Optional[float] = None) -> stem.response.ControlMessage:
+async def recv_message(reader: asyncio.StreamReader, arrived_at: Optional[float] = None, data_handler: Optional['stem.socket._DataHandler'] = None) -> stem.response.ControlMessage:
   """
   Pulls from a control socket until we either have a complete message or
   encounter a problem.
 
+  Data replies (such as 'GETINFO md/all') can be many megabytes. To process
+  these as they arrive provide a **data_handler**. This is called with the
+  status code and first line of each data reply, and can provide a coroutine
+  function that's awaited with each line of the reply's data, then **None**
+  when it concludes. Streamed lines are omitted from the message we return.
+
+  .. versionchanged:: 2.0.0
+     Added the **data_handler** argument.
+
   :param reader: reader object
+  :param arrived_at: unix timestamp for when the message arrived
+  :param data_handler: provides a handler for streaming data replies
 
   :returns: :class:`~stem.response.ControlMessage` read from the socket
 
@@ -637,11 +673,14 @@ async def recv_message(reader: asyncio.StreamReader, arrived_at: Optional[float]
       # get a line with just a period
 
       content_block = bytearray(content)
+      line_handler = data_handler(status_code, content) if data_handler else None
 
       while True:
         try:
           line = await reader.readline()
-          raw_content += line
+
+          if not line_handler:
+            raw_content += line
         except socket.error as exc:
           log.info(ERROR_MSG % ('SocketClosed', 'received an exception while mid-way through a data reply (exception: "%s", read content: "%s")' % (exc, log.escape(bytes(raw_content).decode('utf-8')))))
           raise stem.SocketClosed(exc)
@@ -660,7 +699,14 @@ async def recv_message(reader: asyncio.StreamReader, arrived_at: Optional[float]
         if line.startswith(b'..'):
           line = line[1:]
 
-        content_block += b'\n' + line
+        if line_handler:
+          await line_handler(line)
+        else:
+          content_block += b'\n' + line
+
+      if line_handler:
+        await line_handler(None)
+        raw_content += b'.\r\n'
 
       # joins the content using a newline rather than CRLF separator (more
       # conventional for multi-line string content outside the windows world)
@@ -11,6 +11,7 @@ from typing import Any, Union
 
 __all__ = [
   'asyncio',
+  'cache',
   'conf',
   'connection',
   'enum',
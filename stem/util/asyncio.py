@@ -3,16 +3,238 @@
 
 """
 Utilities for working with asyncio.
+
+::
+
+  get_runtime - provides the runtime synchronous objects run within
+  set_runtime - sets the runtime synchronous objects run within
+
+  Synchronous - mixin for classes usable in both synchronous and async contexts
+    |- start - initiates resources for synchronous use
+    |- stop - terminates resources for synchronous use
+    +- is_asyncio_context - checks if we're within an asyncio loop
+
+  Runtime - event loop threads shared by synchronous objects
+    |- acquire - assigns a loop to a synchronous object
+    |- release - indicates a synchronous object is done with its loop
+    |- stats - provides usage and loop lag of our loops
+    +- stop - terminates our loops
+
+  LoopStats - usage and lag of a Runtime's loop
 """
 
 import asyncio
+import collections
 import functools
 import inspect
+import queue
 import threading
 import unittest.mock
 
 from types import TracebackType
-from typing import Any, AsyncIterator, Iterator, Optional, Type
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Type
+
+# Maximum number of items we buffer when async generators are iterated from a
+# synchronous context. The generator is paused until our caller consumes them.
+
+ITERATOR_BUFFER_SIZE = 100
+
+_END = object()  # concludes our iterator bridge
+
+RUNTIME = None  # type: Optional[Runtime]
+RUNTIME_LOCK = threading.RLock()
+
+
+def get_runtime() -> Optional['Runtime']:
+  """
+  Provides the runtime that synchronous objects are run within.
+
+  .. versionadded:: 2.0.0
+
+  :returns: :class:`~stem.util.asyncio.Runtime` that's shared by synchronous
+    objects, or **None** if each has a loop of its own
+  """
+
+  return RUNTIME
+
+
+def set_runtime(runtime: Optional['Runtime']) -> None:
+  """
+  Sets the runtime that synchronous objects run within. This only applies to
+  objects that are started afterward.
+
+  .. versionadded:: 2.0.0
+
+  :param runtime: :class:`~stem.util.asyncio.Runtime` to be shared by
+    synchronous objects, or **None** to give each a loop of its own
+  """
+
+  global RUNTIME
+
+  with RUNTIME_LOCK:
+    RUNTIME = runtime
+
+
+class LoopStats(collections.namedtuple('LoopStats', ['name', 'users', 'lag', 'max_lag'])):
+  """
+  Usage and lag of a :class:`~stem.util.asyncio.Runtime` loop. Lag is how much
+  later than scheduled our loop runs a callback, and is high when coroutines
+  block or there's more work than our loop can keep up with.
+
+  :var str name: name of the thread running this loop
+  :var int users: synchronous objects that are using this loop
+  :var float lag: seconds our latest measurement was late
+  :var float max_lag: most seconds any of our measurements were late
+  """
+
+
+class Runtime(object):
+  """
+  Event loop threads shared by synchronous objects. By default each
+  synchronous object (such as a :class:`~stem.control.Controller` or
+  :class:`~stem.descriptor.remote.Query`) runs its own loop thread, which is
+  costly for applications that make hundreds of them. Once a runtime is set
+  objects instead run within one of its loops...
+
+  ::
+
+    import stem.util.asyncio
+
+    stem.util.asyncio.set_runtime(stem.util.asyncio.Runtime(threads = 2))
+
+    controllers = [Controller.from_port(port = port) for port in range(9051, 9351)]
+
+    for stats in stem.util.asyncio.get_runtime().stats():
+      print('%s is used by %i controllers (%0.3fs lag)' % (stats.name, stats.users, stats.lag))
+
+  Objects are assigned to whichever loop has the fewest users. Because our
+  loops are shared, coroutines that block delay every object on their loop,
+  which is reflected by its lag.
+
+  .. versionadded:: 2.0.0
+
+  :var int threads: number of loop threads we run
+  :var float lag_interval: seconds between our loop lag measurements
+
+  :param threads: number of loop threads to run
+  :param lag_interval: seconds between our loop lag measurements
+
+  :raises: **ValueError** if threads or lag_interval isn't positive
+  """
+
+  def __init__(self, threads: int = 1, lag_interval: float = 1.0) -> None:
+    if threads < 1:
+      raise ValueError('Runtimes must have at least one thread, got %i' % threads)
+    elif lag_interval <= 0:
+      raise ValueError('Loop lag interval must be positive, got %s' % lag_interval)
+
+    self.threads = threads
+    self.lag_interval = lag_interval
+
+    self._loops = []  # type: List[asyncio.AbstractEventLoop]
+    self._loop_threads = []  # type: List[threading.Thread]
+    self._users = []  # type: List[int]
+    self._lag = []  # type: List[float]
+    self._max_lag = []  # type: List[float]
+    self._lock = threading.RLock()
+
+  def acquire(self) -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    """
+    Assigns the loop with the fewest users to a synchronous object, starting
+    our loops if they aren't running. Callers should
+    :func:`~stem.util.asyncio.Runtime.release` the loop when finished with it.
+
+    :returns: **tuple** of the form (loop, thread)
+    """
+
+    with self._lock:
+      if not self._loops:
+        for i in range(self.threads):
+          loop = asyncio.new_event_loop()
+          loop_thread = threading.Thread(
+            name = 'stem runtime %i' % (i + 1),
+            target = loop.run_forever,
+            daemon = True,
+          )
+
+          loop_thread.start()
+
+          self._loops.append(loop)
+          self._loop_threads.append(loop_thread)
+          self._users.append(0)
+          self._lag.append(0.0)
+          self._max_lag.append(0.0)
+
+          asyncio.run_coroutine_threadsafe(self._measure_lag(i), loop)
+
+      index = self._users.index(min(self._users))
+      self._users[index] += 1
+
+      return self._loops[index], self._loop_threads[index]
+
+  def release(self, loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Indicates that a synchronous object is done with its loop.
+
+    :param loop: loop provided by :func:`~stem.util.asyncio.Runtime.acquire`
+    """
+
+    with self._lock:
+      if loop in self._loops:
+        index = self._loops.index(loop)
+        self._users[index] = max(0, self._users[index] - 1)
+
+  def stats(self) -> List[LoopStats]:
+    """
+    Provides the usage and lag of our loops.
+
+    :returns: **list** of :class:`~stem.util.asyncio.LoopStats` for each of
+      our running loops
+    """
+
+    with self._lock:
+      return [LoopStats(self._loop_threads[i].name, self._users[i], self._lag[i], self._max_lag[i]) for i in range(len(self._loops))]
+
+  def stop(self) -> None:
+    """
+    Terminates our loops. Objects that are still using them will fail, so
+    this should only be called once they're stopped.
+    """
+
+    with self._lock:
+      for loop, loop_thread in zip(self._loops, self._loop_threads):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+
+        if threading.current_thread() != loop_thread:
+          loop_thread.join()
+          loop.close()
+
+      self._loops, self._loop_threads = [], []
+      self._users, self._lag, self._max_lag = [], [], []
+
+  async def _shutdown(self) -> None:
+    # cancel our lag measurement and anything our users left behind
+
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    for task in tasks:
+      task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions = True)
+    asyncio.get_event_loop().stop()
+
+  async def _measure_lag(self, index: int) -> None:
+    loop = asyncio.get_event_loop()
+
+    while True:
+      scheduled = loop.time() + self.lag_interval
+      await asyncio.sleep(self.lag_interval)
+      lag = max(0.0, loop.time() - scheduled)
+
+      with self._lock:
+        if index < len(self._loops) and self._loops[index] is loop:
+          self._lag[index] = lag
+          self._max_lag[index] = max(self._max_lag[index], lag)
 
 
 class Synchronous(object):
@@ -61,14 +283,30 @@ class Synchronous(object):
         # asyncio.get_running_loop(), and construct objects that
         # require it (like asyncio.Queue and asyncio.Lock).
 
+  Async generators are iterated as the caller consumes them, with up to
+  **ITERATOR_BUFFER_SIZE** items buffered ahead of the caller. The caller can
+  call other methods while iterating, such as making a controller request for
+  each descriptor it's provided.
+
   Users are responsible for calling :func:`~stem.util.Synchronous.stop` when
   finished to clean up underlying resources.
+
+  When a :class:`~stem.util.asyncio.Runtime` has been set we run within one of
+  its loops rather than a thread of our own.
+
+  .. versionchanged:: 2.0.0
+     Async generators are iterated incrementally rather than buffering all of
+     their items before providing the first.
+
+  .. versionchanged:: 2.0.0
+     Running within a shared runtime's loop.
   """
 
   def __init__(self) -> None:
     self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
     self._loop_thread = None  # type: Optional[threading.Thread]
     self._loop_lock = threading.RLock()
+    self._runtime = None  # type: Optional[Runtime]
 
     # this class is a no-op when created within an asyncio context
 
@@ -144,6 +382,12 @@ class Synchronous(object):
 
     with self._loop_lock:
       if not self._no_op and self._loop is None:
+        self._runtime = get_runtime()
+
+        if self._runtime:
+          self._loop, self._loop_thread = self._runtime.acquire()
+          return
+
         self._loop = asyncio.new_event_loop()
         self._loop_thread = threading.Thread(
           name = '%s asyncio' % type(self).__name__,
@@ -162,10 +406,14 @@ class Synchronous(object):
 
     with self._loop_lock:
       if not self._no_op and self._loop is not None:
-        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._runtime:
+          self._runtime.release(self._loop)  # shared loops keep running
+          self._runtime = None
+        else:
+          self._loop.call_soon_threadsafe(self._loop.stop)
 
-        if threading.current_thread() != self._loop_thread:
-          self._loop_thread.join()
+          if threading.current_thread() != self._loop_thread:
+            self._loop_thread.join()
 
         self._loop = None
         self._loop_thread = None
@@ -215,13 +463,12 @@ class Synchronous(object):
       if self._loop is None:
         Synchronous.start(self)
 
-      if inspect.isasyncgenfunction(func):
-        async def convert_generator(generator: AsyncIterator) -> Iterator:
-          return iter([d async for d in generator])
+      result = func(self, *args, **kwargs)
+
+      if inspect.isasyncgen(result):
+        return _iterate(result, self._loop)
 
-        future = asyncio.run_coroutine_threadsafe(convert_generator(func(self, *args, **kwargs)), self._loop)
-      else:
-        future = asyncio.run_coroutine_threadsafe(func(self, *args, **kwargs), self._loop)
+      future = asyncio.run_coroutine_threadsafe(result, self._loop)
 
     return future.result()
 
@@ -233,3 +480,110 @@ class Synchronous(object):
 
   def __exit__(self, exit_type: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]):
     return self._run_async_method('__aexit__', exit_type, value, traceback)
+
+
+def _iterate(generator: AsyncIterator, loop: asyncio.AbstractEventLoop) -> Iterator:
+  """
+  Synchronously iterates over an async generator that runs within another
+  thread's loop. Abandoning our iterator closes the generator.
+
+  :param generator: async generator to iterate over
+  :param loop: loop to run the generator within
+
+  :returns: iterator for the generator's items
+  """
+
+  bridge = _IteratorBridge(generator, loop)
+
+  try:
+    while True:
+      item = bridge.next()
+
+      if item is _END:
+        break
+
+      yield item
+  finally:
+    bridge.close()
+
+
+class _IteratorBridge(object):
+  """
+  Provides the items of an async generator to another thread. Items are
+  buffered as they're produced, and when our buffer is full the generator is
+  paused until our consumer catches up.
+  """
+
+  def __init__(self, generator: AsyncIterator, loop: asyncio.AbstractEventLoop, buffer_size: Optional[int] = None) -> None:
+    self._loop = loop
+    self._buffer_size = buffer_size if buffer_size is not None else ITERATOR_BUFFER_SIZE
+    self._items = queue.Queue()  # type: queue.Queue
+    self._has_space = None  # type: Optional[asyncio.Event]
+    self._is_paused = False
+
+    self._producer = asyncio.run_coroutine_threadsafe(self._produce(generator), loop)
+
+  def next(self) -> Any:
+    """
+    Provides the generator's next item, blocking until it's available.
+
+    :returns: next item, or **_END** if the generator is exhausted
+
+    :raises:
+      * exceptions raised by the generator
+      * **RuntimeError** if our loop stops before the generator concludes
+    """
+
+    while True:
+      try:
+        item, error = self._items.get(timeout = 1)
+        break
+      except queue.Empty:
+        if not self._loop.is_running():
+          raise RuntimeError('Event loop stopped before our async generator concluded')
+
+    if self._is_paused:
+      self._loop.call_soon_threadsafe(self._resume)
+
+    if error:
+      raise error
+
+    return item
+
+  def close(self) -> None:
+    """
+    Stops our generator if it's still running.
+    """
+
+    self._producer.cancel()
+
+  async def _produce(self, generator: AsyncIterator) -> None:
+    self._has_space = asyncio.Event()
+
+    try:
+      async for item in generator:
+        self._items.put((item, None))
+
+        while self._items.qsize() >= self._buffer_size:
+          self._has_space.clear()
+          self._is_paused = True
+
+          if self._items.qsize() < self._buffer_size:
+            break  # consumed while we were pausing
+
+          await self._has_space.wait()
+
+        self._is_paused = False
+    except asyncio.CancelledError:
+      raise
+    except Exception as exc:
+      self._items.put((None, exc))
+      return
+    finally:
+      await generator.aclose()
+
+    self._items.put((_END, None))
+
+  def _resume(self) -> None:
+    if self._has_space:
+      self._has_space.set()
@@ -0,0 +1,231 @@
+# Copyright 2020, Damian Johnson and The Tor Project
+# See LICENSE for licensing information
+
+"""
+Bounded cache for the results of our requests to tor. Entries are evicted in
+least recently used order once we reach our size limit, and can optionally
+expire after a time-to-live that's configured for each namespace.
+
+::
+
+  cache = RequestCache(max_size = 500, ttl = {'getinfo': 3600})
+  cache.set('version', '0.4.5.6', 'getinfo')
+
+  print(cache.get('version', 'getinfo'))  # 0.4.5.6
+  print(cache.stats().hits)  # 1
+
+.. versionadded:: 2.0.0
+
+**Module Overview:**
+
+::
+
+  RequestCache - thread safe least recently used cache
+    |- get - provides a cached value
+    |- set - caches a value
+    |- remove - drops a cached value
+    |- clear - drops all values or those within a namespace
+    |- set_max_size - changes the number of entries we can hold
+    |- set_ttl - changes how long entries within a namespace last
+    |- stats - provides our hit, miss, and eviction counts
+    +- __len__ - number of entries in the cache
+
+  CacheStats - usage information for a RequestCache
+"""
+
+import collections
+import threading
+import time
+
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_MAX_SIZE = 1000
+
+
+class CacheStats(collections.namedtuple('CacheStats', ['size', 'max_size', 'hits', 'misses', 'evictions', 'expirations'])):
+  """
+  Usage information for a :class:`~stem.util.cache.RequestCache`.
+
+  :var int size: number of entries within the cache
+  :var int max_size: maximum number of entries the cache can hold
+  :var int hits: lookups that were satisfied by the cache
+  :var int misses: lookups for values we didn't have
+  :var int evictions: entries dropped to stay within our size limit
+  :var int expirations: entries dropped because their time-to-live elapsed
+  """
+
+  def hit_ratio(self) -> float:
+    """
+    Provides the portion of lookups that were satisfied by the cache.
+
+    :returns: **float** between zero and one, zero if we haven't had any lookups
+    """
+
+    lookups = self.hits + self.misses
+    return float(self.hits) / lookups if lookups else 0.0
+
+
+class RequestCache(object):
+  """
+  Thread safe cache with a bounded size and least recently used eviction.
+
+  Values are keyed by a name within an optional namespace (such as 'getinfo'
+  or 'getconf'). Time-to-live is configured by namespace, or by the key for
+  entries without one (such as 'exit_policy').
+
+  :param max_size: maximum number of entries to hold
+  :param ttl: mapping of namespaces to the seconds their entries last
+  :param default_ttl: seconds entries last if their namespace lacks a ttl,
+    **None** if they don't expire
+
+  :raises: **ValueError** if our max_size or a ttl isn't positive
+  """
+
+  def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[Dict[str, float]] = None, default_ttl: Optional[float] = None) -> None:
+    self._lock = threading.RLock()
+    self._entries = collections.OrderedDict()  # type: collections.OrderedDict[Tuple[Optional[str], str], Tuple[Any, Optional[float]]]
+    self._max_size = DEFAULT_MAX_SIZE
+    self._ttl = {}  # type: Dict[Optional[str], Optional[float]]
+
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+    self._expirations = 0
+
+    self.set_max_size(max_size)
+    self.set_ttl(None, default_ttl)
+
+    for namespace, seconds in (ttl or {}).items():
+      self.set_ttl(namespace, seconds)
+
+  def get(self, key: str, namespace: Optional[str] = None) -> Any:
+    """
+    Provides a cached value, marking it as recently used.
+
+    :param key: key to be queried
+    :param namespace: namespace in which to check for the key
+
+    :returns: cached value, or **None** if the key isn't present
+    """
+
+    with self._lock:
+      entry = self._entries.get((namespace, key))
+
+      if entry is None:
+        self._misses += 1
+        return None
+
+      value, expires_at = entry
+
+      if expires_at is not None and expires_at <= time.monotonic():
+        del self._entries[(namespace, key)]
+        self._expirations += 1
+        self._misses += 1
+        return None
+
+      self._entries.move_to_end((namespace, key))
+      self._hits += 1
+      return value
+
+  def set(self, key: str, value: Any, namespace: Optional[str] = None) -> None:
+    """
+    Caches a value, evicting the least recently used entries if we're full.
+    Setting a value of **None** removes it.
+
+    :param key: key to be cached
+    :param value: value for the key
+    :param namespace: namespace for the key
+    """
+
+    if value is None:
+      self.remove(key, namespace)
+      return
+
+    with self._lock:
+      ttl = self._ttl_for(key, namespace)
+      self._entries[(namespace, key)] = (value, time.monotonic() + ttl if ttl is not None else None)
+      self._entries.move_to_end((namespace, key))
+      self._evict()
+
+  def remove(self, key: str, namespace: Optional[str] = None) -> None:
+    """
+    Drops a cached value. This is a no-op if the key isn't present.
+
+    :param key: key to be removed
+    :param namespace: namespace for the key
+    """
+
+    with self._lock:
+      self._entries.pop((namespace, key), None)
+
+  def clear(self, namespace: Optional[str] = None) -> None:
+    """
+    Drops cached values. Our statistics are retained.
+
+    :param namespace: only drop entries within this namespace if provided
+    """
+
+    with self._lock:
+      if namespace is None:
+        self._entries.clear()
+      else:
+        for entry_key in [k for k in self._entries if k[0] == namespace]:
+          del self._entries[entry_key]
+
+  def set_max_size(self, max_size: int) -> None:
+    """
+    Changes the number of entries we can hold, evicting the least recently
+    used if we're now over the limit.
+
+    :param max_size: maximum number of entries to hold
+
+    :raises: **ValueError** if max_size isn't positive
+    """
+
+    if max_size < 1:
+      raise ValueError('Cache size must be at least one, got %i' % max_size)
+
+    with self._lock:
+      self._max_size = max_size
+      self._evict()
+
+  def set_ttl(self, namespace: Optional[str], ttl: Optional[float]) -> None:
+    """
+    Changes how long entries within a namespace last. This only applies to
+    entries that are cached afterward.
+
+    :param namespace: namespace to configure, or key for entries without a
+      namespace, **None** to change our default
+    :param ttl: seconds entries last, **None** if they don't expire
+
+    :raises: **ValueError** if the ttl isn't positive
+    """
+
+    if ttl is not None and ttl <= 0:
+      raise ValueError('Cache ttl must be positive, got %s' % ttl)
+
+    with self._lock:
+      self._ttl[namespace] = ttl
+
+  def stats(self) -> CacheStats:
+    """
+    Provides usage information for this cache.
+
+    :returns: :class:`~stem.util.cache.CacheStats` with our current counts
+    """
+
+    with self._lock:
+      return CacheStats(len(self._entries), self._max_size, self._hits, self._misses, self._evictions, self._expirations)
+
+  def _ttl_for(self, key: str, namespace: Optional[str]) -> Optional[float]:
+    ttl_key = namespace if namespace is not None else key
+    return self._ttl[ttl_key] if ttl_key in self._ttl else self._ttl[None]
+
+  def _evict(self) -> None:
+    while len(self._entries) > self._max_size:
+      self._entries.popitem(last = False)
+      self._evictions += 1
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._entries)
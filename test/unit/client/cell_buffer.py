@@ -0,0 +1,49 @@
+"""
+Unit tests for stem.client.datatype.CellBuffer.
+"""
+
+import unittest
+
+from stem.client.datatype import CellBuffer, Size
+
+
+class TestCellBuffer(unittest.TestCase):
+  def test_pop(self):
+    buffer = CellBuffer()
+    self.assertEqual(0, len(buffer))
+
+    buffer.append(b'\x00\x12hello')
+    buffer.append(b' world')
+
+    self.assertEqual(13, len(buffer))
+    self.assertEqual(18, buffer.unpack(Size.SHORT))
+    self.assertEqual(ord('h'), buffer.unpack(Size.CHAR, 2))
+
+    self.assertEqual(b'\x00\x12', buffer.pop(2))
+    self.assertEqual(b'hello', buffer.pop(5))
+    self.assertEqual(ord(' '), buffer.unpack(Size.CHAR))
+
+    buffer.append(b'!')
+    self.assertEqual(b' world!', buffer.pop(7))
+    self.assertEqual(0, len(buffer))
+
+    self.assertRaisesWith(ValueError, 'Unable to pop 1 bytes, only 0 are available', buffer.pop, 1)
+    self.assertRaisesWith(ValueError, "b'' is the wrong size for a CHAR field", buffer.unpack, Size.CHAR)
+
+  def test_reclaims_space(self):
+    """
+    Consumed bytes are dropped once they're the majority of our buffer.
+    """
+
+    buffer = CellBuffer()
+    buffer.append(b'a' * 10 + b'b' * 10 + b'c' * 10)
+
+    self.assertEqual(b'a' * 10, buffer.pop(10))
+    self.assertEqual(30, len(buffer._buffer))
+
+    self.assertEqual(b'b' * 10, buffer.pop(10))
+    self.assertEqual(10, len(buffer._buffer))
+
+    self.assertEqual(b'c' * 5, buffer.pop(5))
+    self.assertEqual(b'c' * 5, buffer.pop(5))
+    self.assertEqual(0, len(buffer._buffer))
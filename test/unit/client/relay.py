@@ -0,0 +1,226 @@
+"""
+Unit tests for reading cells with the stem.client.Relay class.
+"""
+
+import asyncio
+import hashlib
+import unittest
+
+import stem
+import stem.client
+
+from unittest.mock import patch, Mock
+
+from stem.client import Circuit, Relay
+from stem.client.cell import Cell, DestroyCell, RelayCell
+from stem.client.datatype import RelayCommand, Size
+
+LINK_PROTOCOL = 5
+
+
+class MockORPort(object):
+  """
+  ORPort that provides the given content, then closes.
+  """
+
+  def __init__(self, content):
+    self.address = '127.0.0.1'
+    self.port = 9001
+    self.sent = []
+
+    self._content = list(content)
+
+  async def recv(self):
+    await asyncio.sleep(0)
+    return self._content.pop(0) if self._content else b''
+
+  async def send(self, data):
+    self.sent.append(data)
+
+  async def close(self):
+    pass
+
+
+class MockCircuit(object):
+  def __init__(self):
+    self.received = []
+    self.error = None
+
+  def _deliver(self, content):
+    self.received.append(content)
+
+  def _fail(self, exc):
+    self.error = exc
+
+
+def relay_cell(circ_id, command, data = b'', stream_id = 1):
+  return RelayCell(circ_id, command, data, stream_id = stream_id).pack(LINK_PROTOCOL)
+
+
+def mock_circuit(relay, circ_id):
+  """
+  Circuit that doesn't encrypt its cells.
+  """
+
+  circ = Circuit.__new__(Circuit)
+  circ.relay = relay
+  circ.id = circ_id
+  circ.backward_key = None
+  circ.backward_digest = None
+  circ._streams = {}
+  circ._send_lock = asyncio.Lock()
+  circ._error = None
+  circ._circuit_data_cells = 0
+  circ._stream_data_cells = {}
+
+  relay._circuits[circ_id] = circ
+  return circ
+
+
+def decrypt(link_protocol, content, key, digest):
+  return Cell.pop(content, link_protocol)[0], key, digest
+
+
+class TestRelay(unittest.TestCase):
+  def test_read_cells(self):
+    """
+    Cells are provided to the circuit they're addressed to, discarding link
+    level cells and those for unknown circuits.
+    """
+
+    first_cell = relay_cell(1, RelayCommand.DATA, b'hello')
+    second_cell = relay_cell(2, RelayCommand.DATA, b'world')
+    unknown_cell = relay_cell(3, RelayCommand.DATA, b'ignored')
+    link_cell = stem.client.cell.PaddingCell().pack(LINK_PROTOCOL)
+    variable_cell = stem.client.cell.VersionsCell([3, 4, 5]).pack(LINK_PROTOCOL)
+
+    # split our content so cells span reads
+
+    content = second_cell + link_cell + variable_cell + first_cell + unknown_cell + second_cell
+    orport = MockORPort([content[i:i + 100] for i in range(0, len(content), 100)])
+
+    async def read_cells():
+      relay = Relay(orport, LINK_PROTOCOL)
+      first_circ, second_circ = MockCircuit(), MockCircuit()
+      relay._circuits = {1: first_circ, 2: second_circ}
+
+      await relay._read_cells()
+      return relay, first_circ, second_circ
+
+    relay, first_circ, second_circ = asyncio.run(read_cells())
+
+    self.assertEqual([first_cell], first_circ.received)
+    self.assertEqual([second_cell, second_cell], second_circ.received)
+
+    # once our connection closes circuits are notified
+
+    self.assertEqual(stem.SocketClosed, type(first_circ.error))
+    self.assertEqual(relay._reader_error, first_circ.error)
+    self.assertRaises(stem.SocketClosed, relay._start_reader)
+
+  @patch('stem.client.cell.RelayCell.decrypt', Mock(side_effect = decrypt))
+  def test_concurrent_streams(self):
+    """
+    Concurrent directory requests receive the cells of their stream.
+    """
+
+    response = [
+      relay_cell(1, RelayCommand.CONNECTED, stream_id = 2),
+      relay_cell(1, RelayCommand.CONNECTED, stream_id = 1),
+      relay_cell(1, RelayCommand.DATA, b'second ', stream_id = 2),
+      relay_cell(1, RelayCommand.DATA, b'first ', stream_id = 1),
+      relay_cell(1, RelayCommand.DATA, b'response', stream_id = 2),
+      relay_cell(1, RelayCommand.DATA, b'response', stream_id = 1),
+      relay_cell(1, RelayCommand.END, stream_id = 1),
+      relay_cell(1, RelayCommand.END, stream_id = 2),
+    ]
+
+    async def make_requests():
+      relay = Relay(MockORPort([]), LINK_PROTOCOL)
+      circ = mock_circuit(relay, 1)
+      circ._send = Mock(side_effect = lambda *args, **kwargs: asyncio.sleep(0))
+
+      requests = asyncio.gather(
+        circ.directory('GET /first', stream_id = 1),
+        circ.directory('GET /second', stream_id = 2),
+      )
+
+      await asyncio.sleep(0.01)
+
+      with self.assertRaisesRegex(ValueError, 'Stream 1 is already in use by circuit 1'):
+        await circ.directory('GET /third', stream_id = 1)
+
+      for cell in response:
+        circ._deliver(cell)
+
+      return await requests
+
+    self.assertEqual([b'first response', b'second response'], asyncio.run(make_requests()))
+
+  @patch('stem.client.cell.RelayCell.decrypt', Mock(side_effect = decrypt))
+  def test_destroyed_circuit(self):
+    """
+    Requests fail if the relay closes their circuit.
+    """
+
+    async def make_request():
+      relay = Relay(MockORPort([]), LINK_PROTOCOL)
+      circ = mock_circuit(relay, 1)
+      circ._send = Mock(side_effect = lambda *args, **kwargs: asyncio.sleep(0))
+
+      request = asyncio.ensure_future(circ.directory('GET /first', stream_id = 1))
+      await asyncio.sleep(0.01)
+
+      circ._deliver(DestroyCell(1).pack(LINK_PROTOCOL))
+
+      self.assertEqual({}, relay._circuits)
+      await request
+
+    self.assertRaisesWith(stem.SocketClosed, 'Circuit 1 was closed by the relay (NONE)', asyncio.run, make_request())
+
+  @patch('stem.client.cell.RelayCell.decrypt', Mock(side_effect = decrypt))
+  def test_sendme(self):
+    """
+    Acknowledge DATA cells with circuit and stream level SENDMEs, so relays
+    don't exhaust their windows.
+    """
+
+    sent = []
+
+    async def send(command, data = b'', stream_id = 0):
+      sent.append((command, data, stream_id))
+
+    async def make_request():
+      relay = Relay(MockORPort([]), LINK_PROTOCOL)
+      circ = mock_circuit(relay, 1)
+      circ.backward_digest = hashlib.sha1(b'backward digest')
+      circ._send = Mock(side_effect = send)
+
+      request = asyncio.ensure_future(circ.directory('GET /first', stream_id = 1))
+      await asyncio.sleep(0.01)
+
+      for i in range(60):
+        circ._deliver(relay_cell(1, RelayCommand.DATA, b'data', stream_id = 1))
+
+      # cells of unknown streams still count against our circuit
+
+      for i in range(40):
+        circ._deliver(relay_cell(1, RelayCommand.DATA, b'data', stream_id = 5))
+
+      circ._deliver(relay_cell(1, RelayCommand.END, stream_id = 1))
+      await request
+      await asyncio.sleep(0.01)
+
+      return circ
+
+    circ = asyncio.run(make_request())
+    digest = hashlib.sha1(b'backward digest').digest()
+
+    self.assertEqual([
+      (RelayCommand.BEGIN_DIR, b'', 1),
+      (RelayCommand.DATA, 'GET /first', 1),
+      (RelayCommand.SENDME, b'', 1),
+      (RelayCommand.SENDME, Size.CHAR.pack(1) + Size.SHORT.pack(20) + digest, 0),
+    ], sent)
+
+    self.assertEqual({}, circ._stream_data_cells)
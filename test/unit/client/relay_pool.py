@@ -0,0 +1,113 @@
+"""
+Unit tests for the stem.client.RelayPool class.
+"""
+
+import asyncio
+import unittest
+
+import stem
+import stem.client
+
+from unittest.mock import patch, Mock
+
+
+class MockRelay(object):
+  def __init__(self):
+    self.requests = []
+    self.closed = False
+    self.fail_next = False
+
+  async def create_circuit(self):
+    return MockCircuit(self)
+
+  async def close(self):
+    self.closed = True
+
+
+class MockCircuit(object):
+  def __init__(self, relay):
+    self.relay = relay
+    self._streams = {}
+
+  async def directory(self, request, stream_id = 0):
+    if self.relay.fail_next:
+      self.relay.fail_next = False
+      raise stem.SocketClosed()
+
+    self.relay.requests.append((request, stream_id))
+    return b'response to ' + request.encode('utf-8')
+
+  async def close(self):
+    pass
+
+
+class TestRelayPool(unittest.TestCase):
+  def test_reuses_circuit(self):
+    """
+    Directory requests to the same relay share its connection and circuit,
+    using a new stream for each request.
+    """
+
+    relays = []
+
+    async def connect(address, port, link_protocols):
+      relays.append(MockRelay())
+      return relays[-1]
+
+    pool = stem.client.RelayPool()
+
+    with patch('stem.client.Relay.connect', Mock(side_effect = connect)):
+      for request in ('GET /a', 'GET /b', 'GET /c'):
+        self.assertEqual(b'response to ' + request.encode('utf-8'), asyncio.run(pool.directory('128.31.0.39', 9101, request)))
+
+      self.assertEqual(1, len(relays))
+      self.assertEqual([('GET /a', 1), ('GET /b', 2), ('GET /c', 3)], relays[0].requests)
+
+      # a relay that's closed our connection is replaced
+
+      relays[0].fail_next = True
+      asyncio.run(pool.directory('128.31.0.39', 9101, 'GET /d'))
+
+      self.assertEqual(2, len(relays))
+      self.assertTrue(relays[0].closed)
+      self.assertEqual([('GET /d', 1)], relays[1].requests)
+
+      # other relays have connections of their own
+
+      asyncio.run(pool.directory('86.59.21.38', 443, 'GET /e'))
+      self.assertEqual(3, len(relays))
+
+    loop_thread = pool._loop_thread
+    pool.close()
+
+    self.assertTrue(relays[1].closed)
+    self.assertTrue(relays[2].closed)
+    self.assertFalse(loop_thread.is_alive())
+    self.assertEqual(None, pool._loop)
+
+  def test_idle_limits(self):
+    """
+    Relays beyond our max_idle, or unused for longer than our idle_timeout,
+    are closed.
+    """
+
+    relays = []
+
+    async def connect(address, port, link_protocols):
+      relays.append(MockRelay())
+      return relays[-1]
+
+    pool = stem.client.RelayPool(max_idle = 1)
+
+    with patch('stem.client.Relay.connect', Mock(side_effect = connect)):
+      asyncio.run(pool.directory('128.31.0.39', 9101, 'GET /a'))
+      asyncio.run(pool.directory('86.59.21.38', 443, 'GET /b'))
+
+      self.assertEqual([True, False], [relay.closed for relay in relays])
+
+      pool.idle_timeout = 0
+      asyncio.run(pool.directory('86.59.21.38', 443, 'GET /c'))
+
+      self.assertEqual([True, True], [relay.closed for relay in relays])
+
+    pool.close()
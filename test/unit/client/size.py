@@ -38,6 +38,14 @@ class TestSize(unittest.TestCase):
 
     self.assertRaisesWith(ValueError, "'\\x00\\x12' is the wrong size for a CHAR field", Size.CHAR.unpack, '\x00\x12')
 
+  def test_unpack_from(self):
+    self.assertEqual(18, Size.CHAR.unpack_from(b'\x12'))
+    self.assertEqual(18, Size.SHORT.unpack_from(b'\xff\x00\x12', 1))
+    self.assertEqual(18, Size.SHORT.unpack_from(bytearray(b'\x00\x12\xff')))
+    self.assertEqual(18, Size.SHORT.unpack_from(memoryview(b'\xff\x00\x12'), 1))
+
+    self.assertRaisesWith(ValueError, "b'\\x12' is the wrong size for a SHORT field", Size.SHORT.unpack_from, bytearray(b'\x00\x12'), 1)
+
   def test_pop(self):
     self.assertEqual((18, b''), Size.CHAR.pop(b'\x12'))
 
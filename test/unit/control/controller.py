@@ -4,10 +4,13 @@ integ tests, but a few bits lend themselves to unit testing.
 """
 
 import asyncio
+import base64
+import binascii
 import datetime
 import io
 import unittest
 
+import stem.descriptor.microdescriptor
 import stem.descriptor.router_status_entry
 import stem.response
 import stem.response.events
@@ -18,7 +21,7 @@ import stem.version
 from unittest.mock import Mock, patch
 
 from stem import ControllerError, DescriptorUnavailable, InvalidArguments, InvalidRequest, ProtocolError, UnsatisfiableRequest
-from stem.control import MALFORMED_EVENTS, _parse_circ_path, Listener, Controller, EventType
+from stem.control import MALFORMED_EVENTS, _parse_circ_path, _ListenerQueue, Listener, Controller, EventOverflow, EventType
 from stem.response import ControlMessage
 from stem.exit_policy import ExitPolicy
 from stem.util.test_tools import coro_func_raising_exc, coro_func_returning_value
@@ -125,6 +128,96 @@ class TestControl(unittest.TestCase):
     self.assertRaisesWith(stem.OperationFailed, 'Not running in server mode', self.controller.get_info, 'fingerprint')
     self.assertEqual(2, msg_mock.call_count)
 
+  @patch('stem.control.BaseController.msg')
+  def test_get_conf_with_default(self, msg_mock):
+    """
+    Provides our default when tor's GETCONF reply lacks an option.
+    """
+
+    msg_mock.side_effect = coro_func_returning_value(ControlMessage.from_str('250 OK\r\n'))
+
+    self.assertEqual(None, self.controller.get_conf('__OwningControllerProcess', None))
+    self.assertEqual('9051', self.controller.get_conf('ControlPort', '9051'))
+    self.assertRaises(ValueError, self.controller.get_conf, 'ControlPort')
+
+    msg_mock.side_effect = coro_func_returning_value(ControlMessage.from_str('250 ORPort=9050\r\n'))
+    self.assertEqual('9050', self.controller.get_conf('orport', '9001'))
+
+    msg_mock.side_effect = coro_func_returning_value(ControlMessage.from_str('250 SocksPort=9150\r\n'))
+    self.assertEqual({'socksport': ['9150']}, self.controller.get_conf_map(['socksport'], 'unused'))
+
+  @patch('stem.control.BaseController.msg')
+  def test_get_countries(self, msg_mock):
+    """
+    Exercises the get_countries() method.
+    """
+
+    def getinfo_response(*entries):
+      return ControlMessage.from_str(''.join(['250-%s=%s\r\n' % entry for entry in entries]) + '250 OK\r\n', 'GETINFO')
+
+    msg_mock.side_effect = coro_func_returning_value(getinfo_response(('ip-to-country/ipv4-available', '1')))
+    self.assertEqual('1', self.controller.get_info('ip-to-country/ipv4-available'))
+
+    msg_mock.side_effect = coro_func_returning_value(getinfo_response(('ip-to-country/128.31.0.34', 'us'), ('ip-to-country/86.59.21.38', 'at')))
+    self.assertEqual({'128.31.0.34': 'us', '86.59.21.38': 'at'}, self.controller.get_countries(['128.31.0.34', '86.59.21.38', '128.31.0.34']))
+    self.assertEqual(['GETINFO', 'ip-to-country/128.31.0.34', 'ip-to-country/86.59.21.38'], sorted(msg_mock.call_args[0][1].split()))
+
+    # cached addresses aren't requested again
+
+    msg_mock.side_effect = coro_func_returning_value(getinfo_response(('ip-to-country/171.25.193.9', 'de')))
+    self.assertEqual({'86.59.21.38': 'at', '171.25.193.9': 'de'}, self.controller.get_countries(['86.59.21.38', '171.25.193.9']))
+    self.assertEqual('GETINFO ip-to-country/171.25.193.9', msg_mock.call_args[0][1])
+
+    msg_mock.reset_mock()
+    self.assertEqual({'128.31.0.34': 'us'}, self.controller.get_countries(['128.31.0.34']))
+    self.assertEqual({}, self.controller.get_countries([]))
+    self.assertFalse(msg_mock.called)
+
+    # IPv6 addresses require tor's IPv6 database
+
+    msg_mock.side_effect = coro_func_returning_value(getinfo_response(('ip-to-country/ipv6-available', '0')))
+    self.assertRaisesWith(stem.ProtocolError, 'Tor IPv6 geoip database is unavailable', self.controller.get_countries, ['2001:858:2:2:aabb:0:563b:1526'])
+    self.assertEqual({}, self.controller.get_countries(['2001:858:2:2:aabb:0:563b:1526'], {}))
+
+    self.assertRaisesWith(ValueError, "'128.31.0' isn't a valid IPv4 or IPv6 address", self.controller.get_countries, ['128.31.0'])
+
+  @patch('time.monotonic')
+  @patch('stem.control.Controller.get_info')
+  def test_get_cache(self, get_info_mock, monotonic_mock):
+    """
+    Exercises our bounded request cache.
+    """
+
+    get_info_mock.side_effect = coro_func_returning_value('0.2.1.32')
+    monotonic_mock.return_value = 100.0
+
+    cache = self.controller.get_cache()
+    cache.set_ttl('version', 60)
+    start_stats = cache.stats()
+
+    self.assertEqual(stem.version.Version('0.2.1.32'), self.controller.get_version())
+    self.assertEqual(stem.version.Version('0.2.1.32'), self.controller.get_version())
+    self.assertEqual(1, get_info_mock.call_count)
+
+    # versions expire after a minute
+
+    monotonic_mock.return_value = 161.0
+    get_info_mock.side_effect = coro_func_returning_value('0.2.2.39')
+    self.assertEqual(stem.version.Version('0.2.2.39'), self.controller.get_version())
+
+    stats = cache.stats()
+    self.assertEqual(1, stats.hits - start_stats.hits)
+    self.assertEqual(2, stats.misses - start_stats.misses)
+    self.assertEqual(1, stats.expirations - start_stats.expirations)
+
+    # the cache is bounded in size
+
+    cache.set_max_size(1)
+    self.controller._set_cache({'ip-to-country/1.2.3.4': 'de', 'ip-to-country/5.6.7.8': 'fr'}, 'getinfo')
+
+    self.assertEqual({'ip-to-country/5.6.7.8': 'fr'}, self.controller._get_cache_map(['ip-to-country/1.2.3.4', 'ip-to-country/5.6.7.8'], 'getinfo'))
+    self.assertEqual(1, len(cache))
+
   @patch('stem.control.Controller.get_info')
   def test_get_version(self, get_info_mock):
     """
@@ -622,6 +715,188 @@ class TestControl(unittest.TestCase):
     self._emit_event(BW_EVENT)
     self.bw_listener.assert_called_once_with(BW_EVENT)
 
+  def test_event_listener_with_concurrency(self):
+    """
+    Listeners with a concurrency receive events through their own queue, so
+    they don't delay other listeners.
+    """
+
+    received = []
+
+    async def slow_listener(event):
+      await asyncio.sleep(0.05)
+      received.append(event)
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.add_event_listener(slow_listener, EventType.BW, concurrency = 2)
+
+    self._emit_event(BW_EVENT)
+    self.bw_listener.assert_called_once_with(BW_EVENT)
+    self.assertEqual([], received)
+
+    listener_queue = self.controller._listener_queues[slow_listener]
+    asyncio.run_coroutine_threadsafe(listener_queue.join(), self.controller._loop).result()
+    self.assertEqual([BW_EVENT], received)
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.remove_event_listener(slow_listener)
+
+    self.assertFalse(slow_listener in self.controller._listener_queues)
+
+    self.assertRaisesWith(ValueError, 'Listener concurrency must be at least one, got 0', self.controller.add_event_listener, Mock(), EventType.BW, concurrency = 0)
+    self.assertRaisesWith(ValueError, 'Listener queue size must be at least one, got 0', self.controller.add_event_listener, Mock(), EventType.BW, concurrency = 1, queue_size = 0)
+
+  def test_event_listener_lazy(self):
+    """
+    Events are parsed upon first access if all their listeners are lazy, and
+    not at all if nobody is listening.
+    """
+
+    lazy_listener = Mock()
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.add_event_listener(lazy_listener, EventType.STREAM_BW, EventType.BW, lazy = True)
+
+    self._emit_event(ControlMessage.from_str('650 STREAM_BW 2 15 25', normalize = True))
+    event = lazy_listener.call_args[0][0]
+
+    self.assertTrue(isinstance(event, stem.response.events.StreamBwEvent))
+    self.assertTrue(event._unparsed)
+    self.assertEqual(25, event.read)
+    self.assertFalse(event._unparsed)
+
+    # our bw_listener isn't lazy, so BW events are parsed upfront
+
+    self._emit_event(BW_EVENT)
+    self.assertFalse(lazy_listener.call_args[0][0]._unparsed)
+
+    # nobody's listening for STREAM_BW events so they're dropped unparsed
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(ControlMessage.from_str('250 OK\r\n')))):
+      self.controller.remove_event_listener(lazy_listener)
+      self.controller.remove_event_listener(self.malformed_listener)
+
+    with patch('stem.response._convert_to_event') as convert_mock:
+      self._emit_event(ControlMessage.from_str('650 STREAM_BW 2 15 25', normalize = True))
+      convert_mock.assert_not_called()
+
+  def test_event_listener_window(self):
+    """
+    Coalesce bandwidth events into a summary for each window.
+    """
+
+    summary_listener = Mock()
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.add_event_listener(summary_listener, EventType.CIRC_BW, EventType.CELL_STATS, EventType.CIRC, window = 60, sample = 2)
+
+    for content in ('650 CIRC_BW ID=11 READ=10 WRITTEN=20', '650 CIRC_BW ID=12 READ=5 WRITTEN=0', '650 CIRC_BW ID=11 READ=1 WRITTEN=2'):
+      self._emit_event(ControlMessage.from_str(content, normalize = True))
+
+    self._emit_event(ControlMessage.from_str('650 CELL_STATS ID=14 InboundAdded=relay:1,created:1 OutboundAdded=relay:2', normalize = True))
+    self._emit_event(CIRC_EVENT)
+
+    # only the circuit event is delivered individually
+
+    self.assertEqual(1, summary_listener.call_count)
+    self.assertEqual('CIRC', summary_listener.call_args[0][0].type)
+
+    aggregator = self.controller._listener_aggregators[summary_listener]
+    asyncio.run_coroutine_threadsafe(aggregator.flush(), self.controller._loop).result()
+
+    summaries = dict([(call[0][0].type, call[0][0]) for call in summary_listener.call_args_list[1:]])
+    self.assertEqual(['CELL_STATS', 'CIRC_BW'], sorted(summaries.keys()))
+
+    circ_bw = summaries['CIRC_BW']
+    self.assertEqual((3, 16, 22), (circ_bw.events, circ_bw.read, circ_bw.written))
+    self.assertEqual({'11': (11, 22), '12': (5, 0)}, circ_bw.by_id)
+    self.assertEqual(['11', '11'], [event.id for event in circ_bw.samples])
+    self.assertTrue(circ_bw.start <= circ_bw.end)
+
+    self.assertEqual({'14': {'relay': 3, 'created': 1}}, summaries['CELL_STATS'].cells)
+
+    # summaries only include events since the prior window
+
+    asyncio.run_coroutine_threadsafe(aggregator.flush(), self.controller._loop).result()
+    self.assertEqual(3, summary_listener.call_count)
+
+    self.assertRaisesWith(ValueError, 'Listener window must be positive, got 0', self.controller.add_event_listener, Mock(), EventType.BW, window = 0)
+    self.assertRaisesWith(ValueError, 'Listener sample rate must be at least one, got 0', self.controller.add_event_listener, Mock(), EventType.BW, sample = 0)
+
+  def test_event_listener_window_with_malformed_event(self):
+    """
+    Malformed events that are lazily parsed when coalesced are provided to our
+    MALFORMED_EVENTS listeners, and don't stop later events.
+    """
+
+    summary_listener = Mock()
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.add_event_listener(summary_listener, EventType.CIRC_BW, lazy = True, window = 10)
+
+    malformed_event = ControlMessage.from_str('650 CIRC_BW ID=11 READ=abc WRITTEN=20\r\n')
+    asyncio.run_coroutine_threadsafe(Controller._handle_event(self.controller, malformed_event), self.controller._loop).result()
+
+    self.assertEqual(0, summary_listener.call_count)
+    self.malformed_listener.assert_called_once_with(malformed_event)
+
+    self._emit_event(ControlMessage.from_str('650 CIRC_BW ID=11 READ=10 WRITTEN=20', normalize = True))
+
+    aggregator = self.controller._listener_aggregators[summary_listener]
+    asyncio.run_coroutine_threadsafe(aggregator.flush(), self.controller._loop).result()
+
+    circ_bw = summary_listener.call_args[0][0]
+    self.assertEqual((1, 10, 20), (circ_bw.events, circ_bw.read, circ_bw.written))
+
+  def test_event_listener_sample(self):
+    """
+    Without a window our sample rate downsamples bandwidth events.
+    """
+
+    sampled_listener = Mock()
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.add_event_listener(sampled_listener, EventType.BW, sample = 3)
+
+    for _ in range(7):
+      self._emit_event(BW_EVENT)
+
+    self.assertEqual(3, sampled_listener.call_count)
+    self.assertEqual(7, self.bw_listener.call_count)
+
+    with patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None))):
+      self.controller.remove_event_listener(sampled_listener)
+
+    self.assertFalse(sampled_listener in self.controller._listener_aggregators)
+
+  @patch('stem.util.log.log', Mock())
+  def test_event_listener_overflow(self):
+    """
+    Drop events when a listener's queue is full.
+    """
+
+    async def deliver(overflow):
+      release, received = asyncio.Event(), []
+
+      async def listener(event):
+        await release.wait()
+        received.append(event)
+
+      listener_queue = _ListenerQueue(listener, 1, 2, overflow)
+
+      for event in range(5):
+        await listener_queue.put(event)
+        await asyncio.sleep(0)  # let our listener pick up the first event
+
+      release.set()
+      await listener_queue.join()
+      listener_queue.stop()
+
+      return received, listener_queue.dropped
+
+    self.assertEqual(([0, 1, 2], 2), asyncio.run(deliver(EventOverflow.DROP_NEWEST)))
+    self.assertEqual(([0, 3, 4], 2), asyncio.run(deliver(EventOverflow.DROP_OLDEST)))
+
   @patch('stem.control.Controller.get_version', Mock(side_effect = coro_func_returning_value(stem.version.Version('0.5.0.14'))))
   @patch('stem.control.Controller.msg', Mock(side_effect = coro_func_returning_value(ControlMessage.from_str('250 OK\r\n'))))
   @patch('stem.control.Controller.add_event_listener', Mock(side_effect = coro_func_returning_value(None)))
@@ -634,6 +909,322 @@ class TestControl(unittest.TestCase):
 
     self.assertRaisesWith(stem.Timeout, 'Reached our 0.1 second timeout', self.controller.get_hidden_service_descriptor, '5g2upl4pq6kufc4m', await_result = True, timeout = 0.1)
 
+  def test_pipelined_msg(self):
+    """
+    Send several messages without awaiting replies in between, and check that
+    responses are matched to their callers in order.
+    """
+
+    sent = []
+
+    async def send_mock(message):
+      sent.append(message)
+
+      # respond only after all requests are outstanding, which would hang if
+      # each msg() call awaited its own reply
+
+      if len(sent) == 3:
+        for query in sent:
+          self.controller._deliver_reply(ControlMessage.from_str('250-%s=%s value\r\n250 OK\r\n' % (query[8:], query[8:])))
+
+    self.controller.set_pipelining(True)
+    self.assertTrue(self.controller.is_pipelining_enabled())
+
+    async def issue_requests():
+      return await asyncio.gather(*[self.controller.msg('GETINFO %s' % param) for param in ('version', 'address', 'fingerprint')])
+
+    with patch('stem.socket.ControlSocket.send', Mock(side_effect = send_mock)):
+      replies = asyncio.run_coroutine_threadsafe(issue_requests(), self.controller._loop).result(timeout = 2)
+
+    self.assertEqual(['GETINFO version', 'GETINFO address', 'GETINFO fingerprint'], sent)
+    self.assertEqual(['version=version value', 'address=address value', 'fingerprint=fingerprint value'], [str(reply).splitlines()[0] for reply in replies])
+
+    # reader errors fail every outstanding request, since we can't tell which
+    # replies were consumed
+
+    sent = []
+
+    async def error_mock(message):
+      sent.append(message)
+
+      if len(sent) == 3:
+        self.controller._deliver_reply(stem.ProtocolError('malformed reply'))
+        self.controller._deliver_reply(ControlMessage.from_str('250-address=address value\r\n250 OK\r\n'))
+
+    async def issue_failing_requests():
+      return await asyncio.gather(*[self.controller.msg('GETINFO %s' % param) for param in ('version', 'address', 'fingerprint')], return_exceptions = True)
+
+    with patch('stem.socket.ControlSocket.send', Mock(side_effect = error_mock)):
+      replies = asyncio.run_coroutine_threadsafe(issue_failing_requests(), self.controller._loop).result(timeout = 2)
+
+    self.assertEqual(['malformed reply'] * 3, [str(reply) for reply in replies])
+    self.assertTrue(all([isinstance(reply, stem.ProtocolError) for reply in replies]))
+
+  @patch('stem.control.DATA_STREAM_CHUNK_SIZE', 200)
+  def test_get_microdescriptors(self):
+    """
+    Stream microdescriptors from a GETINFO reply.
+    """
+
+    descriptors = [stem.descriptor.microdescriptor.Microdescriptor.create({'family': 'relay%i' % i}) for i in range(10)]
+    content = b'\r\n'.join([desc.get_bytes().replace(b'\n', b'\r\n') for desc in descriptors])
+    replies = [b'250+md/all=\r\n' + content + b'\r\n.\r\n250 OK\r\n']
+
+    async def reply_mock():
+      reader = asyncio.StreamReader()
+      reader.feed_data(replies.pop(0))
+      reader.feed_eof()
+
+      self.controller._deliver_reply(await stem.socket.recv_message(reader, data_handler = self.controller._reply_data_handler))
+
+    async def send_mock(message):
+      self.assertEqual('GETINFO md/all', message)
+      asyncio.ensure_future(reply_mock())
+
+    with patch('stem.socket.ControlSocket.send', Mock(side_effect = send_mock)):
+      self.assertEqual(descriptors, list(self.controller.get_microdescriptors()))
+
+      replies.append(b'250+md/all=\r\n.\r\n250 OK\r\n')
+      self.assertRaisesWith(DescriptorUnavailable, 'Descriptor information is unavailable, tor might still be downloading it', list, self.controller.get_microdescriptors())
+
+      replies.append(b'552 Unrecognized key "md/all"\r\n')
+      self.assertRaises(InvalidArguments, list, self.controller.get_microdescriptors())
+
+      replies.append(b'552 Unrecognized key "md/all"\r\n')
+      self.assertEqual([], list(self.controller.get_microdescriptors([])))
+
+  @patch('stem.control.DATA_STREAM_CHUNK_SIZE', 200)
+  @patch('stem.util.asyncio.ITERATOR_BUFFER_SIZE', 2)
+  def test_get_microdescriptors_with_nested_requests(self):
+    """
+    Make other requests while iterating over microdescriptors. Our reader
+    continues to receive replies even if the iterator isn't being consumed.
+    """
+
+    descriptors = [stem.descriptor.microdescriptor.Microdescriptor.create({'family': 'relay%i' % i}) for i in range(25)]
+    content = b'\r\n'.join([desc.get_bytes().replace(b'\n', b'\r\n') for desc in descriptors])
+
+    async def start_reader():
+      # like our reader loop, replies are read one after another
+
+      reader = asyncio.StreamReader()
+
+      async def read_replies():
+        while True:
+          self.controller._deliver_reply(await stem.socket.recv_message(reader, data_handler = self.controller._reply_data_handler))
+
+      return reader, asyncio.ensure_future(read_replies())
+
+    reader, reader_task = asyncio.run_coroutine_threadsafe(start_reader(), self.controller._loop).result()
+
+    async def send_mock(message):
+      if message == 'GETINFO md/all':
+        reader.feed_data(b'250+md/all=\r\n' + content + b'\r\n.\r\n250 OK\r\n')
+      else:
+        reader.feed_data(b'250-traffic/read=1024\r\n250 OK\r\n')
+
+    async def iterate_async():
+      results = []
+
+      async for desc in self.controller.get_microdescriptors():
+        results.append((desc, await self.controller.get_info('traffic/read')))
+
+      return results
+
+    try:
+      with patch('stem.socket.ControlSocket.send', Mock(side_effect = send_mock)):
+        results = [(desc, self.controller.get_info('traffic/read')) for desc in self.controller.get_microdescriptors()]
+        self.assertEqual([(desc, '1024') for desc in descriptors], results)
+
+        results = asyncio.run_coroutine_threadsafe(iterate_async(), self.controller._loop).result(timeout = 5)
+        self.assertEqual([(desc, '1024') for desc in descriptors], results)
+    finally:
+      self.controller._loop.call_soon_threadsafe(reader_task.cancel)
+
+  def test_relay_directory(self):
+    """
+    Fetch relays once, then keep them current through events.
+    """
+
+    def status(nickname, fingerprint, address, **attr):
+      identity = base64.b64encode(binascii.unhexlify(fingerprint)).rstrip(b'=').decode('utf-8')
+      attr['r'] = '%s %s oQZFLYe9e4A7bOkWKR7TaNxb0JE 2012-08-06 11:19:31 %s 9001 0' % (nickname, identity, address)
+      return stem.descriptor.router_status_entry.RouterStatusEntryV3.create(attr)
+
+    moria1 = status('moria1', '9695DFC35FFEB861329B9F1AB04C46397020CE31', '128.31.0.34', a = '[2001:DB8::1]:9001')
+    caersidi = status('caerSidi', 'A7569A83B5706AB1B1A9CB52EFF7D2D32E4553EB', '71.35.150.29')
+    other_caersidi = status('caersidi', 'B4BE08B22D4D2923EDC3970FD1B93D0448C6D8FF', '71.35.150.29')
+
+    microdescriptor = stem.descriptor.microdescriptor.Microdescriptor.create()
+    new_microdescriptor = stem.descriptor.microdescriptor.Microdescriptor.create({'family': 'moria1'})
+
+    async def network_statuses_mock(*args):
+      for desc in (moria1, caersidi):
+        yield desc
+
+        # events that arrive while we're loading are applied afterward
+
+        if network_statuses_mock.event:
+          await directory._handle_event(ControlMessage.from_str(network_statuses_mock.event, 'EVENT', normalize = True))
+          network_statuses_mock.event = None
+
+    network_statuses_mock.event = None
+
+    async def get_info_mock(controller, params, get_bytes = False):
+      if 'md/id/A7569A83B5706AB1B1A9CB52EFF7D2D32E4553EB' in params:
+        raise stem.InvalidArguments('552', 'Unrecognized key', ['md/id/A7569A83B5706AB1B1A9CB52EFF7D2D32E4553EB'])
+
+      desc = new_microdescriptor if get_info_mock.updated else microdescriptor
+      return dict([(param, desc.get_bytes()) for param in params])
+
+    get_info_mock.updated = False
+
+    get_network_statuses = patch('stem.control.Controller.get_network_statuses', Mock(side_effect = network_statuses_mock))
+    get_info = patch('stem.control.Controller.get_info', Mock(side_effect = get_info_mock))
+    msg = patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None)))
+
+    with get_network_statuses, get_info, msg:
+      directory = self.controller.get_relay_directory()
+      self.assertTrue(directory is self.controller.get_relay_directory())
+
+      def handle_event(content):
+        event = ControlMessage.from_str(content, 'EVENT', normalize = True)
+        asyncio.run_coroutine_threadsafe(directory._handle_event(event), self.controller._loop).result()
+
+      self.assertEqual(2, len(directory))
+      self.assertEqual(moria1, directory.get_network_status('9695dfc35ffeb861329b9f1ab04c46397020ce31'))
+      self.assertEqual(None, directory.get_network_status('B4BE08B22D4D2923EDC3970FD1B93D0448C6D8FF'))
+      self.assertEqual([caersidi], directory.find_by_nickname('CAERSIDI'))
+      self.assertEqual([moria1], directory.find_by_address('2001:db8:0::1'))
+      self.assertEqual([moria1], directory.find_by_address('128.31.0.34'))
+      self.assertEqual(microdescriptor, directory.get_microdescriptor('9695DFC35FFEB861329B9F1AB04C46397020CE31'))
+      self.assertEqual(None, directory.get_microdescriptor('A7569A83B5706AB1B1A9CB52EFF7D2D32E4553EB'))
+      self.assertEqual([microdescriptor], directory.get_microdescriptors())
+
+      # NS events add or replace relays
+
+      moved_moria1 = status('moria1', '9695DFC35FFEB861329B9F1AB04C46397020CE31', '128.31.0.35')
+      handle_event('650+NS\r\n%s\r\n%s\r\n.\r\n650 OK\r\n' % (moved_moria1, other_caersidi))
+
+      self.assertEqual(3, len(directory))
+      self.assertEqual(moved_moria1, directory.get_network_status('9695DFC35FFEB861329B9F1AB04C46397020CE31'))
+      self.assertEqual(microdescriptor, directory.get_microdescriptor('B4BE08B22D4D2923EDC3970FD1B93D0448C6D8FF'))
+      self.assertEqual([], directory.find_by_address('128.31.0.34'))
+      self.assertEqual([caersidi, other_caersidi], directory.find_by_nickname('caerSidi'))
+      self.assertEqual([caersidi, other_caersidi], directory.find_by_address('71.35.150.29'))
+
+      # NEWDESC events refetch the relay's microdescriptor
+
+      get_info_mock.updated = True
+      handle_event('650 NEWDESC $9695DFC35FFEB861329B9F1AB04C46397020CE31~moria1\r\n')
+      self.assertEqual(new_microdescriptor, directory.get_microdescriptor('9695DFC35FFEB861329B9F1AB04C46397020CE31'))
+
+      # NEWCONSENSUS events replace all of our relays
+
+      handle_event('650+NEWCONSENSUS\r\n%s\r\n.\r\n650 OK\r\n' % caersidi)
+
+      self.assertEqual([caersidi], directory.get_network_statuses())
+      self.assertEqual([], directory.find_by_nickname('moria1'))
+      self.assertEqual([], directory.get_microdescriptors())
+
+      # reloading doesn't clobber events we receive meanwhile
+
+      network_statuses_mock.event = '650+NS\r\n%s\r\n.\r\n650 OK\r\n' % moved_moria1
+      asyncio.run_coroutine_threadsafe(directory._load(), self.controller._loop).result()
+
+      self.assertEqual(None, network_statuses_mock.event)
+      self.assertEqual(moved_moria1, directory.get_network_status('9695DFC35FFEB861329B9F1AB04C46397020CE31'))
+      self.assertEqual([caersidi], directory.find_by_address('71.35.150.29'))
+      self.assertEqual(new_microdescriptor, directory.get_microdescriptor('9695DFC35FFEB861329B9F1AB04C46397020CE31'))
+      self.assertFalse(hasattr(directory, 'load'))
+
+  def test_relay_directory_concurrent_callers(self):
+    """
+    Concurrent callers share the directory of whoever loads it first.
+    """
+
+    async def network_statuses_mock(*args):
+      await asyncio.sleep(0.01)
+
+      for desc in ():
+        yield desc
+
+    async def get_directories():
+      return await asyncio.gather(Controller.get_relay_directory(self.controller), Controller.get_relay_directory(self.controller))
+
+    msg = patch('stem.control.BaseController.msg', Mock(side_effect = coro_func_returning_value(None)))
+
+    with patch('stem.control.Controller.get_network_statuses', Mock(side_effect = network_statuses_mock)) as get_network_statuses_mock, msg:
+      first_directory, second_directory = asyncio.run_coroutine_threadsafe(get_directories(), self.controller._loop).result()
+
+      self.assertTrue(first_directory is second_directory)
+      self.assertEqual(1, get_network_statuses_mock.call_count)
+      self.assertEqual(1, len(self.controller._event_listeners[EventType.NEWCONSENSUS]))
+
+  def test_batch(self):
+    """
+    Send a batch of requests, checking that they're merged into a single write
+    and resolved from tor's replies.
+    """
+
+    sent = []
+
+    replies = [
+      '250-version=0.4.5.1\r\n250-traffic/read=15\r\n250 OK\r\n',
+      '250-ExitPolicy=accept *:80\r\n250-ExitPolicy=reject *:*\r\n250 OK\r\n',
+      '250 OK\r\n',
+      '552 Unrecognized key "blarg"\r\n',
+    ]
+
+    async def send_mock(message, raw = False):
+      sent.append((message, raw))
+
+      for reply in replies:
+        self.controller._deliver_reply(ControlMessage.from_str(reply))
+
+    with patch('stem.socket.ControlSocket.send', Mock(side_effect = send_mock)):
+      with self.controller.batch() as batch:
+        version = batch.get_info('version')
+        traffic = batch.get_info(['traffic/read', 'version'])
+        exit_policy = batch.get_conf('ExitPolicy', multiple = True)
+        newnym = batch.signal(stem.Signal.NEWNYM)
+        missing = batch.get_info('blarg')
+        missing_with_default = batch.get_info('blarg', 'my_default')
+
+    self.assertEqual([('GETINFO version traffic/read\r\nGETCONF exitpolicy\r\nSIGNAL NEWNYM\r\nGETINFO blarg\r\n', True)], sent)
+
+    self.assertEqual('0.4.5.1', version.result())
+    self.assertEqual({'traffic/read': '15', 'version': '0.4.5.1'}, traffic.result())
+    self.assertEqual(['accept *:80', 'reject *:*'], exit_policy.result())
+    self.assertEqual(None, newnym.result())
+    self.assertRaises(InvalidArguments, missing.result)
+    self.assertEqual('my_default', missing_with_default.result())
+    self.assertTrue(self.controller.get_newnym_wait() > 0)
+
+    # closes our controller if its socket is closed, as msg() does
+
+    async def closed_mock(message, raw = False):
+      self.controller._deliver_reply(stem.SocketClosed('socket closed'))
+
+    with patch('stem.socket.ControlSocket.send', Mock(side_effect = closed_mock)):
+      with patch('stem.control.Controller.close', Mock(side_effect = coro_func_returning_value(None))) as close_mock:
+        with self.controller.batch() as batch:
+          version = batch.get_info('version')
+          traffic = batch.get_info('traffic/read', 'my_default')
+
+        self.assertEqual(1, close_mock.call_count)
+
+    self.assertRaises(stem.SocketClosed, version.result)
+    self.assertEqual('my_default', traffic.result())
+
+    # synchronous batches within our loop would block it, so they're refused
+
+    async def batch_within_loop():
+      with self.controller.batch() as batch:
+        batch.get_info('version')
+
+    self.assertRaisesWith(RuntimeError, "Batches can't be used synchronously within our controller's event loop, please use 'async with controller.batch()' instead", asyncio.run_coroutine_threadsafe(batch_within_loop(), self.controller._loop).result, 5)
+
   def test_get_streams(self):
     """
     Exercises the get_streams() method.
@@ -34,5 +34,15 @@ class TestCompression(unittest.TestCase):
       self.skipTest('(%s unavailable)' % compression)
 
     with open(get_resource(filename), 'rb') as compressed_file:
-      content = compression.decompress(compressed_file.read())
-      self.assertTrue(content.startswith(b'router moria1 128.31.0.34 9101 0 9131'))
+      compressed = compressed_file.read()
+
+    content = compression.decompress(compressed)
+    self.assertTrue(content.startswith(b'router moria1 128.31.0.34 9101 0 9131'))
+
+    # decompressing incrementally should provide the same content
+
+    decompressor = compression.decompressor()
+    chunks = [decompressor.decompress(compressed[i:i + 100]) for i in range(0, len(compressed), 100)]
+    chunks.append(decompressor.flush())
+
+    self.assertEqual(content, b''.join(chunks))
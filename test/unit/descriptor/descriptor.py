@@ -4,8 +4,13 @@ Unit tests for the base stem.descriptor module.
 
 import unittest
 
-from stem.descriptor import Descriptor
+import stem.descriptor
+
+from unittest.mock import patch
+
+from stem.descriptor import Descriptor, MappedFile, _descriptor_components, _read_until_keywords_with_ending_keyword
 from stem.descriptor.server_descriptor import RelayDescriptor
+from test.unit.descriptor import get_resource
 
 
 class TestDescriptor(unittest.TestCase):
@@ -49,3 +54,110 @@ class TestDescriptor(unittest.TestCase):
     self.assertEqual(0, len(RelayDescriptor.from_str('', multiple = True)))
 
     self.assertRaisesWith(ValueError, "Descriptor.from_str() expected a single descriptor, but had 2 instead. Please include 'multiple = True' if you want a list of results instead.", RelayDescriptor.from_str, desc_text)
+
+  def test_descriptor_components(self):
+    """
+    Parse keyword lines with and without pgp style blocks.
+    """
+
+    content = '\n'.join((
+      'signing-key',
+      '-----BEGIN RSA PUBLIC KEY-----',
+      'MIGJAoGBAJv5IIWQ+WDWYUdyA/0L8qbIkEVH/cwryZWoIaPAzINfrw1WfNZGtBmg',
+      '-----END RSA PUBLIC KEY-----',
+      'contact atagar',
+      'contact other',
+    ))
+
+    entries = _descriptor_components(content, True)
+
+    self.assertEqual(['signing-key', 'contact'], list(entries.keys()))
+    self.assertEqual([('', 'RSA PUBLIC KEY', content.split('\n', 1)[1].rsplit('\n', 2)[0])], entries['signing-key'])
+    self.assertEqual([('atagar', None, None), ('other', None, None)], entries['contact'])
+
+  def test_descriptor_components_unterminated_block(self):
+    """
+    Unterminated pgp style blocks are an error when validating, and otherwise
+    consume the remainder of the content.
+    """
+
+    content = '\n'.join((
+      'contact atagar',
+      'signing-key',
+      '-----BEGIN RSA PUBLIC KEY-----',
+      'MIGJAoGBAJv5IIWQ+WDWYUdyA/0L8qbIkEVH/cwryZWoIaPAzINfrw1WfNZGtBmg',
+      'platform Tor 0.4.5.1',
+    ))
+
+    self.assertRaisesWith(ValueError, "Unterminated pgp style block (looking for '-----END RSA PUBLIC KEY-----'):\n%s" % content.split('\n', 2)[2], _descriptor_components, content, True)
+
+    entries = _descriptor_components(content, False)
+    self.assertEqual(['contact'], list(entries.keys()))
+
+  def test_mapped_file_reading(self):
+    """
+    Memory mapped files should read until keywords just as regular files do.
+    """
+
+    path = get_resource('cached-consensus')
+
+    with open(path, 'rb') as regular_file:
+      content = regular_file.read()
+
+    routers_start = content.find(b'\nr ') + 1
+    routers_end = content.find(b'\ndirectory-footer') + 1
+
+    test_inputs = (
+      (('r', 'directory-footer'), 0, {}),
+      (('r',), routers_start, {'ignore_first': True}),
+      (('r',), routers_start, {'ignore_first': True, 'end_position': routers_end}),
+      (('r',), routers_start, {'ignore_first': True, 'end_position': routers_end - 5}),
+      (('directory-footer',), routers_start, {'skip': True}),
+      (('directory-footer',), routers_start, {'inclusive': True}),
+      (('no-such-keyword',), routers_start, {}),
+    )
+
+    with open(path, 'rb') as regular_file, MappedFile(path) as mapped_file:
+      for keywords, position, kwargs in test_inputs:
+        for desc_file in (regular_file, mapped_file):
+          desc_file.seek(position)
+
+        expected = _read_until_keywords_with_ending_keyword(keywords, regular_file, include_ending_keyword = True, **kwargs)
+        result = _read_until_keywords_with_ending_keyword(keywords, mapped_file, include_ending_keyword = True, **kwargs)
+
+        self.assertEqual(expected, result)
+        self.assertEqual(regular_file.tell(), mapped_file.tell())
+
+  def test_parse_file_with_path(self):
+    """
+    Parsing a path memory maps it, providing the same descriptors as an opened
+    file.
+    """
+
+    path = get_resource('cached-consensus')
+
+    with open(path, 'rb') as regular_file:
+      expected = [desc.get_bytes() for desc in stem.descriptor.parse_file(regular_file)]
+
+    self.assertEqual(expected, [desc.get_bytes() for desc in stem.descriptor.parse_file(path)])
+
+  @patch('stem.descriptor.PARSE_CHUNK_SIZE', 1000)
+  def test_parse_files(self):
+    """
+    Parse tarballs and concatenated descriptors across workers, split into
+    chunks far smaller than the files.
+    """
+
+    paths = [get_resource(filename) for filename in ('descriptor_archive.tar', 'cached-microdescs', 'metrics_server_desc_multiple', 'extrainfo_bridge_descriptor_multiple', 'metrics_consensus')]
+
+    def attributes(desc):
+      return (type(desc), desc.get_bytes(), desc.get_path(), desc.get_archive_path())
+
+    expected = [attributes(desc) for path in paths for desc in stem.descriptor.parse_file(path)]
+    self.assertEqual(21, len(expected))
+    self.assertEqual('descriptor_archive/0/2/02c311d3d789f3f55c0880b5c85f3c196343552c', expected[0][3])
+
+    for workers in (1, 2):
+      self.assertEqual(expected, [attributes(desc) for desc in stem.descriptor.parse_files(paths, workers = workers)])
+
+    self.assertRaisesWith(ValueError, 'parse_files() requires at least one worker, got 0', list, stem.descriptor.parse_files(paths, workers = 0))
@@ -116,6 +116,36 @@ class TestMicrodescriptor(unittest.TestCase):
     desc = Microdescriptor(desc_text, validate = False)
     self.assertEqual(['Amunet1'], desc.family)
 
+  def test_compact(self):
+    """
+    Compacting microdescriptors should retain their attributes.
+    """
+
+    with open(get_resource('cached-microdescs'), 'rb') as descriptor_file:
+      descriptors = list(stem.descriptor.parse_file(descriptor_file, 'microdescriptor 1.0'))
+
+    with open(get_resource('cached-microdescs'), 'rb') as descriptor_file:
+      compact_descriptors = list(stem.descriptor.parse_file(descriptor_file, 'microdescriptor 1.0'))
+
+    for desc in compact_descriptors:
+      desc.compact()
+
+    for desc, compact_desc in zip(descriptors, compact_descriptors):
+      for attr in Microdescriptor.ATTRIBUTES:
+        self.assertEqual(getattr(desc, attr), getattr(compact_desc, attr))
+
+    self.assertTrue(compact_descriptors[0].exit_policy is compact_descriptors[1].exit_policy)
+    self.assertEqual({}, compact_descriptors[0]._entries)
+
+    # descriptors we've already fully parsed also drop their content
+
+    parsed_desc = Microdescriptor(descriptors[0].get_bytes())
+    parsed_desc.get_unrecognized_lines()
+    parsed_desc.compact()
+
+    self.assertEqual({}, parsed_desc._entries)
+    self.assertTrue(parsed_desc.exit_policy is compact_descriptors[0].exit_policy)
+
   def test_a_line(self):
     """
     Sanity test with both an IPv4 and IPv6 address.
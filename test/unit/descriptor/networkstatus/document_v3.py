@@ -22,6 +22,7 @@ from stem.descriptor.networkstatus import (
   PackageVersion,
   DirectoryAuthority,
   NetworkStatusDocumentV3,
+  RelayTable,
   _parse_file,
 )
 
@@ -1179,6 +1180,105 @@ DnN5aFtYKiTc19qIC7Nmo+afPdDEf0MlJvEOP5EWl3w=
     document = NetworkStatusDocumentV3(content, False)
     self.assertEqual([RouterStatusEntryV3(str(entry1), False)], list(document.routers.values()))
 
+  def _relay_table_document(self):
+    return NetworkStatusDocumentV3.create(routers = (
+      RouterStatusEntryV3.create({
+        'r': 'caerSidi p1aag7VwarGxqctS7/fS0y5FU+s oQZFLYe9e4A7bOkWKR7TaNxb0JE 2012-08-06 11:19:31 85.25.12.3 9001 0',
+        's': 'Exit Fast Running Valid',
+        'w': 'Bandwidth=8000 Measured=7500',
+        'p': 'accept 80,443',
+      }),
+      RouterStatusEntryV3.create({
+        'r': 'Nightfae AWt0XNId/OU2xX5xs5hVtDc5Mes 6873oEfM7fFIbxYtwllw9GPDwkA 2013-02-20 11:12:27 85.25.66.233 9001 9030',
+        's': 'Exit Running Valid',
+        'w': 'Bandwidth=9000',
+        'p': 'accept 80,443',
+      }),
+      RouterStatusEntryV3.create({
+        'r': 'Amunet1 IbhGa8T+8tyy/MhxCk/qI+EI2LU oQZFLYe9e4A7bOkWKR7TaNxb0JE 2012-08-06 11:19:31 71.35.133.197 443 80',
+        's': 'Exit Fast Running Valid MiddleOnly',
+        'w': 'Bandwidth=20000',
+        'p': 'reject 80',
+      }),
+    ))
+
+  def _check_relay_table(self, table):
+    def nicknames(mask):
+      return [router.nickname for router in table.select(mask)]
+
+    self.assertEqual(3, len(table))
+    self.assertEqual(['caerSidi', 'Nightfae', 'Amunet1'], list(table.nickname))
+    self.assertEqual(['85.25.12.3', '85.25.66.233', '71.35.133.197'], list(table.address))
+    self.assertEqual([9001, 9001, 443], list(table.or_port))
+    self.assertEqual([0, 9030, 80], list(table.dir_port))
+    self.assertEqual([8000, 9000, 20000], list(table.bandwidth))
+    self.assertEqual([7500, 0, 0], list(table.measured))
+    self.assertEqual(['accept 80,443', 'accept 80,443', 'reject 80'], list(table.exit_policy))
+    self.assertEqual(table.flag_mask(Flag.EXIT, Flag.FAST), table.flags[0] & table.flag_mask(Flag.EXIT, Flag.FAST))
+
+    self.assertEqual(['caerSidi', 'Amunet1'], nicknames(table.has_flags(Flag.EXIT, Flag.FAST)))
+    self.assertEqual(['Amunet1'], nicknames(table.has_flags('MiddleOnly')))
+    self.assertEqual([], nicknames(table.has_flags('NoSuchFlag')))
+    self.assertEqual(['caerSidi', 'Nightfae'], nicknames(table.in_subnet('85.25.0.0/16')))
+    self.assertEqual(['Nightfae'], nicknames(table.in_subnet('85.25.66.233')))
+    self.assertEqual(['caerSidi', 'Nightfae'], nicknames(table.can_exit_to(80)))
+    self.assertEqual(['Amunet1'], nicknames(table.can_exit_to(22)))
+
+    self.assertEqual(['caerSidi'], nicknames(table.match(flags = (Flag.EXIT, Flag.FAST), min_bandwidth = 5000, subnet = '85.25.0.0/16')))
+    self.assertEqual(['Nightfae', 'Amunet1'], nicknames(table.match(min_bandwidth = 9000)))
+    self.assertEqual(['caerSidi', 'Nightfae', 'Amunet1'], nicknames(table.match()))
+
+    self.assertRaisesWith(ValueError, "No relay has the 'NoSuchFlag' flag", table.flag_mask, 'NoSuchFlag')
+    self.assertRaisesWith(ValueError, "'85.25.0.0/33' isn't a valid IPv4 subnet", table.in_subnet, '85.25.0.0/33')
+
+  def test_relay_table(self):
+    """
+    Columnar view of a document's relays, without numpy.
+    """
+
+    table = self._relay_table_document().to_columns(use_numpy = False)
+    self.assertTrue(isinstance(table.bandwidth, list))
+    self._check_relay_table(table)
+
+    self.assertEqual(0, len(RelayTable([])))
+    self.assertEqual([], RelayTable([]).select(RelayTable([]).match(flags = (Flag.EXIT,))))
+
+  @test.require.module('numpy')
+  def test_relay_table_with_numpy(self):
+    """
+    Columnar view of a document's relays, with numpy arrays.
+    """
+
+    table = self._relay_table_document().to_columns()
+    self.assertFalse(isinstance(table.bandwidth, list))
+    self._check_relay_table(table)
+
+    mask = table.has_flags(Flag.EXIT, Flag.FAST) & (table.bandwidth > 10000)
+    self.assertEqual(['Amunet1'], [router.nickname for router in table.select(mask)])
+
+  def test_relay_table_with_many_flags(self):
+    """
+    Relays with more flags than an int64 bitmask can hold.
+    """
+
+    many_flags = ['Flag%i' % i for i in range(70)]
+
+    table = NetworkStatusDocumentV3.create(routers = (
+      RouterStatusEntryV3.create({
+        'r': 'caerSidi p1aag7VwarGxqctS7/fS0y5FU+s oQZFLYe9e4A7bOkWKR7TaNxb0JE 2012-08-06 11:19:31 85.25.12.3 9001 0',
+        's': ' '.join(many_flags),
+      }),
+      RouterStatusEntryV3.create({
+        'r': 'Nightfae AWt0XNId/OU2xX5xs5hVtDc5Mes 6873oEfM7fFIbxYtwllw9GPDwkA 2013-02-20 11:12:27 85.25.66.233 9001 9030',
+        's': 'Exit Flag69',
+      }),
+    )).to_columns()
+
+    self.assertEqual(2, len(table.select(table.has_flags('Flag69'))))
+    self.assertEqual(1, len(table.select(table.has_flags('Flag68', 'Flag69'))))
+    self.assertEqual(1, len(table.select(table.has_flags(Flag.EXIT, 'Flag69'))))
+    self.assertEqual(0, len(table.select(table.has_flags(Flag.EXIT, 'Flag0'))))
+
   def test_with_directory_authorities(self):
     """
     Includes a couple directory authorities in the document.
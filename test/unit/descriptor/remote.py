@@ -2,12 +2,18 @@
 Unit tests for stem.descriptor.remote.
 """
 
+import asyncio
+import functools
+import io
+import socket
+import threading
 import time
 import unittest
 
 import stem
 import stem.descriptor
 import stem.descriptor.remote
+import stem.util.asyncio
 import stem.util.str_tools
 import test.require
 
@@ -331,6 +337,366 @@ class TestDescriptorDownloader(unittest.TestCase):
 
     self.assertRaises(ValueError, query.run)
 
+  @patch('random.choice', Mock(side_effect = lambda candidates: candidates[0]))
+  def test_hedged_download(self):
+    """
+    Request from another endpoint when the first is slow to respond.
+    """
+
+    slow_endpoint = stem.DirPort('128.31.0.39', 9131)
+    fast_endpoint = stem.DirPort('86.59.21.38', 80)
+    requested = []
+
+    async def download_from(endpoint, resource, handler = None):
+      requested.append(endpoint)
+
+      if endpoint == slow_endpoint:
+        await asyncio.sleep(10)
+
+      return b'HTTP/1.0 200 OK\r\n' + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n' + TEST_DESCRIPTOR
+
+    with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_from)):
+      query = stem.descriptor.remote.Query(
+        TEST_RESOURCE,
+        'server-descriptor 1.0',
+        endpoints = [slow_endpoint, fast_endpoint],
+        compression = Compression.PLAINTEXT,
+        hedge = 2,
+        hedge_delay = 0.05,
+      )
+
+      self.assertEqual(['moria1'], [desc.nickname for desc in query.run()])
+      self.assertEqual([slow_endpoint, fast_endpoint], requested)
+      self.assertEqual('http://86.59.21.38:80' + TEST_RESOURCE, query.download_url)
+      self.assertTrue(query.runtime < 5)
+
+    # our download_url and reply_headers are those of the response we used,
+    # even if we started another attempt after it
+
+    async def download_hedged(endpoint, resource, handler = None):
+      await asyncio.sleep(0.1 if endpoint == slow_endpoint else 10)
+      return b'HTTP/1.0 200 OK\r\nX-Endpoint: %i\r\n' % endpoint.port + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n' + TEST_DESCRIPTOR
+
+    with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_hedged)):
+      query = stem.descriptor.remote.Query(
+        TEST_RESOURCE,
+        'server-descriptor 1.0',
+        endpoints = [slow_endpoint, fast_endpoint],
+        compression = Compression.PLAINTEXT,
+        hedge = 2,
+        hedge_delay = 0.05,
+      )
+
+      self.assertEqual(['moria1'], [desc.nickname for desc in query.run()])
+      self.assertEqual('http://128.31.0.39:9131' + TEST_RESOURCE, query.download_url)
+      self.assertEqual('9131', query.reply_headers.get('X-Endpoint'))
+
+    # failures are retried elsewhere without waiting for our hedge delay
+
+    async def download_fails(endpoint, resource, handler = None):
+      requested.append(endpoint)
+
+      if endpoint == slow_endpoint:
+        raise stem.DownloadFailed('http://128.31.0.39:9131', OSError('connection refused'), None)
+
+      return b'HTTP/1.0 200 OK\r\n' + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n' + TEST_DESCRIPTOR
+
+    requested = []
+
+    with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_fails)):
+      query = stem.descriptor.remote.Query(
+        TEST_RESOURCE,
+        'server-descriptor 1.0',
+        endpoints = [slow_endpoint, fast_endpoint],
+        compression = Compression.PLAINTEXT,
+        hedge_delay = 10,
+      )
+
+      self.assertEqual(['moria1'], [desc.nickname for desc in query.run()])
+      self.assertEqual([slow_endpoint, fast_endpoint], requested)
+
+    self.assertRaisesWith(ValueError, 'Hedged requests must use at least one endpoint, got 0', stem.descriptor.remote.Query, TEST_RESOURCE, hedge = 0)
+
+  @patch('stem.descriptor.remote.STREAM_CHUNK_SIZE', 1)
+  def test_streamed_download(self):
+    """
+    Provide descriptors as they're parsed, before the download completes.
+    """
+
+    second_descriptor = TEST_DESCRIPTOR.replace(b'router moria1', b'router moria2')
+    response = b'HTTP/1.0 200 OK\r\n' + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n' + TEST_DESCRIPTOR + second_descriptor
+
+    async def run_query():
+      first_received = asyncio.Event()
+      completed_before_first = []
+
+      async def download_from(endpoint, resource, handler = None):
+        handler(response)
+        await asyncio.wait_for(first_received.wait(), timeout = 5)
+        completed_before_first.append(False)
+        return b''
+
+      with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_from)):
+        query = stem.descriptor.remote.Query(
+          TEST_RESOURCE,
+          'server-descriptor 1.0',
+          endpoints = [stem.DirPort('128.31.0.39', 9131)],
+          compression = Compression.PLAINTEXT,
+          start = False,
+        )
+
+        nicknames = []
+
+        async for desc in query:
+          if not first_received.is_set():
+            completed_before_first.append(query._downloader_task.done())
+            first_received.set()
+
+          nicknames.append(desc.nickname)
+
+        return nicknames, completed_before_first
+
+    nicknames, completed_before_first = asyncio.run(run_query())
+
+    self.assertEqual(['moria1', 'moria2'], nicknames)
+    self.assertEqual([False, False], completed_before_first)
+
+    # parsing the response a byte at a time is the same as doing so all at once
+
+    parse = functools.partial(stem.descriptor.parse_file, descriptor_type = 'server-descriptor 1.0')
+    received = []
+
+    stream = stem.descriptor.remote._ResponseStream(parse, b'router ', lambda stream, descriptors: received.extend(descriptors))
+
+    for i in range(len(response)):
+      stream.feed(response[i:i + 1])
+
+    stream.finish()
+
+    self.assertEqual('identity', stream.headers['Content-Encoding'])
+    self.assertEqual(list(parse(io.BytesIO(TEST_DESCRIPTOR + second_descriptor))), received)
+
+  @patch('stem.descriptor.remote.STREAM_CHUNK_SIZE', 1)
+  def test_streamed_iteration(self):
+    """
+    Synchronously iterating over a query provides descriptors before the
+    download completes.
+    """
+
+    second_descriptor = TEST_DESCRIPTOR.replace(b'router moria1', b'router moria2')
+    response = b'HTTP/1.0 200 OK\r\n' + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n' + TEST_DESCRIPTOR + second_descriptor
+    first_received = threading.Event()
+
+    async def download_from(endpoint, resource, handler = None):
+      handler(response)
+
+      while not first_received.is_set():
+        await asyncio.sleep(0.01)
+
+      return b''
+
+    with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_from)):
+      query = stem.descriptor.remote.Query(
+        TEST_RESOURCE,
+        'server-descriptor 1.0',
+        endpoints = [stem.DirPort('128.31.0.39', 9131)],
+        compression = Compression.PLAINTEXT,
+      )
+
+      nicknames = []
+
+      for desc in query:
+        if not first_received.is_set():
+          self.assertFalse(query._downloader_task.done())
+          first_received.set()
+
+        nicknames.append(desc.nickname)
+
+      self.assertEqual(['moria1', 'moria2'], nicknames)
+      self.assertEqual(['moria1', 'moria2'], [desc.nickname for desc in query])
+      self.assertFalse(query._loop_thread.is_alive())
+
+  @mock_download(TEST_DESCRIPTOR)
+  def test_shared_runtime(self):
+    """
+    Queries run within a shared runtime's loop when one is set.
+    """
+
+    runtime = stem.util.asyncio.Runtime()
+    stem.util.asyncio.set_runtime(runtime)
+
+    try:
+      queries = [stem.descriptor.remote.get_server_descriptors('9695DFC35FFEB861329B9F1AB04C46397020CE31') for _ in range(3)]
+
+      self.assertEqual([runtime._loop_threads[0]] * 3, [query._loop_thread for query in queries])
+      self.assertEqual([['moria1']] * 3, [[desc.nickname for desc in query.run()] for query in queries])
+      self.assertEqual(0, runtime.stats()[0].users)
+      self.assertTrue(runtime._loop_threads[0].is_alive())
+
+      # queries have already stopped after running, so this is a no-op
+
+      queries[0].stop()
+      self.assertTrue(runtime._loop_threads[0].is_alive())
+    finally:
+      stem.util.asyncio.set_runtime(None)
+      runtime.stop()
+
+  @mock_download(TEST_DESCRIPTOR)
+  def test_sharded_download(self):
+    """
+    Split a request for many fingerprints across several endpoints.
+    """
+
+    fingerprints = ['%040X' % i for i in range(200)]
+    endpoints = [stem.DirPort('128.31.0.%i' % i, 9131) for i in range(4)]
+
+    self.assertRaisesWith(ValueError, 'Unable to request more than 96 descriptors at a time by their fingerprints', stem.descriptor.remote.get_server_descriptors, fingerprints, start = False)
+
+    query = stem.descriptor.remote.get_server_descriptors(fingerprints, endpoints = endpoints, compression = Compression.PLAINTEXT, shards = 4)
+    self.assertEqual(4, len(query.run()))
+
+    download_calls = stem.descriptor.remote.Query._download_from.call_args_list
+    requested_endpoints = set([call[0][0] for call in download_calls])
+    requested_fingerprints = [fp for call in download_calls for fp in call[0][1][len('/tor/server/fp/'):].split('+')]
+
+    self.assertEqual(set(endpoints), requested_endpoints)
+    self.assertEqual(sorted(fingerprints), sorted(requested_fingerprints))
+
+  def test_sharded_download_order(self):
+    """
+    Shards are merged in order, even if later shards finish first.
+    """
+
+    fingerprints = ['%040X' % i for i in range(200)]
+    resources = stem.descriptor.remote._shard_resource('/tor/server/fp/%s' % '+'.join(fingerprints), 4)
+
+    async def download_from(endpoint, resource, handler = None):
+      index = resources.index(resource)
+      await asyncio.sleep(0.01 * (len(resources) - index))  # later shards are faster
+
+      handler(b'HTTP/1.0 200 OK\r\nX-Shard: %i\r\n' % index + stem.util.str_tools._to_bytes(HEADER % 'identity') + b'\r\n\r\n')
+
+      for i in range(2):
+        handler(TEST_DESCRIPTOR.replace(b'router moria1', b'router shard%ip%i' % (index, i)))
+
+      return b''
+
+    with patch('stem.descriptor.remote.Query._download_from', Mock(side_effect = download_from)):
+      query = stem.descriptor.remote.get_server_descriptors(fingerprints, endpoints = [stem.DirPort('128.31.0.39', 9131)], compression = Compression.PLAINTEXT, shards = 4)
+      expected = ['shard%ip%i' % (index, i) for index in range(len(resources)) for i in range(2)]
+
+      self.assertEqual(expected, [desc.nickname for desc in query.run()])
+      self.assertEqual(expected, [desc.nickname for desc in query])
+
+      # our download_url and reply_headers are those of our first shard
+
+      self.assertEqual('http://128.31.0.39:9131' + resources[0], query.download_url)
+      self.assertEqual('0', query.reply_headers.get('X-Shard'))
+
+  def test_shard_resource(self):
+    """
+    Splits resources into the number of shards we request, or more if they're
+    over the limit that can be requested at a time.
+    """
+
+    self.assertEqual(['/tor/server/all'], stem.descriptor.remote._shard_resource('/tor/server/all', 4))
+    self.assertEqual(['/tor/micro/d/a-b', '/tor/micro/d/c'], stem.descriptor.remote._shard_resource('/tor/micro/d/a-b-c', 2))
+    self.assertEqual(['/tor/keys/fp/a', '/tor/keys/fp/b'], stem.descriptor.remote._shard_resource('/tor/keys/fp/a+b', 5))
+
+    fingerprints = ['%040X' % i for i in range(200)]
+    shards = stem.descriptor.remote._shard_resource('/tor/extra/fp/%s' % '+'.join(fingerprints), 2)
+
+    self.assertEqual(3, len(shards))
+    self.assertEqual([67, 67, 66], [len(shard.split('+')) for shard in shards])
+
+  def test_connection_pool(self):
+    """
+    Reuse DirPort connections that are kept alive, even from different event
+    loops.
+    """
+
+    client, server = socket.socketpair()
+    client.setblocking(False)
+    endpoint = stem.DirPort('128.31.0.39', 9131)
+
+    response = b'HTTP/1.1 200 OK\r\nContent-Encoding: identity\r\nContent-Length: %i\r\n\r\n' % len(TEST_DESCRIPTOR) + TEST_DESCRIPTOR
+    pool = stem.descriptor.remote.ConnectionPool()
+
+    with patch('stem.descriptor.remote._connect', Mock(side_effect = coro_func_returning_value(client))) as connect_mock:
+      for _ in range(2):
+        server.sendall(response)
+        reply = asyncio.run(pool.request(endpoint, TEST_RESOURCE, [Compression.PLAINTEXT]))
+
+        self.assertEqual(TEST_DESCRIPTOR, stem.descriptor.remote._http_body_and_headers(reply)[0] + b'\n')
+
+      self.assertEqual(1, connect_mock.call_count)
+
+    requests = server.recv(65536).split(b'\r\n\r\n')
+    self.assertEqual(3, len(requests))  # two requests and a trailing empty string
+    self.assertEqual('GET %s HTTP/1.1' % TEST_RESOURCE, requests[0].decode('utf-8').splitlines()[0])
+    self.assertEqual('Host: 128.31.0.39:9131', requests[0].decode('utf-8').splitlines()[1])
+
+    # connections that won't be kept alive are closed
+
+    server.sendall(b'HTTP/1.0 200 OK\r\nContent-Encoding: identity\r\n\r\n' + TEST_DESCRIPTOR)
+    server.shutdown(socket.SHUT_WR)
+    asyncio.run(pool.request(endpoint, TEST_RESOURCE, [Compression.PLAINTEXT]))
+
+    self.assertEqual(-1, client.fileno())
+    self.assertEqual(None, pool._acquire(endpoint))
+
+    server.close()
+    pool.close()
+
+  def test_downloader_close(self):
+    """
+    Closing a downloader closes the connections its queries pool.
+    """
+
+    connection_pool_close = patch('stem.descriptor.remote.ConnectionPool.close')
+    relay_pool_close = patch('stem.client.RelayPool.close')
+
+    with connection_pool_close as connection_pool_close_mock, relay_pool_close as relay_pool_close_mock:
+      with stem.descriptor.remote.DescriptorDownloader() as downloader:
+        query = downloader.get_server_descriptors(start = False)
+
+        self.assertTrue(query.connection_pool is downloader._connection_pool)
+        self.assertTrue(query.relay_pool is downloader._relay_pool)
+        self.assertEqual(0, connection_pool_close_mock.call_count)
+
+      self.assertEqual(1, connection_pool_close_mock.call_count)
+      self.assertEqual(1, relay_pool_close_mock.call_count)
+
+  def test_http_request(self):
+    """
+    Read HTTP responses delimited by their content length, chunks, or the
+    connection closing.
+    """
+
+    def http_request(response, close = False):
+      client, server = socket.socketpair()
+      client.setblocking(False)
+      server.sendall(response)
+
+      if close:
+        server.shutdown(socket.SHUT_WR)
+
+      try:
+        return asyncio.run(stem.descriptor.remote._http_request(client, b'GET / HTTP/1.1\r\n\r\n'))
+      finally:
+        client.close()
+        server.close()
+
+    self.assertEqual((b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello', True), http_request(b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello'))
+    self.assertEqual((b'HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 2\r\n\r\nhi', False), http_request(b'HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 2\r\n\r\nhi'))
+    self.assertEqual((b'HTTP/1.0 200 OK\r\nServer: tor\r\n\r\nhello', False), http_request(b'HTTP/1.0 200 OK\r\nServer: tor\r\n\r\nhello', close = True))
+
+    chunked = b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n7;ext=1\r\n, world\r\n0\r\n\r\n'
+    self.assertEqual((b'HTTP/1.1 200 OK\r\n\r\nhello, world', True), http_request(chunked))
+
+    self.assertRaisesWith(stem.ProtocolError, 'Connection closed after 2 of 5 HTTP content bytes', http_request, b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhe', close = True)
+    self.assertRaisesWith(stem.ProtocolError, "'xyz' is not a valid HTTP chunk size", http_request, b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nxyz\r\n')
+
   def test_query_with_invalid_endpoints(self):
     invalid_endpoints = {
       'hello': "'h' is a str.",
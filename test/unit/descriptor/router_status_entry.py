@@ -294,6 +294,38 @@ class TestRouterStatusEntry(unittest.TestCase):
     entry = RouterStatusEntryV3.create({'z': 'New tor feature: sparkly unicorns!'})
     self.assertEqual(['z New tor feature: sparkly unicorns!'], entry.get_unrecognized_lines())
 
+  def test_compact(self):
+    """
+    Compacting entries should retain their attributes, and share the ones that
+    are common between relays.
+    """
+
+    content = ENTRY_WITHOUT_ED25519 + 'z New tor feature: sparkly unicorns!\n'
+    entry, compact_entry, other_entry = [RouterStatusEntryV3(content) for i in range(3)]
+
+    compact_entry.compact()
+    other_entry.compact()
+
+    self.assertEqual({}, compact_entry._entries)
+
+    for attr in RouterStatusEntryV3.ATTRIBUTES:
+      self.assertEqual(getattr(entry, attr), getattr(compact_entry, attr))
+
+    self.assertEqual(['z New tor feature: sparkly unicorns!'], compact_entry.get_unrecognized_lines())
+    self.assertEqual(entry, compact_entry)
+
+    self.assertTrue(compact_entry.flags is other_entry.flags)
+    self.assertTrue(compact_entry.exit_policy is other_entry.exit_policy)
+    self.assertFalse(compact_entry.microdescriptor_hashes is other_entry.microdescriptor_hashes)
+
+    # malformed lines leave their attributes with default values
+
+    entry = RouterStatusEntryV3(ENTRY_WITHOUT_ED25519.replace('v Tor 0.2.6.10', 'v Tor blargg'))
+    entry.compact()
+
+    self.assertEqual('seele', entry.nickname)
+    self.assertEqual(None, entry.version)
+
   def test_proceeding_line(self):
     """
     Includes content prior to the 'r' line.
@@ -766,6 +766,18 @@ Qlx9HNCqCY877ztFRC624ja2ql6A2hBcuoYMbkHjcQ4=
     desc = RelayDescriptor.create({'ipv6-policy': 'accept 22-23,53,80,110'})
     self.assertEqual(stem.exit_policy.MicroExitPolicy('accept 22-23,53,80,110'), desc.exit_policy_v6)
 
+  def test_exit_policy_is_shared(self):
+    """
+    Descriptors with the same exit policy should share a single instance.
+    """
+
+    content = RelayDescriptor.content({'accept': '*:80', 'ipv6-policy': 'accept 80'}, exclude = ('reject',))
+    desc1, desc2 = RelayDescriptor(content), RelayDescriptor(content)
+
+    self.assertEqual(stem.exit_policy.ExitPolicy('accept *:80'), desc1.exit_policy)
+    self.assertTrue(desc1.exit_policy is desc2.exit_policy)
+    self.assertTrue(desc1.exit_policy_v6 is desc2.exit_policy_v6)
+
   def test_extrainfo_sha256_digest(self):
     """
     Extrainfo descriptor line with both a hex and base64 encoded sha256 digest.
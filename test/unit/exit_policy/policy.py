@@ -10,6 +10,8 @@ from stem.exit_policy import (
   ExitPolicy,
   MicroExitPolicy,
   ExitPolicyRule,
+  intern_policy,
+  intern_micro_policy,
 )
 
 
@@ -75,6 +77,61 @@ class TestExitPolicy(unittest.TestCase):
     self.assertEqual(False, policy.can_exit_to(None, 80, strict = True))  # can't exit to *all* instances of port 80
     self.assertEqual(True, policy.can_exit_to(None, 80, strict = False))  # can exit to *an* instance of port 80
 
+  def test_can_exit_to_many(self):
+    policy = ExitPolicy('reject 10.0.0.0/8:*', 'reject [2001:db8::]/32:*', 'accept *:80-443', 'reject *:*')
+
+    addresses = ['10.0.0.1', '75.119.206.243', '75.119.206.243', '75.119.206.243', '[2001:db8::1]', '2001:db9::1', '0.0.0.0', '255.255.255.255']
+    ports = [80, 79, 80, 443, 80, 100, 443, 444]
+
+    self.assertEqual([False, False, True, True, False, True, True, False], policy.can_exit_to_many(addresses, ports))
+    self.assertEqual([policy.can_exit_to(address, port) for address, port in zip(addresses, ports)], policy.can_exit_to_many(addresses, ports))
+    self.assertEqual([], policy.can_exit_to_many([], []))
+
+    self.assertRaisesWith(ValueError, "'nope' isn't a valid IPv4 or IPv6 address", policy.can_exit_to_many, ['nope'], [80])
+    self.assertRaisesWith(ValueError, "'0' isn't a valid port", policy.can_exit_to_many, ['10.0.0.1'], [0])
+    self.assertRaisesWith(ValueError, 'can_exit_to_many() requires a port for each address, but had 1 addresses and 2 ports', policy.can_exit_to_many, ['10.0.0.1'], [80, 443])
+
+  def test_can_exit_to_many_matches_can_exit_to(self):
+    # compiled policies should always agree with walking the rules
+
+    policies = [
+      ExitPolicy(),
+      ExitPolicy('reject *:*'),
+      ExitPolicy('reject *:80', 'accept *:80', 'reject *:*'),
+      ExitPolicy('accept 127.0.0.1/16:22', 'reject *4:22', 'accept *6:*', 'reject 1.2.0.0/255.255.0.0:*'),
+      ExitPolicy('reject 1.2.3.4/255.0.255.0:1-100', 'accept [::]/0:443', 'reject *:443', 'accept *:*'),
+      ExitPolicy(*DEFAULT_POLICY_RULES),
+      MicroExitPolicy('accept 80,443,1000-2000'),
+      MicroExitPolicy('reject 1-1024'),
+    ]
+
+    addresses = ['1.2.3.4', '1.9.3.9', '127.0.0.1', '127.0.255.255', '127.1.0.0', '0.0.0.0', '::', '[::1]', 'fe80::1']
+    ports = [1, 22, 25, 80, 100, 101, 443, 1500, 6999, 65535]
+
+    for policy in policies:
+      all_addresses = [address for address in addresses for port in ports]
+      all_ports = [port for address in addresses for port in ports]
+      expected = [policy.can_exit_to(address, port) for address, port in zip(all_addresses, all_ports)]
+
+      self.assertEqual(expected, policy.can_exit_to_many(all_addresses, all_ports), str(policy))
+
+  def test_intern_policy(self):
+    policy = intern_policy('accept *:80', 'accept *:443', 'reject *:*')
+
+    self.assertEqual(ExitPolicy('accept *:80', 'accept *:443', 'reject *:*'), policy)
+    self.assertTrue(policy is intern_policy('accept *:80', 'accept *:443', 'reject *:*'))
+    self.assertTrue(policy is intern_policy(b'accept *:80', b'accept *:443', b'reject *:*'))
+    self.assertFalse(policy is intern_policy('accept *:80', 'reject *:*'))
+
+  def test_intern_micro_policy(self):
+    policy = intern_micro_policy('accept 80,443')
+
+    self.assertEqual(MicroExitPolicy('accept 80,443'), policy)
+    self.assertTrue(policy is intern_micro_policy('accept 80,443'))
+    self.assertFalse(policy is intern_micro_policy('accept 80'))
+
+    self.assertRaisesWith(ValueError, "'80a' is an invalid port range", intern_micro_policy, 'accept 80a')
+
   def test_is_exiting_allowed(self):
     test_inputs = {
       (): True,
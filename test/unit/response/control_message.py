@@ -2,6 +2,7 @@
 Unit tests for the stem.response.ControlMessage parsing and class.
 """
 
+import asyncio
 import io
 import socket
 import unittest
@@ -108,6 +109,38 @@ class TestControlMessage(unittest.TestCase):
     self.assertEqual(('250', '+', 'info/names='), first_entry)
     self.assertEqual(('250', ' ', 'OK'), contents[1])
 
+  def test_streaming_data_reply(self):
+    """
+    Stream the lines of a data reply to a handler rather than buffering them.
+    """
+
+    streamed = []
+
+    async def line_handler(line):
+      streamed.append(line)
+
+    async def recv(reply, data_handler):
+      reader = asyncio.StreamReader()
+      reader.feed_data(stem.util.str_tools._to_bytes(reply))
+      reader.feed_eof()
+
+      return await stem.socket.recv_message(reader, data_handler = data_handler)
+
+    message = asyncio.run(recv(GETINFO_INFONAMES, lambda status_code, content: line_handler))
+    expected_lines = [stem.util.str_tools._to_bytes(line) for line in GETINFO_INFONAMES.split('\r\n')[1:7]]
+
+    self.assertEqual(expected_lines + [None], streamed)
+    self.assertEqual([('250', '+', 'info/names='), ('250', ' ', 'OK')], message.content())
+    self.assertEqual('250+info/names=\r\n.\r\n250 OK\r\n', message.raw_content())
+
+    # handlers can decline to stream a reply
+
+    del streamed[:]
+    message = asyncio.run(recv(GETINFO_INFONAMES, lambda status_code, content: None))
+
+    self.assertEqual([], streamed)
+    self.assertEqual(GETINFO_INFONAMES, stem.util.str_tools._to_unicode(message.raw_content()))
+
   def test_no_crlf(self):
     """
     Checks that we get a ProtocolError when we don't have both a carriage
@@ -4,18 +4,22 @@ Unit tests for the stem.response.events classes.
 
 import datetime
 import logging.handlers
+import os
 import queue
+import tempfile
 import threading
 import unittest
+import zlib
 
 import stem.response
 import stem.response.events
 import stem.util.log
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from stem import *  # enums and exceptions
 from stem.response import ControlMessage
+from stem.response.events import EventRecorder, replay_events
 from stem.descriptor.router_status_entry import RouterStatusEntryV3
 
 # ADDRMAP event
@@ -568,6 +572,99 @@ class TestEvents(unittest.TestCase):
     self.assertEqual(['SOLID', '"NON', 'SENSE"'], event.positional_args)
     self.assertEqual({'condition': 'MEH', 'quoted': '1 2 3'}, event.keyword_args)
 
+  def test_lazy_event(self):
+    message = ControlMessage.from_str('650 STREAM_BW 2 15 25 2012-12-06T13:51:11.433755', normalize = True)
+    stem.response.convert('EVENT', message, lazy = True)
+
+    self.assertTrue(isinstance(message, stem.response.events.StreamBwEvent))
+    self.assertEqual('STREAM_BW', message.type)
+    self.assertFalse('read' in message.__dict__)
+
+    self.assertEqual(25, message.read)
+    self.assertEqual(15, message.written)
+    self.assertEqual(['2', '15', '25', '2012-12-06T13:51:11.433755'], message.positional_args)
+    self.assertEqual(message, _get_event('650 STREAM_BW 2 15 25 2012-12-06T13:51:11.433755'))
+    self.assertRaises(AttributeError, getattr, message, 'no_such_attr')
+
+    # malformed content raises upon access rather than conversion
+
+    message = ControlMessage.from_str('650 STREAM_BW 2 15 blarg', normalize = True)
+    stem.response.convert('EVENT', message, lazy = True)
+
+    self.assertEqual('STREAM_BW', message.type)
+    self.assertRaises(ProtocolError, getattr, message, 'read')
+    self.assertRaises(ProtocolError, getattr, message, 'written')
+
+  def test_event_log(self):
+    contents = ['650 BW %i 25' % i for i in range(10)] + ['650 BW &15* 25', '650+WARN\na multi-line\nwarning message\n.\n650 OK']
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+      for compress in (True, False):
+        path = os.path.join(tmpdir, 'events.log')
+
+        with EventRecorder(path, compress = compress, block_size = 3) as recorder:
+          for i, content in enumerate(contents):
+            recorder.record(ControlMessage.from_str(content, normalize = True, arrived_at = 1000 + i))
+
+        events = list(replay_events(path))
+
+        self.assertEqual(12, len(events))
+        self.assertEqual([(1000 + i, i) for i in range(10)], [(event.arrived_at, event.read) for event in events[:10]])
+        self.assertTrue(isinstance(events[0], stem.response.events.BandwidthEvent))
+        self.assertEqual(ControlMessage.from_str('650 BW 0 25', 'EVENT', normalize = True, arrived_at = 1000), events[0])
+
+        self.assertEqual('BW &15* 25', str(events[10]))  # malformed
+        self.assertEqual('a multi-line\nwarning message', events[11].message)
+
+        # our index lets us skip blocks outside our range
+
+        self.assertEqual([4, 5, 6], [event.read for event in replay_events(path, start = 1004, end = 1006)])
+
+        with patch('zlib.decompress', Mock(side_effect = zlib.decompress)) as decompress_mock:
+          self.assertEqual([9], [event.read for event in replay_events(path, start = 1009, end = 1009)])
+          self.assertEqual(2 if compress else 0, decompress_mock.call_count)  # index and one event block
+
+        # appending to an existing log
+
+        with EventRecorder(path, compress = compress) as recorder:
+          recorder.record(ControlMessage.from_str('650 BW 20 25', normalize = True, arrived_at = 2000))
+
+        self.assertEqual(13, len(list(replay_events(path))))
+
+        # truncating our trailing index, its event blocks are still read
+
+        with open(path, 'r+b') as log_file:
+          log_file.truncate(os.path.getsize(path) - 5)
+
+        self.assertEqual(13, len(list(replay_events(path))))
+
+        # appending after a partial block discards it
+
+        with EventRecorder(path, compress = compress) as recorder:
+          recorder.record(ControlMessage.from_str('650 BW 21 25', normalize = True, arrived_at = 2001))
+          recorder.record(ControlMessage.from_str('650 BW 22 25', normalize = True, arrived_at = 2002))
+
+        self.assertEqual([20, 21, 22], [event.read for event in list(replay_events(path))[-3:]])
+        self.assertEqual([21], [event.read for event in replay_events(path, start = 2001, end = 2001)])
+        os.remove(path)
+
+      # replays at a multiple of the original speed
+
+      with EventRecorder(path) as recorder:
+        for arrived_at in (1000, 1004, 1010):
+          recorder.record(ControlMessage.from_str('650 BW 15 25', normalize = True, arrived_at = arrived_at))
+
+      with patch('time.time', Mock(return_value = 500.0)), patch('time.sleep') as sleep_mock:
+        self.assertEqual(3, len(list(replay_events(path, speed = 2))))
+        self.assertEqual([2.0, 5.0], [call[0][0] for call in sleep_mock.call_args_list])
+
+      with open(path, 'wb') as log_file:
+        log_file.write(b'not an event log')
+
+      self.assertRaisesWith(ValueError, "%s isn't a stem event log" % path, EventRecorder, path)
+      self.assertRaisesWith(ValueError, "%s isn't a stem event log" % path, list, replay_events(path))
+      self.assertRaisesWith(ValueError, 'Replay speed must be positive, got 0', list, replay_events(path, speed = 0))
+
   def test_log_events(self):
     event = _get_event('650 DEBUG connection_edge_process_relay_cell(): Got an extended cell! Yay.')
 
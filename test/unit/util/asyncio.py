@@ -4,11 +4,12 @@ Unit tests for the stem.util.asyncio module.
 
 import asyncio
 import io
+import time
 import unittest
 
 from unittest.mock import patch, Mock
 
-from stem.util.asyncio import Synchronous
+from stem.util.asyncio import Runtime, Synchronous, set_runtime
 from stem.util.test_tools import coro_func_returning_value
 
 EXAMPLE_OUTPUT = """\
@@ -185,6 +186,114 @@ class TestSynchronous(unittest.TestCase):
     sync_test()
     asyncio.run(async_test())
 
+  def test_streamed_iteration(self):
+    """
+    Synchronous iteration provides items as they're produced, pausing the
+    generator when our caller falls behind.
+    """
+
+    class Producer(Synchronous):
+      def __init__(self):
+        super(Producer, self).__init__()
+        self.produced = 0
+        self.closed = False
+
+      async def numbers(self, count):
+        try:
+          for i in range(count):
+            self.produced += 1
+            yield i
+        finally:
+          self.closed = True
+
+      async def status(self):
+        return 'sync call'
+
+      async def failure(self):
+        yield 'first'
+        raise ValueError('boom')
+
+    instance = Producer()
+
+    with patch('stem.util.asyncio.ITERATOR_BUFFER_SIZE', 5):
+      numbers = instance.numbers(1000)
+      self.assertEqual(0, next(numbers))
+
+      time.sleep(0.05)
+      self.assertTrue(instance.produced <= 7)  # paused by our buffer
+
+      self.assertEqual(list(range(1, 1000)), list(numbers))
+      self.assertTrue(instance.closed)
+
+      # other methods can be called while the generator is paused
+
+      instance.produced, instance.closed = 0, False
+      numbers = instance.numbers(20)
+      self.assertEqual([(i, 'sync call') for i in range(20)], [(i, instance.status()) for i in numbers])
+
+    # abandoning our iterator stops the generator
+
+    instance.produced, instance.closed = 0, False
+    numbers = instance.numbers(1000)
+    next(numbers)
+    numbers.close()
+
+    time.sleep(0.05)
+    self.assertTrue(instance.closed)
+    self.assertTrue(instance.produced < 1000)
+
+    # errors are raised after the items preceding them
+
+    failure = instance.failure()
+    self.assertEqual('first', next(failure))
+    self.assertRaisesWith(ValueError, 'boom', next, failure)
+
+    instance.stop()
+
+  def test_runtime(self):
+    """
+    Synchronous objects share the loops of a runtime when one is set.
+    """
+
+    runtime = Runtime(threads = 2, lag_interval = 0.01)
+    set_runtime(runtime)
+
+    try:
+      instances = [Demo() for _ in range(3)]
+
+      self.assertEqual(2, len(set([instance._loop_thread for instance in instances])))
+      self.assertEqual(['async call'] * 3, [instance.async_method() for instance in instances])
+      self.assertEqual([0, 1, 2], list(instances[0]))
+      self.assertEqual([2, 1], [stats.users for stats in runtime.stats()])
+
+      # blocking a loop is reflected in its lag
+
+      async def block():
+        time.sleep(0.1)
+
+      asyncio.run_coroutine_threadsafe(block(), instances[0]._loop).result()
+      time.sleep(0.05)
+
+      self.assertTrue(runtime.stats()[0].max_lag >= 0.05)
+
+      # stopping our instances releases their loop, which keeps running
+
+      for instance in instances:
+        instance.stop()
+
+      self.assertEqual([0, 0], [stats.users for stats in runtime.stats()])
+      self.assertTrue(all([t.is_alive() for t in runtime._loop_threads]))
+
+      self.assertEqual('async call', instances[0].async_method())
+      self.assertEqual([1, 0], [stats.users for stats in runtime.stats()])
+      instances[0].stop()
+    finally:
+      set_runtime(None)
+      runtime.stop()
+
+    self.assertEqual([], runtime.stats())
+    self.assertRaisesWith(ValueError, 'Runtimes must have at least one thread, got 0', Runtime, 0)
+
   def test_context_management(self):
     """
     Exercise context management via 'with' statements.
@@ -0,0 +1,108 @@
+"""
+Unit tests for the stem.util.cache functions.
+"""
+
+import unittest
+
+from unittest.mock import patch
+
+from stem.util.cache import CacheStats, RequestCache
+
+
+class TestRequestCache(unittest.TestCase):
+  def test_example(self):
+    """
+    Checks that the pydoc example is accurate.
+    """
+
+    cache = RequestCache(max_size = 500, ttl = {'getinfo': 3600})
+    cache.set('version', '0.4.5.6', 'getinfo')
+
+    self.assertEqual('0.4.5.6', cache.get('version', 'getinfo'))
+    self.assertEqual(1, cache.stats().hits)
+
+  def test_namespaces(self):
+    """
+    Keys are distinct between namespaces, and can be cleared together.
+    """
+
+    cache = RequestCache()
+    cache.set('address', '1.2.3.4', 'getinfo')
+    cache.set('address', '5.6.7.8', 'getconf')
+    cache.set('address', '9.10.11.12')
+
+    self.assertEqual('1.2.3.4', cache.get('address', 'getinfo'))
+    self.assertEqual('5.6.7.8', cache.get('address', 'getconf'))
+    self.assertEqual('9.10.11.12', cache.get('address'))
+
+    cache.clear('getinfo')
+
+    self.assertEqual(None, cache.get('address', 'getinfo'))
+    self.assertEqual('5.6.7.8', cache.get('address', 'getconf'))
+    self.assertEqual(2, len(cache))
+
+    cache.set('address', None, 'getconf')
+    cache.remove('address')
+    cache.remove('unknown')
+
+    self.assertEqual(0, len(cache))
+
+  def test_lru_eviction(self):
+    """
+    Drops the least recently used entries when we're full.
+    """
+
+    cache = RequestCache(max_size = 3)
+
+    for key in ('a', 'b', 'c'):
+      cache.set(key, key.upper())
+
+    cache.get('a')  # now more recently used than 'b'
+    cache.set('d', 'D')
+
+    self.assertEqual(None, cache.get('b'))
+    self.assertEqual(['A', 'C', 'D'], [cache.get(key) for key in ('a', 'c', 'd')])
+
+    cache.set_max_size(1)
+
+    self.assertEqual(['D'], [cache.get(key) for key in ('a', 'c', 'd') if cache.get(key)])
+    self.assertEqual(CacheStats(1, 1, 6, 3, 3, 0), cache.stats())
+
+    self.assertRaisesWith(ValueError, 'Cache size must be at least one, got 0', cache.set_max_size, 0)
+
+  @patch('time.monotonic')
+  def test_ttl(self, monotonic_mock):
+    """
+    Entries expire based on the ttl of their namespace, or key if they lack
+    one.
+    """
+
+    monotonic_mock.return_value = 100.0
+
+    cache = RequestCache(ttl = {'getinfo': 10, 'exit_policy': 5}, default_ttl = 60)
+    cache.set('version', '0.4.5.6', 'getinfo')
+    cache.set('exit_policy', 'reject *:*')
+    cache.set('user', 'atagar')
+
+    monotonic_mock.return_value = 107.0
+
+    self.assertEqual('0.4.5.6', cache.get('version', 'getinfo'))
+    self.assertEqual(None, cache.get('exit_policy'))
+
+    monotonic_mock.return_value = 110.0
+
+    self.assertEqual(None, cache.get('version', 'getinfo'))
+    self.assertEqual('atagar', cache.get('user'))
+
+    cache.set_ttl('getinfo', None)
+    cache.set('version', '0.4.5.6', 'getinfo')
+    monotonic_mock.return_value = 100000.0
+
+    self.assertEqual('0.4.5.6', cache.get('version', 'getinfo'))
+    self.assertEqual(None, cache.get('user'))
+
+    stats = cache.stats()
+    self.assertEqual(3, stats.expirations)
+    self.assertEqual(0.5, stats.hit_ratio())
+
+    self.assertRaisesWith(ValueError, 'Cache ttl must be positive, got -1', cache.set_ttl, 'getinfo', -1)